@@ -0,0 +1,94 @@
+"""
+Micro-benchmark of the decoding and encoding of model objects.
+
+Compares the generated codecs and the ISO-8601 fast path with the model constructors
+and `dateutil`, on documents serialized like Elasticsearch returns them. Decoding is
+measured on the same document over and over, where the datetimes are taken from the
+cache of `intern_datetime`, and on documents with distinct datetimes, which are all
+parsed.
+
+    $ python benchmarks/codec.py [--number N]
+"""
+import argparse
+import datetime
+import json
+import timeit
+from enum import Enum
+
+from dateutil.parser import parse
+
+from dmsclient import factories
+from dmsclient.utils import str_to_datetime
+
+
+def _source(model):
+    return json.loads(json.dumps(model.to_dict(), default=lambda dt: dt.isoformat()))
+
+
+def _distinct_sources(source, fields, count):
+    sources = []
+    for i in range(count):
+        copy = dict(source)
+        for field in fields:
+            if copy.get(field):
+                copy[field] = (parse(copy[field]) + datetime.timedelta(milliseconds=i)).isoformat()
+        sources.append(copy)
+    return sources
+
+
+def _to_dict_copying(model):
+    s = model.extra_fields.copy()
+    s.update({name: getattr(model, name) for name in model.__slots__})
+    return {k: v.value if isinstance(v, Enum) else v for k, v in s.items()}
+
+
+def _report(name, baseline, optimized, number):
+    print('%-32s %10.2f us %10.2f us %8.1fx' % (name, baseline / number * 1e6, optimized / number * 1e6,
+                                                baseline / optimized))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help='iterations of each benchmark')
+    args = parser.parse_args()
+    number = args.number
+
+    print('%-32s %13s %13s %9s' % ('', 'baseline', 'optimized', 'speedup'))
+
+    string = '2017-08-23T07:32:18.123456+02:00'
+    _report('datetime', timeit.timeit(lambda: parse(string), number=number),
+            timeit.timeit(lambda: str_to_datetime(string), number=number), number)
+
+    for factory in (factories.DriveFactory, factories.SegmentFactory,
+                    factories.SensorFactory, factories.SensorVersionFactory):
+        model_class = factory._meta.model
+        document = {'_source': _source(factory())}
+        model_class.codec()
+
+        def construct(document):
+            source = dict(document['_source'])
+            for field in model_class.DATETIME_FIELDS:
+                if source.get(field):
+                    source[field] = parse(source[field])
+            return model_class(**source)
+
+        _report('%s.from_elasticsearch' % (model_class.__name__,),
+                timeit.timeit(lambda: construct(document), number=number),
+                timeit.timeit(lambda: model_class.from_elasticsearch(document), number=number), number)
+
+        documents = [{'_source': source}
+                     for source in _distinct_sources(document['_source'], model_class.DATETIME_FIELDS, number)]
+        baseline_documents, optimized_documents = iter(documents), iter(documents)
+        _report('  (distinct datetimes)',
+                timeit.timeit(lambda: construct(next(baseline_documents)), number=number),
+                timeit.timeit(lambda: model_class.from_elasticsearch(next(optimized_documents)), number=number),
+                number)
+
+        model = model_class.from_elasticsearch(document)
+        _report('%s.to_dict' % (model_class.__name__,),
+                timeit.timeit(lambda: _to_dict_copying(model), number=number),
+                timeit.timeit(model.to_dict, number=number), number)
+
+
+if __name__ == '__main__':
+    main()
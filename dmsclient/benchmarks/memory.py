@@ -0,0 +1,60 @@
+"""
+Memory used by model objects decoded from Elasticsearch documents.
+
+Compares the models with objects holding the same attributes in a `__dict__` and an
+`extra_fields` dict, as the models did before defining `__slots__`.
+
+    $ python benchmarks/memory.py [--number N]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from dmsclient import factories
+
+
+class _DictModel(object):
+    pass
+
+
+def _as_dict_model(model):
+    obj = _DictModel()
+    obj.extra_fields = {}
+    for name in model.__slots__:
+        setattr(obj, name, getattr(model, name))
+    return obj
+
+
+def _measure(build, documents):
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(document) for document in documents]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / len(documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=10000, help='objects of each model')
+    args = parser.parse_args()
+
+    print('%-16s %12s %12s %9s' % ('', '__dict__', '__slots__', 'saving'))
+
+    for factory in (factories.DriveFactory, factories.SegmentFactory, factories.SensorFactory,
+                    factories.SensorVersionFactory, factories.ClusterFactory):
+        model_class = factory._meta.model
+        source = json.loads(json.dumps(factory().to_dict(), default=lambda dt: dt.isoformat()))
+        documents = [{'_source': dict(source)} for _ in range(args.number)]
+        model_class.codec()
+
+        baseline = _measure(lambda document: _as_dict_model(model_class.from_elasticsearch(document)), documents)
+        optimized = _measure(model_class.from_elasticsearch, documents)
+        print('%-16s %10d B %10d B %8.0f%%' % (model_class.__name__, baseline, optimized,
+                                               100 * (1 - optimized / baseline)))
+
+
+if __name__ == '__main__':
+    main()
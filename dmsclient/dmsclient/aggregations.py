@@ -0,0 +1,128 @@
+from collections import OrderedDict
+
+from dmsclient.utils import str_to_datetime
+
+
+class Aggregations:
+    """
+    Builders of the aggregations run by `DMSController.aggregate` and parser of their
+    results. Bucket aggregations accept sub-aggregations, e.g. the number of drives and
+    the total bytes per car:
+
+    {'cars': Aggregations.terms('car_id', aggs={'bytes': Aggregations.sum('size')})}
+    """
+
+    TERMS_SIZE = 1000
+    BUCKET_AGGREGATIONS = ('terms', 'date_histogram')
+
+    @staticmethod
+    def terms(field, size=TERMS_SIZE, aggs=None):
+        """
+        Return a `terms` aggregation, whose result is a dict of buckets by value of `field`.
+
+        :param string field: the field, which must be a keyword (or numeric) field
+        :param int size: the maximum number of buckets, the ones with more documents first
+        :param dict aggs: the sub-aggregations computed for each bucket (optional)
+        :rtype: dict
+        """
+        return Aggregations._bucket('terms', {'field': field, 'size': size}, aggs)
+
+    @staticmethod
+    def date_histogram(field, interval, aggs=None):
+        """
+        Return a `date_histogram` aggregation, whose result is a dict of buckets by
+        start datetime of each interval.
+
+        :param string field: the date field
+        :param string interval: the interval of the buckets (e.g. `day`, `month` or `1h`)
+        :param dict aggs: the sub-aggregations computed for each bucket (optional)
+        :rtype: dict
+        """
+        return Aggregations._bucket('date_histogram', {'field': field, 'interval': interval}, aggs)
+
+    @staticmethod
+    def sum(field):
+        """
+        Return a `sum` aggregation, whose result is the sum of the values of `field`.
+
+        :rtype: dict
+        """
+        return {'sum': {'field': field}}
+
+    @staticmethod
+    def min(field):
+        """
+        Return a `min` aggregation, whose result is the minimum value of `field` (a
+        datetime for date fields), or None if there are no values.
+
+        :rtype: dict
+        """
+        return {'min': {'field': field}}
+
+    @staticmethod
+    def max(field):
+        """
+        Return a `max` aggregation, whose result is the maximum value of `field` (a
+        datetime for date fields), or None if there are no values.
+
+        :rtype: dict
+        """
+        return {'max': {'field': field}}
+
+    @staticmethod
+    def _bucket(kind, params, aggs):
+        aggregation = {kind: params}
+        if aggs:
+            aggregation['aggs'] = aggs
+        return aggregation
+
+    @classmethod
+    def parse(cls, aggs, result):
+        """
+        Convert the `aggregations` of a search response to plain Python structures.
+
+        Bucket aggregations become ordered dicts with the number of documents of each
+        bucket or, if they have sub-aggregations, a dict with the `count` of documents and
+        the result of each sub-aggregation. Metric aggregations become their value.
+
+        Aggregations missing from the response (e.g. when no index matches the pattern)
+        get the result of an aggregation over no documents: no buckets, a sum of 0 and
+        None for the rest.
+
+        :param dict aggs: the aggregations of the search request
+        :param dict result: the `aggregations` of the search response (optional)
+        :rtype: dict
+        """
+        result = result or {}
+        return {name: cls._parse(aggregation, result[name]) if name in result else cls._empty(aggregation)
+                for name, aggregation in aggs.items()}
+
+    @classmethod
+    def _empty(cls, aggregation):
+        if any(kind in aggregation for kind in cls.BUCKET_AGGREGATIONS):
+            return OrderedDict()
+        if 'sum' in aggregation:
+            return 0.0
+        return None
+
+    @classmethod
+    def _parse(cls, aggregation, result):
+        if 'buckets' in result:
+            sub_aggs = aggregation.get('aggs')
+            buckets = OrderedDict()
+            for bucket in result['buckets']:
+                key = bucket['key']
+                if 'date_histogram' in aggregation:
+                    key = str_to_datetime(bucket['key_as_string'])
+                if sub_aggs:
+                    buckets[key] = dict(cls.parse(sub_aggs, bucket), count=bucket['doc_count'])
+                else:
+                    buckets[key] = bucket['doc_count']
+            return buckets
+
+        if 'value' in result:
+            if result['value'] is not None and 'value_as_string' in result:
+                return str_to_datetime(result['value_as_string'])
+            return result['value']
+
+        return result
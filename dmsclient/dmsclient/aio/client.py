@@ -0,0 +1,438 @@
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+
+from elasticsearch import ElasticsearchException, NotFoundError
+from elasticsearch.client.utils import _make_path
+
+from dmsclient.cache import LRUCache
+from dmsclient.client import DMSClient, LazyController
+from dmsclient.exceptions import DMSClientException
+from dmsclient.mappings import MAPPINGS
+from dmsclient.ring import ClusterRing
+from dmsclient.scripts import SCRIPTS
+
+try:
+    from elasticsearch_async import AsyncElasticsearch
+except ImportError:
+    AsyncElasticsearch = None
+
+logger = logging.getLogger('dmsclient')
+
+
+class AsyncDMSClient(object):
+    """
+    Asynchronous client for the DMS. It provides the same controllers as
+    :class:`dmsclient.client.DMSClient`, with coroutines instead of blocking methods
+    and async iterators instead of iterators, so a single event loop can keep many
+    requests in flight.
+
+    Requires Python 3.6 and the `elasticsearch-async` package
+    (`pip install dmsclient[async]`).
+
+    Since the constructor cannot perform requests, the templates and the cluster
+    configuration are processed by `initialize()`, which is called when the client
+    is used as an async context manager:
+
+    async with AsyncDMSClient(...) as client:
+        drive = await client.drives.get(drive_id)
+        async for segment in client.segments.find_by_drive_id(drive_id):
+            ...
+
+    :param es_endpoint: Elasticsearch endpoint, or list of endpoints (also as a comma-separated
+                        string).
+    :param string es_user: Elasticsearch user.
+    :param string es_password: Elasticsearch password.
+    :param bool create_templates: Create the Elasticsearch templates when initialized (optional).
+    :param bool verify_templates: Verify the configured Elasticsearch templates when initialized.
+                                  If True, the client will fail if any template is not created (optional).
+    :param bool initial_sync: Obtain the cluster configuration when initialized. If False, the client
+                              will defer the sync until there is a request (optional).
+    :param string refresh: Default refresh policy for write requests. One of `true`, `wait_for`
+                           or `false` (optional).
+    :param int index_cache_size: Maximum number of document IDs whose concrete index is
+                                 remembered to fetch them with a direct GET (optional).
+    :param timedelta index_cache_ttl: Time a document ID to index resolution is kept (optional).
+    :param int document_cache_size: Maximum number of documents kept in memory by `get` and
+                                    `get_many`. Disabled if 0 (optional).
+    :param timedelta document_cache_ttl: Time a document is kept in memory (optional).
+    :param bool deterministic_placement: Place time-based documents in the monthly index of the
+                                         start timestamp included in their ID, instead of the
+                                         current month. Creating those documents does not need
+                                         to search for an existing document with the same ID, and
+                                         they are fetched with a direct GET. Only enable it if all
+                                         the documents were created with this option (optional).
+    :param bool background_sync: Keep the cluster configuration up to date from a background
+                                 task, started by `initialize()`, so requests never wait for a
+                                 sync (optional).
+    :param timedelta sync_interval: Time between two syncs of the cluster configuration (optional).
+    :param string ring_cache_file: Local file where a snapshot of the cluster configuration is kept.
+                                   See `dmsclient.client.DMSClient` (optional).
+    :param bool lazy: Defer the creation and verification of the templates and the initial sync
+                      from `initialize()` to the first request (optional).
+    :param string template_cache_file: Local file where the fingerprint of the verified templates is
+                                       kept. See `dmsclient.client.DMSClient` (optional).
+    :param loop: the event loop used by the transport (optional).
+    :raises dmsclient.exceptions.DMSClientException: if there is any error related to the DMS
+    """
+
+    SYNC_INTERVAL = DMSClient.SYNC_INTERVAL
+    REFRESH_POLICIES = DMSClient.REFRESH_POLICIES
+    INDEX_CACHE_SIZE = DMSClient.INDEX_CACHE_SIZE
+    INDEX_CACHE_TTL = DMSClient.INDEX_CACHE_TTL
+    DOCUMENT_CACHE_TTL = DMSClient.DOCUMENT_CACHE_TTL
+
+    readers = LazyController('dmsclient.aio.controllers.readers', 'AsyncReaderController', 'readers')
+    usbreaders = LazyController('dmsclient.aio.controllers.usbreaders', 'AsyncUSBReaderController', 'usbreaders')
+    cartridges = LazyController('dmsclient.aio.controllers.cartridges', 'AsyncCartridgeController', 'cartridges')
+    clusters = LazyController('dmsclient.aio.controllers.clusters', 'AsyncClusterController', 'clusters')
+    journals = LazyController('dmsclient.aio.controllers.journals', 'AsyncJournalController', 'journals')
+    drives = LazyController('dmsclient.aio.controllers.drives', 'AsyncDriveController', 'drives')
+    segments = LazyController('dmsclient.aio.controllers.segments', 'AsyncSegmentController', 'segments')
+    sensors = LazyController('dmsclient.aio.controllers.sensors', 'AsyncSensorController', 'sensors')
+    scenarios = LazyController('dmsclient.aio.controllers.scenarios', 'AsyncScenarioController', 'scenarios')
+    asdmoutput = LazyController('dmsclient.aio.controllers.asdmoutput', 'AsyncAsdmOutputController', 'asdmoutput')
+
+    def __init__(self, es_endpoint, es_user, es_password,
+                 create_templates=False, verify_templates=True, initial_sync=True, refresh='true',
+                 index_cache_size=INDEX_CACHE_SIZE, index_cache_ttl=INDEX_CACHE_TTL,
+                 document_cache_size=0, document_cache_ttl=DOCUMENT_CACHE_TTL,
+                 deterministic_placement=False, background_sync=False, sync_interval=SYNC_INTERVAL,
+                 ring_cache_file=None, lazy=False, template_cache_file=None, loop=None):
+        if AsyncElasticsearch is None:
+            raise DMSClientException("The 'elasticsearch-async' package is required by AsyncDMSClient")
+
+        logger.info('Connecting to Elasticsearch backend')
+
+        self.refresh = DMSClient._normalize_refresh(refresh)
+        self.index_cache = LRUCache(index_cache_size, index_cache_ttl.total_seconds())
+        self.document_cache = None
+        if document_cache_size:
+            self.document_cache = LRUCache(document_cache_size, document_cache_ttl.total_seconds())
+        self.deterministic_placement = deterministic_placement
+
+        endpoints = DMSClient._parse_endpoints(es_endpoint)
+        self._endpoints = ','.join(sorted(endpoints))
+        self.elasticsearch = AsyncElasticsearch(
+            endpoints,
+            http_auth=(es_user, es_password),
+            verify_certs=False,
+            loop=loop
+        )
+
+        self.last_sync = datetime.min
+        self.sync_interval = sync_interval
+        self.ring = None
+        self.ring_cache_file = ring_cache_file
+
+        self.template_cache_file = template_cache_file
+        self._lazy = lazy
+        self._initialized = False
+        self._init_lock = None
+        self._create_templates = create_templates
+        self._verify_templates = verify_templates
+        self._initial_sync = initial_sync
+        self._background_sync_enabled = background_sync
+        self._sync_lock = None
+        self._sync_task = None
+        self._revalidate_task = None
+        self._topology_listeners = []
+
+    async def initialize(self):
+        """
+        Create and verify the templates and obtain the cluster configuration, as
+        configured in the constructor. If the client is lazy, this is deferred to
+        the first request.
+        """
+        if self._lazy:
+            logger.info('Deferring initialization until the first request')
+        else:
+            await self.ensure_initialized()
+
+        if self._background_sync_enabled:
+            self.start_background_sync()
+
+    async def ensure_initialized(self):
+        """
+        Asynchronous equivalent of `dmsclient.client.DMSClient.ensure_initialized`.
+        """
+        if self._initialized:
+            return
+
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            await self._setup_templates()
+
+            if self._initial_sync:
+                self.ring = self._read_ring_snapshot()
+                if self.ring is not None:
+                    self.last_sync = datetime.now()
+                    self._revalidate_task = asyncio.ensure_future(self._revalidate_ring())
+                else:
+                    await self.sync_cluster_config()
+            else:
+                logger.info('Skipping initial sync')
+
+            self._initialized = True
+
+    async def _setup_templates(self):
+        if not self._create_templates and not self._verify_templates:
+            logger.info('Skipping template creation and verification')
+            return
+
+        fingerprint = self.templates_fingerprint()
+        if self._read_template_cache().get(self._endpoints) == fingerprint:
+            logger.info('Templates unchanged since they were last verified, skipping')
+            return
+
+        if self._create_templates:
+            await self.create_templates()
+        else:
+            logger.info('Skipping template creation')
+
+        if self._verify_templates:
+            await self.verify_templates()
+        else:
+            logger.info('Skipping template verification')
+
+        self._save_template_cache(fingerprint)
+
+    templates_fingerprint = staticmethod(DMSClient.templates_fingerprint)
+    _read_template_cache = DMSClient._read_template_cache
+    _save_template_cache = DMSClient._save_template_cache
+    forget_templates = DMSClient.forget_templates
+
+    async def close(self):
+        """
+        Stop the background sync and close the connections to Elasticsearch.
+        """
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+        await self.stop_background_sync()
+        self.elasticsearch.transport.close()
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    cache_stats = DMSClient.cache_stats
+
+    def refresh_params(self, index, refresh=None, by_query=False):
+        """
+        Return the `refresh` request parameter to be used for a write request on
+        the given index. The per-call `refresh` value takes precedence over the
+        client default.
+
+        :param string index: the index (or index pattern) affected by the write
+        :param refresh: per-call refresh policy (optional)
+        :param bool by_query: whether the request is an `update_by_query` or `delete_by_query`
+                              request, which do not support `wait_for`
+        :return: the request parameters
+        :rtype: dict
+        """
+        refresh = DMSClient._normalize_refresh(refresh) if refresh is not None else self.refresh
+        if by_query and refresh == 'wait_for':
+            refresh = 'true'
+        return {'refresh': refresh}
+
+    async def create_templates(self):
+        """
+        Create the templates configured in `dmsclient.mappings.MAPPINGS` and the stored
+        scripts configured in `dmsclient.scripts.SCRIPTS`.
+        """
+        for template, mappings in MAPPINGS.items():
+            logger.info("Creating template '%s'..." % (template,))
+            await self.elasticsearch.indices.put_template(template, body=mappings)
+
+        for script_id in SCRIPTS.keys():
+            await self.create_script(script_id)
+
+    async def create_script(self, script_id):
+        """
+        Store a script configured in `dmsclient.scripts.SCRIPTS` in Elasticsearch.
+
+        :param string script_id: the ID of the script
+        """
+        logger.info("Creating script '%s'..." % (script_id,))
+        await self.elasticsearch.transport.perform_request('PUT', _make_path('_scripts', script_id), body={
+            'script': {
+                'lang': 'painless',
+                'source': SCRIPTS[script_id]
+            }
+        })
+
+    async def verify_templates(self):
+        """
+        Verify that the template names and the stored scripts are available in Elasticsearch.
+        Missing scripts are created, see `dmsclient.client.DMSClient.verify_templates`.
+
+        :raises dmsclient.exceptions.DMSClientException: if a template does not exist in Elasticsearch
+        """
+        for template in MAPPINGS.keys():
+            logger.info("Verifying template '%s'..." % (template,))
+            if not await self.elasticsearch.indices.exists_template(template):
+                raise DMSClientException("Template '%s' does not exist in Elasticsearch" % (template, ))
+
+        for script_id in SCRIPTS.keys():
+            logger.info("Verifying script '%s'..." % (script_id,))
+            try:
+                await self.elasticsearch.transport.perform_request('GET', _make_path('_scripts', script_id))
+            except NotFoundError:
+                try:
+                    await self.create_script(script_id)
+                except ElasticsearchException as e:
+                    logger.warning("Script '%s' does not exist in Elasticsearch and could not be created. %s"
+                                   % (script_id, str(e)))
+
+    async def sync_cluster_config(self, force=False):
+        """
+        Obtain the latest cluster configuration from Elasticsearch and update the hash ring.
+         See `dmsclient.client.DMSClient.sync_cluster_config`. Concurrent calls wait
+         for a single sync instead of sending one request each.
+
+        :param bool force: Force synchronization regardless of the time elapsed since last sync
+        :raises dmsclient.exceptions.DMSClientException: if there is no cluster configured in Elasticsearch
+        """
+        if not force:
+            if self._sync_task is not None and self.ring is not None:
+                return
+            if (datetime.now() - self.last_sync) < self.sync_interval:
+                return
+
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+
+        last_sync = self.last_sync
+        async with self._sync_lock:
+            if not force and self.last_sync != last_sync:
+                # Another task synced while we were waiting
+                return
+
+            logger.debug('Syncing cluster configuration')
+
+            try:
+                clusters = [entry async for entry in self.clusters.get_all_versioned()]
+            except Exception as e:
+                raise DMSClientException("Could not obtain cluster configuration. %s" % (str(e),))
+
+            logger.debug('Obtained %d clusters from Elasticsearch' % (len(clusters),))
+
+            ring = self.ring
+            if ring is None or ring.version != ClusterRing.fingerprint(clusters):
+                self.ring = ClusterRing(clusters)
+                self._save_ring_snapshot(self.ring)
+                await self._notify_topology_change(ring, self.ring)
+            self.last_sync = datetime.now()
+
+    def add_topology_listener(self, listener):
+        """
+        Register a function or coroutine function to be called when the cluster
+        configuration changes. See `dmsclient.client.DMSClient.add_topology_listener`.
+
+        :param listener: the function to be called
+        """
+        self._topology_listeners.append(listener)
+
+    def remove_topology_listener(self, listener):
+        """
+        Unregister a function registered with `add_topology_listener`.
+
+        :param listener: the function to be removed
+        """
+        self._topology_listeners.remove(listener)
+
+    async def _notify_topology_change(self, old_ring, new_ring):
+        logger.info('Cluster configuration changed: %s' % (new_ring,))
+        for listener in list(self._topology_listeners):
+            try:
+                result = listener(old_ring, new_ring)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception('Error in topology listener')
+
+    def start_background_sync(self):
+        """
+        Start a task that synchronizes the cluster configuration every `sync_interval`.
+        Requests do not sync the configuration while it runs.
+        """
+        if self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+
+    async def stop_background_sync(self):
+        """
+        Cancel the task started by `start_background_sync` and wait for it to finish.
+        """
+        if self._sync_task is None:
+            return
+
+        task, self._sync_task = self._sync_task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _background_sync(self):
+        while True:
+            await asyncio.sleep(self.sync_interval.total_seconds())
+            try:
+                await self.sync_cluster_config(force=True)
+            except Exception as e:
+                # Keep the current ring, the next iteration will try again
+                logger.warning('Background sync of the cluster configuration failed. %s' % (str(e),))
+
+    async def _revalidate_ring(self):
+        try:
+            await self.sync_cluster_config(force=True)
+        except Exception as e:
+            logger.warning('Could not revalidate the ring snapshot. %s' % (str(e),))
+
+    _read_ring_snapshot = DMSClient._read_ring_snapshot
+    _save_ring_snapshot = DMSClient._save_ring_snapshot
+    _current_ring = DMSClient._current_ring
+    hashring = DMSClient.hashring
+    get_cluster = DMSClient.get_cluster
+    placement = DMSClient.placement
+
+    async def get_index(self, index_pattern, doc_type, **fields):
+        """
+        Return the index of the object that matches with the provided filters.
+
+        :param string index_pattern: Index pattern to perform the search
+        :param string doc_type: Document type to look for
+        :param fields: Arguments that are used in the query as filters
+        :return: The index name that matches the given filters
+        :raises dmsclient.exceptions.DMSClientException: if there is no match
+        """
+        query = {
+            'query': {
+                'bool': {
+                    'must': []
+                }
+            }
+        }
+        for k, v in fields.items():
+            query['query']['bool']['must'].append({'match': {k: v}})
+
+        result = await self.elasticsearch.search(index=index_pattern,
+                                                 doc_type=doc_type,
+                                                 body=query)
+        docs = result['hits']['hits']
+        if len(docs) == 1:
+            index = docs[0]['_index']
+            # Only the index of the document ID is cached, so it is dropped when the document is deleted
+            self.index_cache.set((doc_type, docs[0]['_id']), index)
+            return index
+        else:
+            message = '"found":false'
+            raise DMSClientException(message, 404)
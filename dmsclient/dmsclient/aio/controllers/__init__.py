@@ -0,0 +1,643 @@
+import abc
+from collections import OrderedDict
+from datetime import datetime
+
+from elasticsearch import NotFoundError
+
+from dmsclient.aggregations import Aggregations
+from dmsclient.aio.decorators import elasticsearch
+from dmsclient.aio.helpers import scan, search_after, streaming_bulk
+from dmsclient.controllers import BaseDMSController, MISSING
+from dmsclient.exceptions import DMSDocumentNotFoundError
+from dmsclient.scripts import Scripts
+from dmsclient.utils import chunks
+
+
+class AsyncDMSController(BaseDMSController):
+    """
+    Asynchronous equivalent of :class:`dmsclient.controllers.DMSController`. Every
+    request method is a coroutine and the methods returning a collection of documents
+    return async iterators. The requests are built and their responses parsed by
+    :class:`dmsclient.controllers.BaseDMSController`, shared with the synchronous controllers.
+
+    :param client: instance of AsyncDMSClient used for Elasticsearch requests
+    """
+
+    # Bound in the class body for the default arguments
+    BULK_CHUNK_SIZE = BaseDMSController.BULK_CHUNK_SIZE
+    BULK_MAX_CHUNK_BYTES = BaseDMSController.BULK_MAX_CHUNK_BYTES
+    GET_MANY_CHUNK_SIZE = BaseDMSController.GET_MANY_CHUNK_SIZE
+    SEARCH_PAGE_SIZE = BaseDMSController.SEARCH_PAGE_SIZE
+    SEARCH_PREFETCH = BaseDMSController.SEARCH_PREFETCH
+
+    @property
+    @abc.abstractmethod
+    def model_class(self):
+        pass
+
+    @elasticsearch()
+    async def index(self, document, refresh=None):
+        """
+        Index a document. Overrides the document if a document with the
+        same ID already exists.
+
+        :param document: the document object to be created
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        assert isinstance(document, self.model_class)
+
+        index = self._index_for(document)
+        await self.client.elasticsearch.index(
+            index=index,
+            doc_type=self.model_class.DOC_TYPE,
+            id=document.id,
+            body=document.to_dict(),
+            params=self.client.refresh_params(index, refresh)
+        )
+        self._cache_index(document.id, index)
+        self._cache_document(document)
+
+    @elasticsearch()
+    async def create(self, document, refresh=None):
+        """
+        Create a document object
+
+        :param document: the document object to be created
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSConflictError: if a document with the same ID already exists
+        """
+        assert isinstance(document, self.model_class)
+
+        # See DMSController.create
+        index = self._index_for(document)
+        if self.model_class.timebased and self._placed_index(document.id) is None:
+            try:
+                await self.get(document.id)
+                raise self._conflict()
+            except DMSDocumentNotFoundError:
+                pass
+
+        await self.client.elasticsearch.create(
+            index=index,
+            doc_type=self.model_class.DOC_TYPE,
+            id=document.id,
+            body=document.to_dict(),
+            params=self.client.refresh_params(index, refresh)
+        )
+        self._cache_index(document.id, index)
+        self._cache_document(document)
+
+    @elasticsearch()
+    async def bulk_index(self, documents, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                         refresh=None):
+        """
+        Index a collection of documents using the `_bulk` endpoint. See
+        `DMSController.bulk_index`.
+
+        :param documents: the document objects to be indexed
+        :type documents: iterable
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as the input
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return await self._bulk('index', documents, chunk_size, max_chunk_bytes, refresh)
+
+    @elasticsearch()
+    async def bulk_create(self, documents, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                          refresh=None):
+        """
+        Create a collection of documents using the `_bulk` endpoint. See
+        `DMSController.bulk_create`.
+
+        :param documents: the document objects to be created
+        :type documents: iterable
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as the input
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return await self._bulk('create', documents, chunk_size, max_chunk_bytes, refresh)
+
+    async def _bulk(self, op_type, documents, chunk_size, max_chunk_bytes, refresh):
+        results = []
+
+        for chunk in chunks(documents, chunk_size):
+            existing = await self._existing_ids(self._existing_candidates(op_type, chunk))
+            chunk_results, pending = self._bulk_pending(chunk, existing)
+
+            actions = (self._bulk_action(op_type, chunk[i]) for i in pending)
+            responses = streaming_bulk(self.client.elasticsearch,
+                                       actions,
+                                       chunk_size=chunk_size,
+                                       max_chunk_bytes=max_chunk_bytes,
+                                       params=self.client.refresh_params(self._bulk_refresh_index(), refresh))
+
+            position = iter(pending)
+            async for _, item in responses:
+                i = next(position)
+                chunk_results[i] = self._bulk_result(chunk[i], item)
+
+            results.extend(chunk_results)
+
+        return results
+
+    async def _existing_ids(self, doc_ids):
+        if not doc_ids:
+            return {}
+
+        result = await self.client.elasticsearch.search(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=dict(self._ids_query(doc_ids), _source=False),
+            size=len(doc_ids)
+        )
+        return self._parse_existing_ids(result)
+
+    @elasticsearch()
+    async def get(self, doc_id):
+        """
+        Retrieve the document object matching the given ID
+
+        :param doc_id: the document ID to be retrieved
+        :type doc_id: string
+        :returns: the document object
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        document = self._cached_document(doc_id)
+        if document is not None:
+            return document
+
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                result = await self.client.elasticsearch.get(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id
+                )
+                return self._parse_document(result)
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
+
+        result = await self.client.elasticsearch.search(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._id_query(doc_id),
+            size=1
+        )
+        return self._parse_get(doc_id, result)
+
+    @elasticsearch()
+    async def get_many(self, doc_ids, chunk_size=GET_MANY_CHUNK_SIZE):
+        """
+        Retrieve the document objects matching the given IDs. See `DMSController.get_many`.
+
+        :param doc_ids: the document IDs to be retrieved
+        :type doc_ids: iterable
+        :param chunk_size: maximum number of IDs per request
+        :type chunk_size: integer
+        :return: the document objects by ID, in the same order as `doc_ids`. IDs that
+                 could not be found are mapped to `dmsclient.controllers.MISSING`
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        documents = OrderedDict((doc_id, MISSING) for doc_id in doc_ids)
+        cached, uncached, placed = self._get_many_requests(documents)
+
+        for chunk in chunks(cached, chunk_size):
+            result = await self.client.elasticsearch.mget(body={'docs': chunk})
+            self._parse_mget(result, documents, uncached, placed)
+
+        for chunk in chunks(uncached, chunk_size):
+            result = await self.client.elasticsearch.search(
+                index=self.model_class.TEMPLATE,
+                doc_type=self.model_class.DOC_TYPE,
+                body=self._ids_query(chunk),
+                size=len(chunk)
+            )
+            self._parse_get_many(result, documents)
+
+        return documents
+
+    @elasticsearch()
+    async def delete(self, doc_id, refresh=None):
+        """
+        Delete the document with the given ID. See `DMSController.delete`.
+
+        :param doc_id: the document ID to be deleted
+        :type doc_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        self._uncache_document(doc_id)
+
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                await self.client.elasticsearch.delete(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id,
+                    params=self.client.refresh_params(index, refresh)
+                )
+                self._uncache_index(doc_id)
+                return
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
+
+        result = await self.client.elasticsearch.delete_by_query(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._id_query(doc_id),
+            params=self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True)
+        )
+        self._check_by_query(doc_id, result, 'deleted', 'deleting')
+
+    @elasticsearch()
+    async def find_by_query(self, query, postprocess=True, source=None, docvalue_fields=None, columns=None):
+        """
+        Find documents that match the given query using the scroll API. See
+        `DMSController.find_by_query`.
+
+        :param query: Elasticsearch query
+        :type query: dict
+        :param postprocess: transform search results to objects
+        :type postprocess: bool
+        :param source: the `_source` filtering of the search (optional)
+        :param docvalue_fields: fields returned from doc values (optional)
+        :type docvalue_fields: list
+        :param columns: fields returned in column batches, instead of `source` and
+                        `docvalue_fields` (optional)
+        :type columns: list
+        :return: a collection of objects, or of :class:`dmsclient.columns.ColumnBatch` with `columns`
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        query, postprocess, batch = self._search_query(query, postprocess, source, docvalue_fields, columns)
+        result = scan(self.client.elasticsearch,
+                      index=self.model_class.TEMPLATE,
+                      doc_type=self.model_class.DOC_TYPE,
+                      query=query,
+                      size=self.SEARCH_PAGE_SIZE)
+
+        async for item in result:
+            if batch is None:
+                yield self._parse_hit(item, postprocess)
+                continue
+
+            batch.append(self._parse_hit(item, False))
+            if len(batch) >= self.SEARCH_PAGE_SIZE:
+                yield batch
+                batch = batch.empty()
+
+        if batch is not None and len(batch) > 0:
+            yield batch
+
+    def find_sorted_by_query(self, query, sort=None, postprocess=True, source=None, docvalue_fields=None,
+                             size=SEARCH_PAGE_SIZE, prefetch=SEARCH_PREFETCH, **kwargs):
+        """
+        Find documents that match the given query, in the given order, using
+        `search_after` pagination. No scroll context is kept open on the cluster,
+        so this is suitable for iterators that are consumed slowly. See
+        `DMSController.find_sorted_by_query`.
+
+        :param query: Elasticsearch query
+        :type query: dict
+        :param sort: sort clauses. The last one must be unique per document. By default, the
+                     ID field of the model (e.g. `drive_id`)
+        :type sort: sequence
+        :param postprocess: transform search results to objects
+        :type postprocess: bool
+        :param source: the `_source` filtering of the search (optional)
+        :param docvalue_fields: fields returned from doc values (optional)
+        :type docvalue_fields: list
+        :param size: number of documents per request
+        :type size: integer
+        :param prefetch: number of pages requested ahead of the one being consumed
+        :type prefetch: integer
+        :return: a collection of objects
+        :rtype: async iterator
+        :raises ValueError: if the arguments are not valid, when called
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        query = self._projected_query(query, postprocess, source, docvalue_fields)
+        sort = self._id_sort() if sort is None else sort
+        return self._find_sorted_by_query(query, sort, postprocess, size, prefetch, **kwargs)
+
+    @elasticsearch()
+    async def _find_sorted_by_query(self, query, sort, postprocess, size, prefetch):
+        result = search_after(self.client.elasticsearch,
+                              index=self.model_class.TEMPLATE,
+                              doc_type=self.model_class.DOC_TYPE,
+                              query=query,
+                              sort=sort,
+                              size=size,
+                              prefetch=prefetch)
+
+        async for item in result:
+            yield self._parse_hit(item, postprocess)
+
+    def find_by_fields(self, **fields):
+        """
+        Find documents that match the given fields.
+
+        :param fields: keyword arguments with the fields to use in the search
+        :return: a collection of objects
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self.find_by_query(self._fields_query(fields))
+
+    @elasticsearch()
+    async def count(self, **fields):
+        """
+        Count the documents that match the given fields. See `DMSController.count`.
+
+        :param fields: keyword arguments with the fields to use in the search
+        :return: the number of documents
+        :rtype: int
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = await self.client.elasticsearch.count(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._fields_query(fields)
+        )
+        return result['count']
+
+    async def count_by(self, field, **filters):
+        """
+        Count the documents that match the given fields, grouped by the values of `field`.
+        See `DMSController.count_by`.
+
+        :param string field: the field to group by
+        :param filters: keyword arguments with the fields to use in the search
+        :return: the number of documents by value
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return (await self.aggregate({field: Aggregations.terms(field)}, **filters))[field]
+
+    @elasticsearch()
+    async def aggregate(self, aggs, query=None, **filters):
+        """
+        Run aggregations over the documents that match the given query and fields. See
+        `DMSController.aggregate`.
+
+        :param aggs: the aggregations by name
+        :type aggs: dict
+        :param query: Elasticsearch query clause (optional)
+        :type query: dict
+        :param filters: keyword arguments with the fields to use in the search
+        :return: the result of each aggregation by name
+        :rtype: dict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = await self.client.elasticsearch.search(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._aggregation_body(aggs, query, filters)
+        )
+        return self._parse_aggregations(aggs, result)
+
+    @elasticsearch()
+    async def __update__(self, doc_id, fields, refresh=None):
+        """
+        Update fields for the document matching the given ID. See `DMSController.__update__`.
+
+        :param doc_id: the document ID to be updated
+        :type doc_id: string
+        :param fields: fields to be updated
+        :type fields: dict
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        await self._update_document(doc_id, self._merge_script(fields), refresh)
+
+    async def _update_document(self, doc_id, script, refresh):
+        self._uncache_document(doc_id)
+
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                await self.client.elasticsearch.update(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id,
+                    body={
+                        "script": script
+                    },
+                    params=self._update_params(index, refresh)
+                )
+                return
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
+
+        result = await self.client.elasticsearch.update_by_query(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._update_by_query_body(doc_id, script),
+            params=self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True)
+        )
+        self._check_by_query(doc_id, result, 'updated', 'updating')
+
+    async def set_fields(self, doc_id, **fields):
+        """
+        Update unprotected fields for the document matching the given ID.
+
+        :param doc_id: the document ID to be updated
+        :type doc_id: string
+        :param fields: extra kwargs with the fields and values to be updated
+        :type fields: **kwargs
+        :raises ValueError: if any of the fields is protected
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        self._check_unprotected(fields)
+        await self.__update__(doc_id, fields)
+
+    @elasticsearch()
+    async def update_many(self, doc_ids, fields, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                          refresh=None):
+        """
+        Update the same fields for all the documents matching the given IDs, using
+        partial updates sent to the `_bulk` endpoint. See `DMSController.update_many`.
+
+        :param doc_ids: the IDs of the documents to be updated
+        :type doc_ids: iterable
+        :param fields: fields to be updated
+        :type fields: dict
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as `doc_ids`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        fields = dict(fields, updated_at=datetime.utcnow())
+        results = []
+
+        for chunk in chunks(doc_ids, chunk_size):
+            indices = {doc_id: self._placed_index(doc_id) or self._cached_index(doc_id) for doc_id in chunk}
+            indices.update(await self._existing_ids([doc_id for doc_id in chunk if indices[doc_id] is None]))
+
+            chunk_results, pending = self._update_many_pending(chunk, indices)
+
+            actions = (self._update_action(indices[chunk[i]], chunk[i], fields) for i in pending)
+            responses = streaming_bulk(self.client.elasticsearch,
+                                       actions,
+                                       chunk_size=chunk_size,
+                                       max_chunk_bytes=max_chunk_bytes,
+                                       params=self.client.refresh_params(self.model_class.TEMPLATE, refresh))
+
+            position = iter(pending)
+            async for _, item in responses:
+                i = next(position)
+                chunk_results[i] = self._update_result(chunk[i], item)
+
+            results.extend(chunk_results)
+
+        return results
+
+    @elasticsearch()
+    async def remove_field(self, doc_id, field_key, refresh=None):
+        """
+        Remove an unprotected field from the document matching the given ID
+        and field key.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :param field_key: the field key to be removed
+        :type field_key: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises ValueError: if any of the fields is protected
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        self._check_unprotected([field_key])
+        await self._update_document(doc_id, Scripts.stored(Scripts.REMOVE_FIELD, field=field_key), refresh)
+
+    @elasticsearch()
+    async def add_tags(self, doc_id, tags, refresh=None):
+        """
+        Add tags to the document matching the given ID.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :param tags: the list of tags to be added
+        :type tags: list
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        await self._update_document(doc_id, self._tags_script(Scripts.ADD_TAGS, tags), refresh)
+
+    @elasticsearch()
+    async def remove_tags(self, doc_id, tags, refresh=None):
+        """
+        Remove tags for the document matching the given ID.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :param tags: the list of tags to be removed
+        :type tags: list
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        await self._update_document(doc_id, self._tags_script(Scripts.REMOVE_TAGS, tags), refresh)
+
+    @elasticsearch()
+    async def get_tags(self, doc_id):
+        """
+        Obtain the tags of the document matching the given ID.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :return: the list of tags associated to the document
+        :rtype: list
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        doc = await self.get(doc_id)
+        return doc.tags
+
+
+class AsyncDMSControllerWithState(AsyncDMSController):
+    """
+    Controller with additional `set_state()` and `get_state()` coroutines.
+    """
+
+    @property
+    @abc.abstractmethod
+    def model_class(self):
+        pass
+
+    async def set_state(self, doc_id, state, **kwargs):
+        """
+        Update the state for the document matching the given ID.
+
+        :param doc_id: the document ID to be updated
+        :type doc_id: string
+        :param state: the desired state
+        :type state: string
+        :param kwargs: extra arguments passed to `__update__` (e.g. `refresh`)
+        :raises ValueError: if the state is not valid
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        await self.__update__(doc_id, {'state': self.model_class.State(state)}, **kwargs)
+
+    async def set_state_many(self, doc_ids, state, **kwargs):
+        """
+        Update the state for all the documents matching the given IDs with a
+        single bulk request per chunk (see `update_many`).
+
+        :param doc_ids: the IDs of the documents to be updated
+        :type doc_ids: iterable
+        :param state: the desired state
+        :type state: string
+        :param kwargs: extra arguments passed to `update_many` (e.g. `refresh`)
+        :return: the result of each document, in the same order as `doc_ids`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises ValueError: if the state is not valid
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return await self.update_many(doc_ids, {'state': self.model_class.State(state)}, **kwargs)
+
+    @elasticsearch()
+    async def get_state(self, doc_id):
+        """
+        Obtain the state of the document matching the given ID.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :returns: the state of the document
+        :rtype: string
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        d = await self.get(doc_id)
+        return d.state
@@ -0,0 +1,12 @@
+from dmsclient.aio.controllers import AsyncDMSController
+from dmsclient.models.asdmoutput import AsdmOutput
+
+
+class AsyncAsdmOutputController(AsyncDMSController):
+    """
+    Asynchronous controller class for manipulating AsdmOutput documents
+    """
+
+    @property
+    def model_class(self):
+        return AsdmOutput
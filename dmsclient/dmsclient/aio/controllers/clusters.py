@@ -0,0 +1,118 @@
+from dmsclient.aio.controllers import AsyncDMSController
+from dmsclient.aio.decorators import elasticsearch
+from dmsclient.aio.helpers import scan
+from dmsclient.models.cluster import Cluster
+
+
+class AsyncClusterController(AsyncDMSController):
+    """
+    Asynchronous controller class for manipulating Cluster documents
+    """
+
+    @property
+    def model_class(self):
+        return Cluster
+
+    async def create(self, cluster):
+        """
+        Create a cluster object. It overrides the cluster if a cluster
+        with the same ID already exists.
+
+        :param cluster: the cluster object to be created
+        :type cluster: :class:`dmsclient.models.cluster.Cluster`
+        """
+        await self.index(cluster, sync=False)
+
+    async def enable(self, cluster_id):
+        """
+        Enable the cluster matching the given ID.
+
+        :param cluster_id: the cluster ID
+        :type cluster_id: string
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if a cluster with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        await self.__update__(cluster_id, {'available': 1})
+
+    async def disable(self, cluster_id):
+        """
+        Disable the cluster matching the given ID.
+
+        :param cluster_id: the cluster ID
+        :type cluster_id: string
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if a cluster with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        await self.__update__(cluster_id, {'available': 0})
+
+    async def set_weight(self, cluster_id, weight):
+        """
+        Update the weight of the cluster matching the given ID.
+
+        :param cluster_id: the cluster ID to be updated
+        :type cluster_id: string
+        :param weight: the cluster weight
+        :type weight: int
+        :raises ValueError: if weight is not an integer
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if a cluster with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        if not isinstance(weight, int):
+            raise ValueError('Cluster weight must be an integer')
+        await self.__update__(cluster_id, {'weight': weight})
+
+    async def get_all(self):
+        """
+        Get all Cluster documents.
+
+        :return: a collection of Cluster objects
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = scan(self.client.elasticsearch,
+                      index=Cluster.INDEX,
+                      doc_type=Cluster.DOC_TYPE,
+                      size=1000)
+
+        async for item in result:
+            yield Cluster.from_elasticsearch(item)
+
+    async def get_all_versioned(self):
+        """
+        Get all Cluster documents along with their version. See
+        `ClusterController.get_all_versioned`.
+
+        :return: a collection of (Cluster object, version) tuples
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = scan(self.client.elasticsearch,
+                      index=Cluster.INDEX,
+                      doc_type=Cluster.DOC_TYPE,
+                      query={'version': True},
+                      size=1000)
+
+        async for item in result:
+            yield Cluster.from_elasticsearch(item), item.get('_version')
+
+    @elasticsearch()
+    async def delete_all(self, refresh=None):
+        """
+        Delete all Cluster documents.
+
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSClientException: if an error occur
+        """
+        await self.client.elasticsearch.delete_by_query(
+            index=Cluster.INDEX,
+            doc_type=Cluster.DOC_TYPE,
+            body={
+                'query': {
+                    'match_all': {}
+                }
+            },
+            params=dict(self.client.refresh_params(Cluster.INDEX, refresh, by_query=True),
+                        conflicts='proceed')
+        )
+        self._uncache_documents()
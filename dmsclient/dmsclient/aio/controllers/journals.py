@@ -0,0 +1,44 @@
+from dmsclient.aio.controllers import AsyncDMSController
+from dmsclient.aio.decorators import elasticsearch
+from dmsclient.models.journal import Journal
+
+
+class AsyncJournalController(AsyncDMSController):
+    """
+    Asynchronous controller class for manipulating Journal documents
+    """
+
+    @property
+    def model_class(self):
+        return Journal
+
+    async def create(self, document):
+        """
+        Create a Journal document. For journals, this is the same as
+        using the `index` method on the Journal controller.
+
+        :param document: the Journal object to be created/indexed
+        """
+        await self.index(document)
+
+    @elasticsearch()
+    async def delete_all(self, refresh=None):
+        """
+        Delete all Journal documents.
+
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSClientException: if an error occur
+        """
+        await self.client.elasticsearch.delete_by_query(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body={
+                'query': {
+                    'match_all': {}
+                }
+            },
+            params=dict(self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True),
+                        conflicts='proceed')
+        )
+        self._uncache_documents()
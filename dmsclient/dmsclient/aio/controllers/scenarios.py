@@ -0,0 +1,12 @@
+from dmsclient.aio.controllers import AsyncDMSControllerWithState
+from dmsclient.models.scenario import Scenario
+
+
+class AsyncScenarioController(AsyncDMSControllerWithState):
+    """
+    Asynchronous controller class for manipulating Scenario documents
+    """
+
+    @property
+    def model_class(self):
+        return Scenario
@@ -0,0 +1,109 @@
+from dmsclient.aio.controllers import AsyncDMSControllerWithState
+from dmsclient.aio.decorators import elasticsearch
+from dmsclient.models.drive import Drive
+from dmsclient.models.segment import Segment
+
+
+class AsyncSegmentController(AsyncDMSControllerWithState):
+    """
+    Asynchronous controller class for manipulating Segment documents
+    """
+
+    @property
+    def model_class(self):
+        return Segment
+
+    async def create_from_drive(self, segment_id, sequence, drive, **kwargs):
+        """
+        Utility method to create a Segment from a Drive.
+
+        :param segment_id: the ID of the Segment to be created (e.g. Z1_21YD3_CONT_20170823T073455-20170823T073828)
+        :type segment_id: string
+        :param sequence: numeric index of this segment
+        :type sequence: integer
+        :param drive: Drive object
+        :type drive: :class:`dmsclient.models.drive.Drive`
+        :param kwargs: any additional Drive fields
+        :type kwargs: keyword arguments
+        :return: the Segment object
+        :rtype: :class:`dmsclient.models.segment.Segment`
+        """
+        assert isinstance(drive, Drive)
+        await self.client.sync_cluster_config()
+        cluster = self.client.get_cluster(drive.drive_id)
+        s = Segment.from_drive(segment_id=segment_id,
+                               sequence=sequence,
+                               drive=drive,
+                               cluster=cluster,
+                               **kwargs)
+        await self.create(s, sync=False)
+        return s
+
+    async def bulk_create_from_drive(self, segment_ids, drive, first_sequence=1, **kwargs):
+        """
+        Utility method to create several Segments from a Drive using a single
+        bulk request per chunk. Sequences are assigned in the order of `segment_ids`,
+        starting at `first_sequence`.
+
+        :param segment_ids: the IDs of the Segments to be created
+        :type segment_ids: list
+        :param drive: Drive object
+        :type drive: :class:`dmsclient.models.drive.Drive`
+        :param first_sequence: numeric index of the first segment
+        :type first_sequence: integer
+        :param kwargs: any additional Segment fields
+        :type kwargs: keyword arguments
+        :return: the result of each segment, in the same order as `segment_ids`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSInvalidFormat: if any of the segment IDs cannot be parsed
+        """
+        assert isinstance(drive, Drive)
+        await self.client.sync_cluster_config()
+        cluster = self.client.get_cluster(drive.drive_id)
+        segments = [Segment.from_drive(segment_id=segment_id,
+                                       sequence=sequence,
+                                       drive=drive,
+                                       cluster=cluster,
+                                       **kwargs)
+                    for sequence, segment_id in enumerate(segment_ids, first_sequence)]
+        return await self.bulk_create(segments, sync=False)
+
+    def find_by_drive_id(self, drive_id):
+        """
+        Utility method to find segments by `drive_id`.
+
+        :param drive_id: the Drive ID
+        :type drive_id: string
+        :return: a collection of segments
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self.find_by_fields(drive_id=drive_id)
+
+    @elasticsearch()
+    async def delete_by_drive_id(self, drive_id, refresh=None):
+        """
+        Utility method to delete segments by `drive_id`.
+
+        :param drive_id: the Drive ID
+        :type drive_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :returns: the number of segments successfully deleted
+        :rtype: integer
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = await self.client.elasticsearch.delete_by_query(
+            index=Segment.TEMPLATE,
+            doc_type=Segment.DOC_TYPE,
+            body={
+                'query': {
+                    'term': {
+                        'drive_id': drive_id
+                    }
+                }
+            },
+            params=self.client.refresh_params(Segment.TEMPLATE, refresh, by_query=True)
+        )
+        self._uncache_documents()
+        return result['deleted']
@@ -0,0 +1,293 @@
+from dmsclient.aio.controllers import AsyncDMSControllerWithState
+from dmsclient.aio.decorators import elasticsearch
+from dmsclient.controllers.sensors import SensorController
+from dmsclient.exceptions import DMSClientException, DMSDocumentNotFoundError
+from dmsclient.models.sensor import Sensor
+from dmsclient.models.sensorversion import SensorVersion
+
+
+class AsyncSensorController(AsyncDMSControllerWithState):
+    """
+    Asynchronous controller class for manipulating Sensor and SensorVersion documents
+    """
+
+    @property
+    def model_class(self):
+        return Sensor
+
+    async def create_from_segment(self, segment, sensor_type, **kwargs):
+        """
+        Utility method to create Sensor documents from a Segment object. The Sensor
+        document will inherit fields from the given Segment.
+
+        :param segment: the Segment object
+        :type segment: string
+        :param sensor_type: the sensor type (must be a valid type found in
+        `dmsclient.models.sensor.Sensor.SENSOR_TYPES`)
+        :type sensor_type: string
+        :param kwargs: any extra fields that must be created with the Sensor document
+        :return: the Sensor object
+        :rtype: :class:`dmsclient.models.sensor.Sensor`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        s = Sensor.from_segment(segment=segment,
+                                sensor_type=sensor_type,
+                                **kwargs)
+        await self.create(s)
+        return s
+
+    async def bulk_create_from_segments(self, segments, sensor_type, **kwargs):
+        """
+        Utility method to create one Sensor document per Segment object using a
+        single bulk request per chunk.
+
+        :param segments: the Segment objects
+        :type segments: list
+        :param sensor_type: the sensor type (must be a valid type found in
+        `dmsclient.models.sensor.Sensor.SENSOR_TYPES`)
+        :type sensor_type: string
+        :param kwargs: any extra fields that must be created with the Sensor documents
+        :return: the result of each sensor, in the same order as `segments`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        sensors = [Sensor.from_segment(segment=segment,
+                                       sensor_type=sensor_type,
+                                       **kwargs)
+                   for segment in segments]
+        return await self.bulk_create(sensors)
+
+    async def create_from_filename(self, filename):
+        """
+        Utility method to create Sensor documents from a filename.
+
+        :param filename: the name of the Sensor file
+        (e.g. "Z1_BK031_CONT_20180316T102815-20180316T102915_FLC.dat")
+        :type filename: string
+        :return: the Sensor object
+        :rtype: :class:`dmsclient.models.sensor.Sensor`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        segment_id, sensor_type = self._parse_sensor_filename(filename)
+        segment = await self.client.segments.get(segment_id)
+        return await self.create_from_segment(segment, sensor_type)
+
+    def find_by_segment_id(self, segment_id):
+        """
+        Utility method to find sensors by `segment_id`.
+
+        :param segment_id: the Segment ID
+        :type segment_id: string
+        :return: a collection of sensors
+        :rtype: async iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self.find_by_fields(segment_id=segment_id)
+
+    @elasticsearch()
+    async def delete_by_segment_id(self, segment_id, refresh=None):
+        """
+        Utility method to delete sensors by `segment_id`.
+
+        :param segment_id: the Segment ID
+        :type segment_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :returns: the number of sensors successfully deleted
+        :rtype: integer
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = await self.client.elasticsearch.delete_by_query(
+            index=Sensor.TEMPLATE,
+            doc_type=Sensor.DOC_TYPE,
+            body={
+                'query': {
+                    'term': {
+                        'segment_id': segment_id
+                    }
+                }
+            },
+            params=self.client.refresh_params(Sensor.TEMPLATE, refresh, by_query=True)
+        )
+        self._uncache_documents()
+        return result['deleted']
+
+    async def create_version_from_filename(self, filename, **kwargs):
+        """
+        Utility method to create SensorVersion documents from a filename.
+
+        :param filename: the name of the SensorVersion file
+        (e.g. "Z1_BK031_CONT_20180316T102815-20180316T102915_FLC_0048.dat")
+        :type filename: string
+        :return: the SensorVersion object
+        :rtype: :class:`dmsclient.models.sensor.SensorVersion`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        sensor_id, version = self._parse_version_filename(filename)
+        sensor = await self.get(sensor_id)
+
+        return await self.create_version(sensor, version, **kwargs)
+
+    @elasticsearch()
+    async def create_version(self, sensor, version, refresh=None, **kwargs):
+        """
+        Create a SensorVersion document from a Sensor object and a version.
+
+        :param sensor: the Sensor object
+        :type sensor: string
+        :param version: the four-digit version
+        :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :param kwargs: any extra fields that must be created with the SensorVersion document
+        :return: the SensorVersion object
+        :rtype: :class:`dmsclient.models.sensorversion.SensorVersion`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        sv = SensorVersion.from_sensor(sensor, version, **kwargs)
+        index = self._version_index(sv)
+        await self.client.elasticsearch.create(
+            index=index,
+            doc_type=SensorVersion.DOC_TYPE,
+            id=sv.sensorversion_id,
+            body=sv.to_dict(),
+            params=self.client.refresh_params(index, refresh)
+        )
+        return sv
+
+    @elasticsearch()
+    async def get_versions(self, sensor_id):
+        """
+        Get all SensorVersion documents belonging to a particular Sensor.
+
+        :param sensor_id: the Sensor ID
+        :type sensor_id: string
+        :return: a collection of SensorVersion objects
+        :rtype: list
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = await self.client.elasticsearch.search(
+            index=SensorVersion.TEMPLATE,
+            doc_type=SensorVersion.DOC_TYPE,
+            body=self._fields_query({'sensor_id': sensor_id})
+        )
+
+        versions = []
+        for entry in result['hits']['hits']:
+            versions.append(SensorVersion.from_elasticsearch(entry))
+        return versions
+
+    @elasticsearch()
+    async def get_version(self, sensor_id, version):
+        """
+        Get a SensorVersion document by the Sensor ID and the version.
+
+        :param sensor_id: the Sensor ID
+        :type sensor_id: string
+        :param version: the four-digit version
+        :type version: string
+        :return: the SensorVersion object
+        :rtype: :class:`dmsclient.models.sensorversion.SensorVersion`
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        result = await self.client.elasticsearch.search(
+            index=SensorVersion.TEMPLATE,
+            doc_type=SensorVersion.DOC_TYPE,
+            body=self._version_query(sensor_id, version),
+            size=1
+        )
+
+        if result['hits']['total'] == 0:
+            raise DMSDocumentNotFoundError()
+        return SensorVersion.from_elasticsearch(result['hits']['hits'][0])
+
+    @elasticsearch()
+    async def delete_version(self, sensor_id, version, refresh=None):
+        """
+        Delete a SensorVersion document identified by the Sensor ID and the version.
+
+        :param sensor_id: the Sensor ID
+        :type sensor_id: string
+        :param version: the four-digit version
+        :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        result = await self.client.elasticsearch.delete_by_query(
+            index=SensorVersion.TEMPLATE,
+            doc_type=SensorVersion.DOC_TYPE,
+            body=self._version_query(sensor_id, version),
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True)
+        )
+
+        if result['total'] == 0:
+            raise DMSDocumentNotFoundError()
+        if result['deleted'] != 1:
+            raise DMSClientException('Unexpected error deleting: %s' % str(result))
+
+    @elasticsearch()
+    async def delete_all_versions(self, sensor_id, refresh=None):
+        """
+        Delete all SensorVersion documents identified by the Sensor ID.
+
+        :param sensor_id: the Sensor ID
+        :type sensor_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :returns: the number of SensorVersion documents successfully deleted
+        :rtype: integer
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        result = await self.client.elasticsearch.delete_by_query(
+            index=SensorVersion.TEMPLATE,
+            doc_type=SensorVersion.DOC_TYPE,
+            body={
+                'query': {
+                    'term': {
+                        'sensor_id': sensor_id
+                    }
+                }
+            },
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True)
+        )
+
+        return result['deleted']
+
+    @elasticsearch()
+    async def update_version(self, sensor_id, version, refresh=None, **fields):
+        """
+        Update the fields of a SensorVersion document identified by the Sensor ID
+        and the version.
+
+        :param sensor_id: the Sensor ID
+        :type sensor_id: string
+        :param version: the four-digit version
+        :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :param fields: fields to be updated (fields `sensorversion_id`, `sensor_id`,
+        and `version` cannot be updated)
+        :type fields: kwargs
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        result = await self.client.elasticsearch.update_by_query(
+            index=SensorVersion.TEMPLATE,
+            doc_type=SensorVersion.DOC_TYPE,
+            body=self._version_update_body(sensor_id, version, fields),
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True),
+            conflicts='proceed'
+        )
+
+        if result['updated'] == 0:
+            raise DMSDocumentNotFoundError()
+
+    # The requests are built and parsed as in SensorController
+    _parse_sensor_filename = staticmethod(SensorController._parse_sensor_filename)
+    _parse_version_filename = staticmethod(SensorController._parse_version_filename)
+    _version_index = SensorController._version_index
+    _version_query = SensorController._version_query
+    _version_update_body = SensorController._version_update_body
@@ -0,0 +1,27 @@
+from dmsclient.aio.controllers.readers import AsyncReaderController
+from dmsclient.models.usbreader import USBReader
+
+
+class AsyncUSBReaderController(AsyncReaderController):
+    """
+    Asynchronous controller class for manipulating USB Reader documents
+    """
+
+    @property
+    def model_class(self):
+        return USBReader
+
+    async def set_mount_state(self, reader_id, mount_state):
+        """
+        Update the reader mount state for the document matching the given ID.
+
+        :param reader_id: the reader ID to be updated
+        :type reader_id: string
+        :param mount_state: the desired mount state (valid states found in
+        `dmsclient.models.reader.USBReader.MountState`)
+        :type mount_state: string
+        :raises ValueError: if the mount_state is not valid
+        :raises dmsclient.exceptions.DMSDocumentNotFoundError: if a document with the given ID does not exist
+        :raises dmsclient.exceptions.DMSClientException: if any other error occur
+        """
+        await self.__update__(reader_id, {'mount_state': USBReader.MountState(mount_state)})
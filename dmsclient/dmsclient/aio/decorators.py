@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import inspect
+
+from elasticsearch import ElasticsearchException, TransportError
+
+from dmsclient.exceptions import DMSClientException, DMSConflictError
+
+
+def _convert(exception):
+    if isinstance(exception, TransportError) and exception.status_code == 409:
+        return DMSConflictError.from_exception(exception)
+    return DMSClientException.from_exception(exception)
+
+
+def elasticsearch():
+    """
+    Asynchronous equivalent of `dmsclient.decorators.elasticsearch`. A decorator
+    that syncs cluster configuration and catches Elasticsearch exceptions thrown by
+    the decorated coroutine (or async generator) and converts them to library-specific
+    exceptions.
+
+    Notes:
+      Caught exceptions are re-raised. Retries (`retries` keyword) are not
+      available for async generators.
+    Returns:
+      A decorator that catches Elasticsearch exceptions thrown by decorated coroutines.
+    Raises:
+      Nothing. The decorator will re-raise exceptions caught by the decorated
+      coroutine.
+    """
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def generator_wrapper(*args, **kwds):
+                sync = kwds.pop('sync', True)
+
+                client = args[0].client
+                await client.ensure_initialized()
+                if sync:
+                    # Try to sync cluster information
+                    await client.sync_cluster_config()
+
+                try:
+                    async for item in func(*args, **kwds):
+                        yield item
+                except ElasticsearchException as e:
+                    raise _convert(e)
+
+            return generator_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwds):
+            sync = kwds.pop('sync', True)
+            retries = kwds.pop('retries', 0)
+
+            client = args[0].client
+            await client.ensure_initialized()
+            if sync:
+                # Try to sync cluster information
+                await client.sync_cluster_config()
+
+            attempt = 1
+            while True:
+                try:
+                    try:
+                        return await func(*args, **kwds)
+                    except ElasticsearchException as e:
+                        raise _convert(e)
+                except Exception:
+                    if attempt >= retries:
+                        raise
+                    attempt += 1
+                    await asyncio.sleep(1)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,171 @@
+import asyncio
+
+from elasticsearch import TransportError
+from elasticsearch.helpers import expand_action
+
+
+async def scan(client, query=None, scroll='5m', size=1000, **kwargs):
+    """
+    Asynchronous equivalent of `elasticsearch.helpers.scan`. Iterate over all the
+    documents matching the query using the scroll API. Documents are returned in
+    no particular order.
+
+    :param client: instance of AsyncElasticsearch
+    :param query: Elasticsearch query (optional)
+    :type query: dict
+    :param scroll: time the scroll context is kept alive between requests
+    :type scroll: string
+    :param size: number of documents per request (and shard)
+    :type size: integer
+    :param kwargs: extra arguments passed to the `search` request (e.g. `index`)
+    :return: the Elasticsearch documents
+    :rtype: async iterator
+    """
+    query = dict(query or {})
+    query.setdefault('sort', '_doc')
+
+    response = await client.search(body=query, scroll=scroll, size=size, **kwargs)
+    scroll_id = response.get('_scroll_id')
+    try:
+        while scroll_id and response['hits']['hits']:
+            for hit in response['hits']['hits']:
+                yield hit
+            response = await client.scroll(scroll_id=scroll_id, scroll=scroll)
+            scroll_id = response.get('_scroll_id')
+    finally:
+        if scroll_id:
+            await client.clear_scroll(body={'scroll_id': [scroll_id]}, ignore=(404,))
+
+
+async def search_after(client, query=None, sort=('_uid',), size=1000, prefetch=0, **kwargs):
+    """
+    Iterate over all the documents matching the query with `search_after` pagination.
+    Unlike `scan`, no search context is kept open on the cluster and the documents
+    are returned in the given sort order.
+
+    :param client: instance of AsyncElasticsearch
+    :param query: Elasticsearch query (optional)
+    :type query: dict
+    :param sort: sort clauses. The last one must be unique per document (e.g. `_uid`)
+    :type sort: sequence
+    :param size: number of documents per request
+    :type size: integer
+    :param prefetch: number of pages requested from a background task ahead of the one
+                     being consumed. If 0, each page is requested when the previous one
+                     has been consumed
+    :type prefetch: integer
+    :param kwargs: extra arguments passed to the `search` request (e.g. `index`)
+    :return: the Elasticsearch documents
+    :rtype: async iterator
+    """
+    pages = _search_after_pages(client, query, sort, size, **kwargs)
+    if prefetch > 0:
+        pages = read_ahead(pages, prefetch)
+
+    async for page in pages:
+        for hit in page:
+            yield hit
+
+
+async def _search_after_pages(client, query, sort, size, **kwargs):
+    body = dict(query or {}, sort=list(sort), size=size)
+
+    while True:
+        response = await client.search(body=body, **kwargs)
+        hits = response['hits']['hits']
+        yield hits
+        if len(hits) < size:
+            return
+        body = dict(body, search_after=hits[-1]['sort'])
+
+
+async def read_ahead(iterator, size):
+    """
+    Asynchronous equivalent of `dmsclient.utils.read_ahead`. Iterate over `iterator`
+    from a background task, which keeps up to `size` items ready ahead of the consumer.
+
+    :param iterator: the async iterator
+    :param size: maximum number of items kept ready
+    :type size: integer
+    :return: the items of `iterator`
+    :rtype: async iterator
+    """
+    items = asyncio.Queue(size)
+    end = object()
+
+    async def produce():
+        try:
+            async for item in iterator:
+                await items.put((item, False))
+            await items.put((end, False))
+        except Exception as e:
+            await items.put((e, True))
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, failed = await items.get()
+            if failed:
+                raise item
+            if item is end:
+                return
+            yield item
+    finally:
+        task.cancel()
+
+
+async def streaming_bulk(client, actions, chunk_size=500, max_chunk_bytes=100 * 1024 * 1024, **kwargs):
+    """
+    Asynchronous equivalent of `elasticsearch.helpers.streaming_bulk` with
+    `raise_on_error=False` and `raise_on_exception=False`: errors are reported
+    per action instead of being raised.
+
+    :param client: instance of AsyncElasticsearch
+    :param actions: the bulk actions, in the format accepted by `elasticsearch.helpers.bulk`
+    :type actions: iterable
+    :param chunk_size: maximum number of actions per request
+    :type chunk_size: integer
+    :param max_chunk_bytes: maximum size in bytes of a request
+    :type max_chunk_bytes: integer
+    :param kwargs: extra arguments passed to the `bulk` request (e.g. `params`)
+    :return: a tuple `(ok, item)` per action, in the same order as `actions`
+    :rtype: async iterator
+    """
+    for chunk in _chunk_actions(client.transport.serializer, actions, chunk_size, max_chunk_bytes):
+        try:
+            response = await client.bulk('\n'.join(line for _, lines in chunk for line in lines) + '\n', **kwargs)
+            items = response['items']
+        except TransportError as e:
+            # The whole request failed, report every action of the chunk as failed
+            items = []
+            for (op_type, metadata), _ in chunk:
+                info = dict(metadata, status=e.status_code if isinstance(e.status_code, int) else 500,
+                            error=str(e))
+                items.append({op_type: info})
+
+        for item in items:
+            _, info = next(iter(item.items()))
+            yield 200 <= info.get('status', 500) < 300, item
+
+
+def _chunk_actions(serializer, actions, chunk_size, max_chunk_bytes):
+    chunk = []
+    size = 0
+    for action in actions:
+        action, data = expand_action(action)
+        op_type, metadata = next(iter(action.items()))
+        lines = [serializer.dumps(action)]
+        if data is not None:
+            lines.append(serializer.dumps(data))
+        action_size = sum(len(line.encode('utf-8')) + 1 for line in lines)
+
+        if chunk and (len(chunk) == chunk_size or size + action_size > max_chunk_bytes):
+            yield chunk
+            chunk = []
+            size = 0
+
+        chunk.append(((op_type, metadata), lines))
+        size += action_size
+
+    if chunk:
+        yield chunk
@@ -0,0 +1,63 @@
+from dmsclient.models import StrEnum
+
+
+class BulkResult(object):
+    """
+    Represents the outcome of a single document sent in a bulk request.
+
+    :param doc_id: the document ID
+    :param status: the status of the operation (see `BulkResult.Status`)
+    :param document: the document object sent in the request (optional)
+    :param error: the error returned by Elasticsearch, if any (optional)
+    :param index: the index the document was written to (optional)
+    """
+
+    class Status(StrEnum):
+        CREATED = 'created'
+        UPDATED = 'updated'
+        CONFLICT = 'conflict'
+        NOT_FOUND = 'not_found'
+        ERROR = 'error'
+
+    def __init__(self, doc_id, status, document=None, error=None, index=None):
+        self.doc_id = doc_id
+        self.status = BulkResult.Status(status)
+        self.document = document
+        self.error = error
+        self.index = index
+
+    @property
+    def ok(self):
+        return self.status in (BulkResult.Status.CREATED, BulkResult.Status.UPDATED)
+
+    @classmethod
+    def from_elasticsearch(cls, item, document=None):
+        """
+        Create a result object from an item of the `items` list returned by
+        the Elasticsearch `_bulk` endpoint.
+
+        :param item: the bulk response item (e.g. {'create': {'_id': ..., 'status': 201}})
+        :type item: dict
+        :param document: the document object sent in the request
+        :return: a BulkResult object
+        """
+        _, info = next(iter(item.items()))
+        status_code = info.get('status', 500)
+        if not isinstance(status_code, int):
+            # Transport errors are reported with a status such as 'N/A'
+            status_code = 500
+
+        if 200 <= status_code < 300:
+            status = cls.Status.CREATED if status_code == 201 else cls.Status.UPDATED
+        elif status_code == 409:
+            status = cls.Status.CONFLICT
+        elif status_code == 404:
+            status = cls.Status.NOT_FOUND
+        else:
+            status = cls.Status.ERROR
+
+        doc_id = info.get('_id', document.id if document is not None else None)
+        return cls(doc_id, status, document=document, error=info.get('error'), index=info.get('_index'))
+
+    def __str__(self):
+        return "%s(ID='%s', status='%s')" % (self.__class__.__name__, self.doc_id, self.status.value)
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    Thread-safe least-recently-used cache with an optional time-to-live for
+    its entries. Hit and miss counters are kept to report the cache efficiency.
+
+    :param int maxsize: maximum number of entries. The least recently used entry is
+                        evicted when the cache is full
+    :param float ttl: number of seconds an entry stays valid after being set. If None,
+                      entries never expire (optional)
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        if maxsize <= 0:
+            raise ValueError('Cache size must be a positive integer')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for the given key, or `default` if the key is
+        not cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Store a value for the given key, evicting the least recently used entry
+        if the cache is full.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Remove the given key from the cache, if present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Remove the entries whose key satisfies the given predicate.
+
+        :param predicate: function receiving a key and returning True if it must be removed
+        """
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Remove all the entries from the cache. Counters are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        :return: a dict with the `size`, `hits`, `misses`, `evictions` and `hit_rate` keys
+        :rtype: dict
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._entries)
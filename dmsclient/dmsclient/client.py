@@ -1,30 +1,51 @@
+import importlib
+import json
 import logging
+import os
+import threading
+from contextlib import contextmanager
 from datetime import timedelta, datetime
 
-from elasticsearch import Elasticsearch
-from uhashring import HashRing
-
-from dmsclient.controllers.asdmoutput import AsdmOutputController
-from dmsclient.controllers.cartridges import CartridgeController
-from dmsclient.controllers.clusters import ClusterController
-from dmsclient.controllers.journals import JournalController
-from dmsclient.controllers.drives import DriveController
-from dmsclient.controllers.readers import ReaderController
-from dmsclient.controllers.usbreaders import USBReaderController
-from dmsclient.controllers.scenarios import ScenarioController
-from dmsclient.controllers.segments import SegmentController
-from dmsclient.controllers.sensors import SensorController
+from dmsclient.cache import LRUCache
 from dmsclient.exceptions import DMSClientException
-from dmsclient.mappings import MAPPINGS
+from dmsclient.scripts import SCRIPTS
+from dmsclient.utils import write_json_atomic
+
+# The Elasticsearch client, the controllers, the models and the hash ring are imported
+# when they are first used, so importing this module stays cheap for short-lived tools
 
 logger = logging.getLogger('dmsclient')
 
 
+class LazyController(object):
+    """
+    Descriptor that creates a controller of the client on first access and attaches it
+    to the client instance, importing the controller module only then.
+
+    :param string module: the module of the controller class
+    :param string name: the name of the controller class
+    :param string attribute: the name of the client attribute
+    """
+
+    def __init__(self, module, name, attribute):
+        self.module = module
+        self.name = name
+        self.attribute = attribute
+
+    def __get__(self, client, owner=None):
+        if client is None:
+            return self
+        controller_class = getattr(importlib.import_module(self.module), self.name)
+        # Concurrent first accesses get the same controller
+        return client.__dict__.setdefault(self.attribute, controller_class(client))
+
+
 class DMSClient(object):
     """
     Client for the DMS and wrapper for the Elasticsearch client.
 
-    :param string es_endpoint: Elasticsearch endpoint.
+    :param es_endpoint: Elasticsearch endpoint, or list of endpoints (also as a comma-separated
+                        string). Requests are balanced across the endpoints.
     :param string es_user: Elasticsearch user.
     :param string es_password: Elasticsearch password.
     :param bool create_templates: Create the Elasticsearch templates when instantiated (optional).
@@ -32,104 +53,566 @@ class DMSClient(object):
                                   If True, the client will fail if any template is not created (optional).
     :param bool initial_sync: Obtain the cluster configuration when instanted. If False, the client
                               will defer the sync until there is a request (optional).
+    :param string refresh: Default refresh policy for write requests. One of `true` (refresh the
+                           affected shards immediately), `wait_for` (wait for the next scheduled
+                           refresh) or `false` (do not refresh) (optional).
+    :param int index_cache_size: Maximum number of document IDs whose concrete index is
+                                 remembered to fetch them with a direct GET (optional).
+    :param timedelta index_cache_ttl: Time a document ID to index resolution is kept (optional).
+    :param int document_cache_size: Maximum number of documents kept in memory by `get` and
+                                    `get_many`. Writes made through this client update or
+                                    invalidate the cached documents, but writes made by other
+                                    clients are only seen after `document_cache_ttl`.
+                                    Disabled if 0 (optional).
+    :param timedelta document_cache_ttl: Time a document is kept in memory (optional).
+    :param bool deterministic_placement: Place time-based documents in the monthly index of the
+                                         start timestamp included in their ID, instead of the
+                                         current month. Creating those documents does not need
+                                         to search for an existing document with the same ID, and
+                                         they are fetched with a direct GET. Only enable it if all
+                                         the documents were created with this option (optional).
+    :param int maxsize: Maximum number of connections kept open to each node. Should not be lower
+                        than the number of threads sharing the client (optional).
+    :param float timeout: Request timeout in seconds (optional).
+    :param bool keep_alive: Enable TCP keep-alive on the connections (optional).
+    :param bool sniff_on_start: Obtain the list of nodes from the cluster when instantiated (optional).
+    :param float sniffer_timeout: Seconds between periodic refreshes of the list of nodes. If None,
+                                  the list is not refreshed periodically (optional).
+    :param bool sniff_on_connection_fail: Refresh the list of nodes when a node fails (optional).
+    :param bool http_compress: Compress the request and response bodies with gzip (optional).
+    :param bool background_sync: Keep the cluster configuration up to date from a background
+                                 thread, so requests never wait for a sync (optional).
+    :param timedelta sync_interval: Time between two syncs of the cluster configuration (optional).
+    :param string ring_cache_file: Local file where a snapshot of the cluster configuration is kept.
+                                   If it exists, the initial sync is replaced by the snapshot and the
+                                   configuration is revalidated in the background (optional).
+    :param bool lazy: Defer the creation and verification of the templates and the initial sync
+                      until the first request, or an explicit call to `ensure_initialized` (optional).
+    :param string template_cache_file: Local file where the fingerprint of the templates and scripts
+                                       verified or created on each endpoint is kept. While it matches
+                                       `dmsclient.mappings.MAPPINGS` and `dmsclient.scripts.SCRIPTS`,
+                                       the templates are neither verified nor created again (optional).
     :raises dmsclient.exceptions.DMSClientException: if there is any error related to the DMS
     """
 
     SYNC_INTERVAL = timedelta(minutes=10)
+    REFRESH_POLICIES = ('true', 'wait_for', 'false')
+    INDEX_CACHE_SIZE = 10000
+    INDEX_CACHE_TTL = timedelta(hours=1)
+    DOCUMENT_CACHE_TTL = timedelta(minutes=5)
+    CONNECTION_POOL_SIZE = 25
+    REQUEST_TIMEOUT = 10
+
+    readers = LazyController('dmsclient.controllers.readers', 'ReaderController', 'readers')
+    usbreaders = LazyController('dmsclient.controllers.usbreaders', 'USBReaderController', 'usbreaders')
+    cartridges = LazyController('dmsclient.controllers.cartridges', 'CartridgeController', 'cartridges')
+    clusters = LazyController('dmsclient.controllers.clusters', 'ClusterController', 'clusters')
+    journals = LazyController('dmsclient.controllers.journals', 'JournalController', 'journals')
+    drives = LazyController('dmsclient.controllers.drives', 'DriveController', 'drives')
+    segments = LazyController('dmsclient.controllers.segments', 'SegmentController', 'segments')
+    sensors = LazyController('dmsclient.controllers.sensors', 'SensorController', 'sensors')
+    scenarios = LazyController('dmsclient.controllers.scenarios', 'ScenarioController', 'scenarios')
+    asdmoutput = LazyController('dmsclient.controllers.asdmoutput', 'AsdmOutputController', 'asdmoutput')
 
     def __init__(self, es_endpoint, es_user, es_password,
-                 create_templates=False, verify_templates=True, initial_sync=True):
+                 create_templates=False, verify_templates=True, initial_sync=True, refresh='true',
+                 index_cache_size=INDEX_CACHE_SIZE, index_cache_ttl=INDEX_CACHE_TTL,
+                 document_cache_size=0, document_cache_ttl=DOCUMENT_CACHE_TTL,
+                 deterministic_placement=False,
+                 maxsize=CONNECTION_POOL_SIZE, timeout=REQUEST_TIMEOUT, keep_alive=True,
+                 sniff_on_start=False, sniffer_timeout=None, sniff_on_connection_fail=False,
+                 http_compress=False, background_sync=False, sync_interval=SYNC_INTERVAL,
+                 ring_cache_file=None, lazy=False, template_cache_file=None):
+        from elasticsearch import Elasticsearch
+        from dmsclient.connection import DMSConnection
+
         logger.info('Connecting to Elasticsearch backend')
 
+        self.refresh = self._normalize_refresh(refresh)
+        self._local = threading.local()
+        self.index_cache = LRUCache(index_cache_size, index_cache_ttl.total_seconds())
+        self.document_cache = None
+        if document_cache_size:
+            self.document_cache = LRUCache(document_cache_size, document_cache_ttl.total_seconds())
+        self.deterministic_placement = deterministic_placement
+
+        endpoints = self._parse_endpoints(es_endpoint)
+        self._endpoints = ','.join(sorted(endpoints))
         self.elasticsearch = Elasticsearch(
-            [es_endpoint],
+            endpoints,
             http_auth=(es_user, es_password),
-            verify_certs=False
+            verify_certs=False,
+            connection_class=DMSConnection,
+            maxsize=maxsize,
+            timeout=timeout,
+            keep_alive=keep_alive,
+            http_compress=http_compress,
+            # Nodes found by sniffing are contacted with the scheme of the endpoints
+            use_ssl=all(e.startswith('https://') for e in endpoints),
+            sniff_on_start=sniff_on_start,
+            sniffer_timeout=sniffer_timeout,
+            sniff_on_connection_fail=sniff_on_connection_fail,
+            retry_on_timeout=len(endpoints) > 1
         )
 
-        self.readers = ReaderController(self)
-        self.usbreaders = USBReaderController(self)
-        self.cartridges = CartridgeController(self)
-        self.clusters = ClusterController(self)
-        self.journals = JournalController(self)
-        self.drives = DriveController(self)
-        self.segments = SegmentController(self)
-        self.sensors = SensorController(self)
-        self.scenarios = ScenarioController(self)
-        self.asdmoutput = AsdmOutputController(self)
-
         self.last_sync = datetime.min
+        self.sync_interval = sync_interval
+        self.ring = None
+        self.ring_cache_file = ring_cache_file
+        self._revalidate_thread = None
+        self._sync_lock = threading.Lock()
+        self._sync_thread = None
+        self._sync_stop = None
+        self._topology_listeners = []
+
+        self.template_cache_file = template_cache_file
+        self._create_templates = create_templates
+        self._verify_templates = verify_templates
+        self._initial_sync = initial_sync
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+        if lazy:
+            logger.info('Deferring initialization until the first request')
+        else:
+            self.ensure_initialized()
+
+        if background_sync:
+            self.start_background_sync()
 
-        if create_templates:
+    def ensure_initialized(self):
+        """
+        Create and verify the templates and obtain the cluster configuration, as configured
+        in the constructor. Only the first call does anything; it is made by the constructor,
+        or by the first request if the client is lazy.
+
+        :raises dmsclient.exceptions.DMSClientException: if a template is missing or there is no cluster configured
+        """
+        if self._initialized:
+            return
+
+        with self._init_lock:
+            if self._initialized:
+                return
+
+            self._setup_templates()
+
+            if self._initial_sync:
+                self.ring = self._read_ring_snapshot()
+                if self.ring is not None:
+                    self.last_sync = datetime.now()
+                    self._revalidate_thread = threading.Thread(target=self._revalidate_ring,
+                                                               name='dmsclient-revalidate', daemon=True)
+                    self._revalidate_thread.start()
+                else:
+                    self.sync_cluster_config()
+            else:
+                logger.info('Skipping initial sync')
+
+            self._initialized = True
+
+    def _setup_templates(self):
+        if not self._create_templates and not self._verify_templates:
+            logger.info('Skipping template creation and verification')
+            return
+
+        fingerprint = self.templates_fingerprint()
+        if self._read_template_cache().get(self._endpoints) == fingerprint:
+            logger.info('Templates unchanged since they were last verified, skipping')
+            return
+
+        if self._create_templates:
             self.create_templates()
         else:
             logger.info('Skipping template creation')
 
-        if verify_templates:
+        if self._verify_templates:
             self.verify_templates()
         else:
             logger.info('Skipping template verification')
 
-        if initial_sync:
-            self.sync_cluster_config()
+        self._save_template_cache(fingerprint)
+
+    @staticmethod
+    def templates_fingerprint():
+        """
+        Return a digest of the templates in `dmsclient.mappings.MAPPINGS` and the scripts
+        in `dmsclient.scripts.SCRIPTS`, which changes whenever any of them is modified.
+
+        :return: the hexadecimal digest
+        :rtype: string
+        """
+        import hashlib
+        from dmsclient.mappings import MAPPINGS
+
+        content = json.dumps({'mappings': MAPPINGS, 'scripts': SCRIPTS}, sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def _read_template_cache(self):
+        if not self.template_cache_file or not os.path.exists(self.template_cache_file):
+            return {}
+        try:
+            with open(self.template_cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring the template cache '%s'. %s" % (self.template_cache_file, str(e)))
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def forget_templates(self):
+        """
+        Remove the fingerprint of the endpoints of this client from the template cache file,
+        so the next client verifies (or creates) the templates again. It should be called
+        after the templates are deleted from Elasticsearch.
+        """
+        self._save_template_cache(None)
+
+    def _save_template_cache(self, fingerprint):
+        if not self.template_cache_file:
+            return
+        cache = self._read_template_cache()
+        if fingerprint is None:
+            cache.pop(self._endpoints, None)
         else:
-            logger.info('Skipping initial sync')
+            cache[self._endpoints] = fingerprint
+        try:
+            write_json_atomic(self.template_cache_file, cache)
+        except OSError as e:
+            logger.warning("Could not save the template cache to '%s'. %s" % (self.template_cache_file, str(e)))
+
+    @staticmethod
+    def _parse_endpoints(es_endpoint):
+        if isinstance(es_endpoint, str):
+            es_endpoint = es_endpoint.split(',')
+        endpoints = [e.strip() for e in es_endpoint if e.strip()]
+        if not endpoints:
+            raise ValueError('At least one Elasticsearch endpoint is required')
+        return endpoints
+
+    @classmethod
+    def _normalize_refresh(cls, refresh):
+        if isinstance(refresh, bool):
+            refresh = 'true' if refresh else 'false'
+        if refresh not in cls.REFRESH_POLICIES:
+            raise ValueError("Refresh policy must be one of %s" % (cls.REFRESH_POLICIES,))
+        return refresh
+
+    def refresh_params(self, index, refresh=None, by_query=False):
+        """
+        Return the `refresh` request parameter to be used for a write request on
+        the given index.
+
+        The per-call `refresh` value takes precedence. Otherwise, writes made inside
+        a `batch()` session are not refreshed and the index is recorded to be refreshed
+        when the session ends. Outside of a session the client default is used.
+
+        :param string index: the index (or index pattern) affected by the write
+        :param refresh: per-call refresh policy (optional)
+        :param bool by_query: whether the request is an `update_by_query` or `delete_by_query`
+                              request, which do not support `wait_for`
+        :return: the request parameters
+        :rtype: dict
+        """
+        batch = getattr(self._local, 'batch', None)
+
+        if refresh is not None:
+            refresh = self._normalize_refresh(refresh)
+        elif batch is not None:
+            batch.add(index)
+            refresh = 'false'
+        else:
+            refresh = self.refresh
+
+        if by_query and refresh == 'wait_for':
+            refresh = 'true'
+        return {'refresh': refresh}
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that suppresses the refresh of every write made through the
+        controllers in the current thread and issues a single refresh of the touched
+        indices on exit. Writes made by other threads are not affected.
+
+        Documents written inside the session might not be visible to searches (e.g.
+        `get` or `find_by_fields`) until the session ends.
+
+        Example:
+
+        with client.batch():
+            for segment_id in segment_ids:
+                client.segments.set_state(segment_id, 'completed')
+        """
+        if getattr(self._local, 'batch', None) is not None:
+            # Nested session, the outermost one will refresh
+            yield
+            return
+
+        self._local.batch = set()
+        try:
+            yield
+        except BaseException:
+            # Refresh the writes made so far, without hiding the original error
+            try:
+                self._end_batch()
+            except DMSClientException as e:
+                logger.warning('Could not refresh the indices of the batch. %s' % (str(e),))
+            raise
+        self._end_batch()
+
+    def _end_batch(self):
+        indices = self._local.batch
+        self._local.batch = None
+        if indices:
+            from elasticsearch import ElasticsearchException
+
+            logger.debug('Refreshing indices %s' % (sorted(indices),))
+            try:
+                self.elasticsearch.indices.refresh(index=','.join(sorted(indices)),
+                                                   ignore_unavailable=True)
+            except ElasticsearchException as e:
+                raise DMSClientException.from_exception(e)
+
+    def cache_stats(self):
+        """
+        Return the statistics of the index and document caches.
+
+        :return: a dict with the `index` and `document` cache stats (see
+                 `dmsclient.cache.LRUCache.stats`). The `document` value is None if
+                 the document cache is disabled
+        :rtype: dict
+        """
+        return {
+            'index': self.index_cache.stats(),
+            'document': self.document_cache.stats() if self.document_cache is not None else None
+        }
+
+    def connection_stats(self):
+        """
+        Return the statistics of the connections to the Elasticsearch nodes.
+
+        :return: a dict with the number of `live` and `dead` nodes and the counters of
+                 each node under `connections` (see `dmsclient.connection.DMSConnection.stats`)
+        :rtype: dict
+        """
+        pool = self.elasticsearch.transport.connection_pool
+        connections = getattr(pool, 'orig_connections', pool.connections)
+        stats = []
+        for connection in connections:
+            connection_stats = connection.stats()
+            connection_stats['alive'] = connection in pool.connections
+            stats.append(connection_stats)
+        return {
+            'live': len(pool.connections),
+            'dead': len(connections) - len(pool.connections),
+            'connections': stats
+        }
 
     def create_templates(self):
         """
-        Create the templates configured in `dmsclient.mappings.MAPPINGS`.
+        Create the templates configured in `dmsclient.mappings.MAPPINGS` and the stored
+        scripts configured in `dmsclient.scripts.SCRIPTS`.
         """
+        from dmsclient.mappings import MAPPINGS
+
         for template, mappings in MAPPINGS.items():
             logger.info("Creating template '%s'..." % (template,))
             self.elasticsearch.indices.put_template(template, body=mappings)
 
+        for script_id in SCRIPTS.keys():
+            self.create_script(script_id)
+
+    def create_script(self, script_id):
+        """
+        Store a script configured in `dmsclient.scripts.SCRIPTS` in Elasticsearch.
+
+        :param string script_id: the ID of the script
+        """
+        from elasticsearch.client.utils import _make_path
+
+        logger.info("Creating script '%s'..." % (script_id,))
+        self.elasticsearch.transport.perform_request('PUT', _make_path('_scripts', script_id), body={
+            'script': {
+                'lang': 'painless',
+                'source': SCRIPTS[script_id]
+            }
+        })
+
     def verify_templates(self):
         """
-        Verify that the template names are available in Elasticsearch.
+        Verify that the template names and the stored scripts are available in Elasticsearch.
+        Missing scripts (e.g. added by a newer version of the library) are created. If they
+        cannot be created, a warning is logged and the updates using them will fail.
 
         :raises dmsclient.exceptions.DMSClientException: if a template does not exist in Elasticsearch
         """
+        from elasticsearch import ElasticsearchException, NotFoundError
+        from elasticsearch.client.utils import _make_path
+        from dmsclient.mappings import MAPPINGS
+
         for template in MAPPINGS.keys():
             logger.info("Verifying template '%s'..." % (template,))
             if not self.elasticsearch.indices.exists_template(template):
                 raise DMSClientException("Template '%s' does not exist in Elasticsearch" % (template, ))
 
+        for script_id in SCRIPTS.keys():
+            logger.info("Verifying script '%s'..." % (script_id,))
+            try:
+                self.elasticsearch.transport.perform_request('GET', _make_path('_scripts', script_id))
+            except NotFoundError:
+                try:
+                    self.create_script(script_id)
+                except ElasticsearchException as e:
+                    logger.warning("Script '%s' does not exist in Elasticsearch and could not be created. %s"
+                                   % (script_id, str(e)))
+
     def sync_cluster_config(self, force=False):
         """
         Obtain the latest cluster configuration from Elasticsearch and update the hash ring.
          This method is called every time there is an operation that requires communication
          with Elasticsearch. However, it will only synchronize the cluster configuration if
-         the time elapsed since the last sync is greater than `SYNC_INTERVAL` or the `force`
-         parameter is set to `True`.
+         the time elapsed since the last sync is greater than `sync_interval` or the `force`
+         parameter is set to `True`. If the background sync is running, the configuration is
+         only synchronized here if it has never been obtained.
+
+         Concurrent calls wait for a single sync instead of sending one request each. The ring
+         is only rebuilt if the Cluster documents changed since the last sync.
 
         :param bool force: Force synchronization regardless of the time elapsed since last sync
         :raises dmsclient.exceptions.DMSClientException: if there is no cluster configured in Elasticsearch
         """
-        if not force and ((datetime.now() - self.last_sync) < self.SYNC_INTERVAL):
-            return
+        if not force:
+            if self._sync_thread is not None and self.ring is not None:
+                return
+            if (datetime.now() - self.last_sync) < self.sync_interval:
+                return
+
+        from dmsclient.ring import ClusterRing
+
+        last_sync = self.last_sync
+        with self._sync_lock:
+            if not force and self.last_sync != last_sync:
+                # Another thread synced while we were waiting
+                return
 
-        logger.debug('Syncing cluster configuration')
-        nodes_ring = {}
+            logger.debug('Syncing cluster configuration')
+
+            try:
+                clusters = list(self.clusters.get_all_versioned())
+            except Exception as e:
+                raise DMSClientException("Could not obtain cluster configuration. %s" % (str(e),))
+
+            logger.debug('Obtained %d clusters from Elasticsearch' % (len(clusters),))
+
+            ring = self.ring
+            if ring is None or ring.version != ClusterRing.fingerprint(clusters):
+                self.ring = ClusterRing(clusters)
+                self._save_ring_snapshot(self.ring)
+                self._notify_topology_change(ring, self.ring)
+            self.last_sync = datetime.now()
+
+    def _read_ring_snapshot(self):
+        if not self.ring_cache_file or not os.path.exists(self.ring_cache_file):
+            return None
+
+        from dmsclient.ring import ClusterRing
 
         try:
-            clusters = self.clusters.get_all()
-            for cluster in clusters:
-                if not cluster.available:
-                    continue
-                nodes_ring[cluster.cluster_id] = {
-                    'instance': cluster,
-                    'weight': cluster.weight
-                }
+            ring = ClusterRing.load(self.ring_cache_file)
+        except DMSClientException as e:
+            logger.warning('Ignoring the ring snapshot. %s' % (str(e),))
+            return None
+        logger.info("Loaded cluster configuration from '%s': %s" % (self.ring_cache_file, ring))
+        return ring
+
+    def _save_ring_snapshot(self, ring):
+        if not self.ring_cache_file:
+            return
+        try:
+            ring.save(self.ring_cache_file)
+        except OSError as e:
+            logger.warning("Could not save the ring snapshot to '%s'. %s" % (self.ring_cache_file, str(e)))
+
+    def _revalidate_ring(self):
+        try:
+            self.sync_cluster_config(force=True)
         except Exception as e:
-            raise DMSClientException("Could not obtain cluster configuration. %s" % (str(e),))
+            logger.warning('Could not revalidate the ring snapshot. %s' % (str(e),))
+
+    def add_topology_listener(self, listener):
+        """
+        Register a function to be called when the cluster configuration changes. The
+        function receives the previous :class:`dmsclient.ring.ClusterRing` (None on the
+        first sync) and the new one. It is called from the thread performing the sync.
+
+        :param listener: the function to be called
+        """
+        self._topology_listeners.append(listener)
+
+    def remove_topology_listener(self, listener):
+        """
+        Unregister a function registered with `add_topology_listener`.
+
+        :param listener: the function to be removed
+        """
+        self._topology_listeners.remove(listener)
 
-        logger.debug('Obtained %d clusters from Elasticsearch' % (len(nodes_ring),))
+    def _notify_topology_change(self, old_ring, new_ring):
+        logger.info('Cluster configuration changed: %s' % (new_ring,))
+        for listener in list(self._topology_listeners):
+            try:
+                listener(old_ring, new_ring)
+            except Exception:
+                logger.exception('Error in topology listener')
 
-        if len(nodes_ring) == 0:
-            raise DMSClientException('There are no available cluster configured in Elasticsearch')
+    def start_background_sync(self):
+        """
+        Start a daemon thread that synchronizes the cluster configuration every
+        `sync_interval`. Requests do not sync the configuration while it runs.
+        """
+        if self._sync_thread is not None:
+            return
 
-        self.hashring = HashRing(nodes=nodes_ring)
-        self.last_sync = datetime.now()
+        self._sync_stop = threading.Event()
+        self._sync_thread = threading.Thread(target=self._background_sync,
+                                             args=(self._sync_stop,),
+                                             name='dmsclient-sync',
+                                             daemon=True)
+        self._sync_thread.start()
+
+    def stop_background_sync(self):
+        """
+        Stop the thread started by `start_background_sync` and wait for it to finish.
+        """
+        if self._sync_thread is None:
+            return
+
+        self._sync_stop.set()
+        self._sync_thread.join()
+        self._sync_thread = None
+
+    def _background_sync(self, stop):
+        while not stop.wait(self.sync_interval.total_seconds()):
+            try:
+                self.sync_cluster_config(force=True)
+            except Exception as e:
+                # Keep the current ring, the next iteration will try again
+                logger.warning('Background sync of the cluster configuration failed. %s' % (str(e),))
+
+    def close(self):
+        """
+        Stop the background sync and close the connections to Elasticsearch.
+        """
+        self.stop_background_sync()
+        self.elasticsearch.transport.close()
+
+    @property
+    def hashring(self):
+        """
+        The hash ring of the current cluster configuration, or None if it has not been synced.
+        """
+        ring = self.ring
+        return ring.hashring if ring is not None else None
 
     def get_cluster(self, key):
         """
@@ -138,8 +621,29 @@ class DMSClient(object):
         :param key: the key to look for, normally, the drive ID.
         :return: a cluster object
         :rtype: :py:class:`dmsclient.models.cluster.Cluster`
+        :raises dmsclient.exceptions.DMSClientException: if the cluster configuration has not been synced
+        """
+        return self._current_ring().get_cluster(key)
+
+    def placement(self, keys):
         """
-        return self.hashring.get_node_instance(key)
+        Return the cluster each of the given keys is placed on, using the current cluster
+        configuration and without sending any request to Elasticsearch. To answer without a
+        client, load a snapshot with `dmsclient.ring.ClusterRing.load` and use its `placement`.
+
+        :param keys: the keys to look for, normally, drive IDs
+        :type keys: iterable
+        :return: the cluster objects by key, in the same order as `keys`
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if the cluster configuration has not been synced
+        """
+        return self._current_ring().placement(keys)
+
+    def _current_ring(self):
+        ring = self.ring
+        if ring is None:
+            raise DMSClientException('The cluster configuration has not been synced')
+        return ring
 
     def get_index(self, index_pattern, doc_type, **fields):
         """
@@ -167,6 +671,8 @@ class DMSClient(object):
         docs = result['hits']['hits']
         if len(docs) == 1:
             index = docs[0]['_index']
+            # Only the index of the document ID is cached, so it is dropped when the document is deleted
+            self.index_cache.set((doc_type, docs[0]['_id']), index)
             return index
         else:
             message = '"found":false'
@@ -0,0 +1,214 @@
+import datetime
+import sys
+from array import array
+from collections import OrderedDict
+
+from dmsclient.exceptions import DMSClientException
+from dmsclient.utils import str_to_datetime
+
+NUMERIC_TYPES = frozenset(['long', 'integer', 'short', 'byte', 'double', 'float', 'half_float', 'scaled_float'])
+DATE_TYPE = 'date'
+KEYWORD_TYPE = 'keyword'
+DOCVALUE_TYPES = NUMERIC_TYPES | {DATE_TYPE, KEYWORD_TYPE}
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def field_types(model_class):
+    """
+    Return the mapping type of each field of the documents of a model, as defined in
+    `dmsclient.mappings`.
+
+    :param model_class: the model class
+    :return: the types by field name
+    :rtype: dict
+    """
+    from dmsclient.mappings import MAPPINGS
+
+    for template in MAPPINGS.values():
+        mapping = template.get('mappings', {}).get(model_class.DOC_TYPE)
+        if mapping is not None:
+            return {name: field.get('type') for name, field in mapping.get('properties', {}).items()}
+    return {}
+
+
+class ColumnBatch(object):
+    """
+    The values of some fields of a set of documents, stored by field instead of by
+    document:
+
+    - numeric fields: an `array.array` of floats, NaN when the value is missing
+    - date fields: an `array.array` of milliseconds since the epoch, NaN when missing
+    - keyword fields: a list of interned strings, None when missing
+    - other fields: a list of the values of the `_source`
+
+    Multi-valued numeric and date fields keep their first value, other fields a list of
+    their values. The IDs of the documents are in `ids`.
+
+    :param types: the mapping type by field name, in column order. Fields without
+                  type are read from the `_source`
+    :type types: collections.OrderedDict
+    """
+
+    def __init__(self, types):
+        self.types = types
+        self.ids = []
+        self.columns = OrderedDict((name, array('d') if self._numeric(kind) else [])
+                                   for name, kind in types.items())
+
+    @classmethod
+    def for_model(cls, model_class, columns):
+        """
+        Return an empty batch with the given fields of a model.
+
+        :param model_class: the model class
+        :param columns: the field names
+        :type columns: list
+        :rtype: :class:`dmsclient.columns.ColumnBatch`
+        """
+        types = field_types(model_class)
+        return cls(OrderedDict((name, types.get(name)) for name in columns))
+
+    def projection(self):
+        """
+        Return the `_source` filtering and the `docvalue_fields` of a search returning
+        only the fields of the batch. Fields with doc values are read from them.
+
+        :return: the `_source` filtering and the doc value fields
+        :rtype: tuple
+        """
+        docvalue_fields = [name for name, kind in self.types.items() if kind in DOCVALUE_TYPES]
+        source = [name for name, kind in self.types.items() if kind not in DOCVALUE_TYPES]
+        return source or False, docvalue_fields
+
+    def empty(self):
+        """
+        Return an empty batch with the same fields.
+
+        :rtype: :class:`dmsclient.columns.ColumnBatch`
+        """
+        return self.__class__(self.types)
+
+    def append(self, hit):
+        """
+        Add the values of a document returned by a search.
+
+        :param hit: the Elasticsearch document
+        :type hit: dict
+        """
+        fields = hit.get('fields', {})
+        source = hit.get('_source', {})
+
+        self.ids.append(hit['_id'])
+        for name, kind in self.types.items():
+            if name in fields:
+                values = fields[name]
+                value = values[0] if len(values) == 1 else values or None
+            else:
+                value = source.get(name)
+
+            if kind == DATE_TYPE:
+                self.columns[name].append(self._date_millis(value))
+            elif kind in NUMERIC_TYPES:
+                self.columns[name].append(self._number(value))
+            elif kind == KEYWORD_TYPE and isinstance(value, str):
+                self.columns[name].append(sys.intern(value))
+            else:
+                self.columns[name].append(value)
+
+    def extend(self, batch):
+        """
+        Add the documents of another batch with the same fields.
+
+        :param batch: the other batch
+        :type batch: :class:`dmsclient.columns.ColumnBatch`
+        """
+        if batch.types != self.types:
+            raise ValueError('Cannot extend a batch with a batch of different fields')
+        self.ids.extend(batch.ids)
+        for name, values in self.columns.items():
+            values.extend(batch.columns[name])
+
+    @classmethod
+    def concat(cls, batches):
+        """
+        Return a batch with the documents of all the given batches, e.g. all the batches
+        returned by `find_by_query(query, columns=[...])`.
+
+        :param batches: the batches, which must have the same fields
+        :type batches: iterable
+        :rtype: :class:`dmsclient.columns.ColumnBatch`
+        :raises ValueError: if there are no batches or their fields differ
+        """
+        result = None
+        for batch in batches:
+            if result is None:
+                result = batch.empty()
+            result.extend(batch)
+        if result is None:
+            raise ValueError('There are no batches to concatenate')
+        return result
+
+    def to_numpy(self):
+        """
+        Return the columns as NumPy arrays: `float64` for numeric fields, `datetime64[ms]`
+        for date fields and `object` for the rest. The arrays are copies, so the batch can
+        still be extended.
+
+        :return: the arrays by field name
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise DMSClientException("The 'numpy' package is required by ColumnBatch.to_numpy")
+
+        result = OrderedDict()
+        for name, values in self.columns.items():
+            kind = self.types[name]
+            if kind == DATE_TYPE:
+                millis = numpy.array(values, dtype=numpy.float64)
+                present = ~numpy.isnan(millis)
+                column = numpy.full(len(millis), numpy.datetime64('NaT'), dtype='datetime64[ms]')
+                column[present] = millis[present].astype(numpy.int64)
+            elif self._numeric(kind):
+                column = numpy.array(values, dtype=numpy.float64)
+            else:
+                column = numpy.empty(len(values), dtype=object)
+                column[:] = values
+            result[name] = column
+        return result
+
+    @staticmethod
+    def _numeric(kind):
+        return kind == DATE_TYPE or kind in NUMERIC_TYPES
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        return float('nan') if value is None else float(value)
+
+    @staticmethod
+    def _date_millis(value):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is None:
+            return float('nan')
+        if isinstance(value, (int, float)):
+            return float(value)
+
+        dt = str_to_datetime(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.timezone.utc)
+        return (dt - EPOCH).total_seconds() * 1000
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return '%s(documents=%d, columns=%s)' % (self.__class__.__name__, len(self), list(self.columns))
@@ -0,0 +1,117 @@
+import gzip
+import socket
+import threading
+import time
+
+from elasticsearch import ConnectionError, ConnectionTimeout, SSLError
+from elasticsearch.compat import urlencode
+from elasticsearch.connection import Urllib3HttpConnection
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import ReadTimeoutError, SSLError as UrllibSSLError
+
+
+class DMSConnection(Urllib3HttpConnection):
+    """
+    HTTP connection to a single Elasticsearch node with optional request compression
+    and TCP keep-alive. It also keeps request counters that are reported by `stats()`.
+
+    :param bool http_compress: gzip the request bodies and accept gzipped responses (optional)
+    :param bool keep_alive: enable TCP keep-alive on the pooled sockets, so idle connections
+                            are not silently dropped by firewalls between requests (optional)
+    :param kwargs: the arguments accepted by `elasticsearch.connection.Urllib3HttpConnection`
+                   (e.g. `maxsize` or `timeout`)
+    """
+
+    def __init__(self, http_compress=False, keep_alive=True, **kwargs):
+        super(DMSConnection, self).__init__(**kwargs)
+        self.http_compress = http_compress
+
+        if http_compress:
+            self.headers['accept-encoding'] = 'gzip,deflate'
+        if keep_alive:
+            self.pool.conn_kw['socket_options'] = (HTTPConnection.default_socket_options +
+                                                   [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+
+        self.requests = 0
+        self.failures = 0
+        self.request_time = 0.0
+        self._stats_lock = threading.Lock()
+
+    def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=()):
+        if not self.http_compress or not body:
+            return self._count(super(DMSConnection, self).perform_request,
+                               method, url, params, body, timeout, ignore)
+        return self._count(self._perform_compressed_request, method, url, params, body, timeout, ignore)
+
+    def _count(self, func, *args):
+        start = time.time()
+        failed = True
+        try:
+            result = func(*args)
+            failed = False
+            return result
+        finally:
+            with self._stats_lock:
+                self.requests += 1
+                self.failures += int(failed)
+                self.request_time += time.time() - start
+
+    def _perform_compressed_request(self, method, url, params, body, timeout, ignore):
+        # Same as `Urllib3HttpConnection.perform_request`, which does not
+        # allow to send per-request headers
+        url = self.url_prefix + url
+        if params:
+            url = '%s?%s' % (url, urlencode(params))
+        full_url = self.host + url
+
+        headers = dict(self.headers, **{'content-encoding': 'gzip'})
+        data = gzip.compress(body.encode('utf-8') if isinstance(body, str) else body)
+
+        start = time.time()
+        try:
+            kw = {}
+            if timeout:
+                kw['timeout'] = timeout
+            response = self.pool.urlopen(method, url, data, retries=False, headers=headers, **kw)
+            duration = time.time() - start
+            raw_data = response.data.decode('utf-8')
+        except Exception as e:
+            self.log_request_fail(method, full_url, url, body, time.time() - start, exception=e)
+            if isinstance(e, UrllibSSLError):
+                raise SSLError('N/A', str(e), e)
+            if isinstance(e, ReadTimeoutError):
+                raise ConnectionTimeout('TIMEOUT', str(e), e)
+            raise ConnectionError('N/A', str(e), e)
+
+        if not (200 <= response.status < 300) and response.status not in ignore:
+            self.log_request_fail(method, full_url, url, body, duration, response.status, raw_data)
+            self._raise_error(response.status, raw_data)
+
+        self.log_request_success(method, full_url, url, body, response.status, raw_data, duration)
+
+        return response.status, response.getheaders(), raw_data
+
+    def stats(self):
+        """
+        Return the counters of this connection.
+
+        :return: a dict with the `host`, `maxsize` (pool size), `in_use` (connections
+                 checked out of the pool), `idle` (open connections in the pool), `opened`
+                 (connections opened so far), `requests`, `failures` and `avg_request_time`
+                 (seconds) keys
+        :rtype: dict
+        """
+        queue = self.pool.pool
+        slots = list(queue.queue) if queue is not None else []
+        with self._stats_lock:
+            requests, failures, request_time = self.requests, self.failures, self.request_time
+        return {
+            'host': self.host,
+            'maxsize': queue.maxsize if queue is not None else 0,
+            'in_use': queue.maxsize - len(slots) if queue is not None else 0,
+            'idle': sum(1 for conn in slots if conn is not None),
+            'opened': self.pool.num_connections,
+            'requests': requests,
+            'failures': failures,
+            'avg_request_time': request_time / requests if requests else 0.0
+        }
@@ -1,13 +1,365 @@
 import abc
+import copy
+from collections import OrderedDict
 from datetime import datetime
 
-from elasticsearch.helpers import scan
+from elasticsearch import ElasticsearchException, NotFoundError
+from elasticsearch.helpers import scan, streaming_bulk
 
+from dmsclient.aggregations import Aggregations
+from dmsclient.bulk import BulkResult
+from dmsclient.columns import KEYWORD_TYPE, ColumnBatch, field_types
 from dmsclient.decorators import elasticsearch
 from dmsclient.exceptions import DMSDocumentNotFoundError, DMSClientException, DMSConflictError
+from dmsclient.helpers import AdaptivePageSize, search_after, sliced_scan
+from dmsclient.scripts import Scripts
+from dmsclient.utils import chunks
 
 
-class DMSController(abc.ABC):
+class _Missing(object):
+    """
+    Marker for the IDs that could not be found by `DMSController.get_many`
+    """
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+class BaseDMSController(abc.ABC):
+    """
+    Operations shared by :class:`DMSController` and
+    :class:`dmsclient.aio.controllers.AsyncDMSController`: the construction of the request
+    bodies, the parsing of the responses and the index and document caches. The
+    subclasses only send the requests.
+
+    :param client: instance of DMSClient or AsyncDMSClient used for Elasticsearch requests
+    """
+
+    BULK_CHUNK_SIZE = 500
+    BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+    GET_MANY_CHUNK_SIZE = 500
+    UPDATE_RETRY_ON_CONFLICT = 3
+    SEARCH_PAGE_SIZE = 1000
+    SEARCH_PREFETCH = 1
+
+    def __init__(self, client):
+        self.client = client
+
+    @property
+    @abc.abstractmethod
+    def model_class(self):
+        pass
+
+    def _not_found(self, doc_id):
+        return DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
+
+    def _conflict(self):
+        return DMSConflictError("A %s with the same ID already exists." % (self.model_class.__name__,),
+                                status_code=409)
+
+    def _fallback(self, doc_id, placed_index):
+        # The document is not in the index it was looked up in. If that index is derived from
+        # its ID it does not exist, otherwise it was deleted or moved by another process and
+        # the caller falls back to a query on all the indices
+        if placed_index is not None:
+            raise self._not_found(doc_id)
+        self._uncache_index(doc_id)
+
+    def _check_by_query(self, doc_id, result, key, action):
+        # Parse the response of a `delete_by_query` or `update_by_query` request on a single ID
+        if result['total'] == 0:
+            raise self._not_found(doc_id)
+        if result[key] != 1:
+            raise DMSClientException("Unexpected error %s %s with ID '%s': %s"
+                                     % (action, self.model_class.__name__, doc_id, str(result)))
+
+    def _bulk_pending(self, chunk, existing):
+        # Results of the documents that already exist, and positions of the ones to be sent
+        chunk_results = [None] * len(chunk)
+        pending = []
+        for i, document in enumerate(chunk):
+            if document.id in existing:
+                chunk_results[i] = BulkResult(document.id, BulkResult.Status.CONFLICT, document=document,
+                                              error=self._conflict().message)
+            else:
+                pending.append(i)
+        return chunk_results, pending
+
+    def _existing_candidates(self, op_type, chunk):
+        # Same check as in `create`: documents on time-based indices could already exist in
+        # a different monthly index, unless their index is derived from their ID
+        for document in chunk:
+            assert isinstance(document, self.model_class)
+        if op_type != 'create' or not self.model_class.timebased:
+            return []
+        return [d.id for d in chunk if d.id is not None and self._placed_index(d.id) is None]
+
+    def _bulk_action(self, op_type, document):
+        action = {
+            '_op_type': op_type,
+            '_index': self._index_for(document),
+            '_type': self.model_class.DOC_TYPE,
+            '_source': document.to_dict()
+        }
+        if document.id is not None:
+            action['_id'] = document.id
+        return action
+
+    def _bulk_result(self, document, item):
+        result = BulkResult.from_elasticsearch(item, document=document)
+        if result.ok:
+            self._cache_index(result.doc_id, result.index)
+            self._cache_document(document)
+        return result
+
+    def _bulk_refresh_index(self):
+        # Documents of a bulk request may be placed in different monthly indices
+        return self.model_class.TEMPLATE if self.client.deterministic_placement else self.model_class.INDEX
+
+    def _placed_index(self, doc_id):
+        # Index derived from the document ID, if deterministic placement is enabled
+        if not self.client.deterministic_placement or doc_id is None:
+            return None
+        return self.model_class.index_for_id(doc_id)
+
+    def _index_for(self, document):
+        return self._placed_index(document.id) or self.model_class.INDEX
+
+    def _known_index(self, doc_id):
+        # The index derived from the ID, and the index to send the request to if it is known
+        placed_index = self._placed_index(doc_id)
+        return placed_index, placed_index or self._cached_index(doc_id)
+
+    @staticmethod
+    def _id_query(doc_id):
+        return {
+            "query": {
+                "term": {
+                    "_id": doc_id
+                }
+            }
+        }
+
+    @staticmethod
+    def _ids_query(doc_ids):
+        return {
+            "query": {
+                "terms": {
+                    "_id": doc_ids
+                }
+            }
+        }
+
+    def _parse_existing_ids(self, result):
+        # Return the index of the documents that exist, by ID
+        existing = {}
+        for hit in result['hits']['hits']:
+            self._cache_index(hit['_id'], hit['_index'])
+            existing[hit['_id']] = hit['_index']
+        return existing
+
+    def _cache_index(self, doc_id, index):
+        if doc_id is not None and index is not None:
+            self.client.index_cache.set((self.model_class.DOC_TYPE, doc_id), index)
+
+    def _cached_index(self, doc_id):
+        return self.client.index_cache.get((self.model_class.DOC_TYPE, doc_id))
+
+    def _uncache_index(self, doc_id):
+        self.client.index_cache.invalidate((self.model_class.DOC_TYPE, doc_id))
+
+    def _cache_document(self, document):
+        cache = self.client.document_cache
+        if cache is not None and document.id is not None:
+            cache.set((self.model_class, document.id), copy.deepcopy(document))
+
+    def _cached_document(self, doc_id):
+        cache = self.client.document_cache
+        if cache is None:
+            return None
+        # Return a copy, so callers cannot modify the cached object
+        document = cache.get((self.model_class, doc_id))
+        return copy.deepcopy(document) if document is not None else None
+
+    def _uncache_document(self, doc_id):
+        if self.client.document_cache is not None:
+            self.client.document_cache.invalidate((self.model_class, doc_id))
+
+    def _uncache_documents(self):
+        if self.client.document_cache is not None:
+            self.client.document_cache.invalidate_where(lambda key: key[0] is self.model_class)
+
+    def _parse_document(self, item):
+        document = self.model_class.from_elasticsearch(item)
+        self._cache_document(document)
+        return document
+
+    def _parse_get(self, doc_id, result):
+        if result['hits']['total'] == 0:
+            raise self._not_found(doc_id)
+        self._cache_index(doc_id, result['hits']['hits'][0]['_index'])
+        return self._parse_document(result['hits']['hits'][0])
+
+    def _get_many_requests(self, documents):
+        # Fill `documents` from the document cache. Return the `mget` entries of the IDs
+        # whose index is known, the IDs to be searched and the IDs whose index is derived
+        # from the ID
+        cached = []
+        uncached = []
+        placed = set()
+        for doc_id in documents:
+            document = self._cached_document(doc_id)
+            if document is not None:
+                documents[doc_id] = document
+                continue
+            placed_index, index = self._known_index(doc_id)
+            if placed_index is not None:
+                placed.add(doc_id)
+            if index is not None:
+                cached.append({'_index': index, '_type': self.model_class.DOC_TYPE, '_id': doc_id})
+            else:
+                uncached.append(doc_id)
+        return cached, uncached, placed
+
+    def _parse_mget(self, result, documents, uncached, placed):
+        for item in result['docs']:
+            if item.get('found'):
+                documents[item['_id']] = self._parse_document(item)
+            elif item['_id'] not in placed:
+                # Deleted or moved by another process, fall back to a search
+                self._uncache_index(item['_id'])
+                uncached.append(item['_id'])
+
+    def _parse_get_many(self, result, documents):
+        for hit in result['hits']['hits']:
+            if documents[hit['_id']] is MISSING:
+                self._cache_index(hit['_id'], hit['_index'])
+                documents[hit['_id']] = self._parse_document(hit)
+
+    def _search_query(self, query, postprocess, source, docvalue_fields, columns):
+        # Return the query of `find_by_query`, whether the hits are converted to objects and
+        # the column batch they are appended to, if any
+        batch = None
+        if columns is not None:
+            if source is not None or docvalue_fields is not None:
+                raise ValueError('columns cannot be combined with source or docvalue_fields')
+            batch = ColumnBatch.for_model(self.model_class, columns)
+            source, docvalue_fields = batch.projection()
+            postprocess = False
+        return self._projected_query(query, postprocess, source, docvalue_fields), postprocess, batch
+
+    def _parse_hit(self, item, postprocess):
+        self._cache_index(item['_id'], item['_index'])
+        return self.model_class.from_elasticsearch(item) if postprocess else item
+
+    def _id_sort(self):
+        # Sorting on `_uid` loads it in the fielddata, the keyword ID field uses doc values
+        field = '%s_id' % (self.model_class.DOC_TYPE,)
+        if field_types(self.model_class).get(field) != KEYWORD_TYPE:
+            raise ValueError("%s documents have no '%s' keyword field, a sort must be given"
+                             % (self.model_class.__name__, field))
+        return (field,)
+
+    @staticmethod
+    def _projected_query(query, postprocess, source, docvalue_fields):
+        if source is None and docvalue_fields is None:
+            return query
+        if postprocess:
+            raise ValueError('Partial documents cannot be converted to objects, use postprocess=False')
+
+        query = dict(query or {})
+        if source is not None:
+            query['_source'] = source
+        if docvalue_fields is not None:
+            query['docvalue_fields'] = list(docvalue_fields)
+        return query
+
+    @staticmethod
+    def _fields_query(fields, query=None):
+        must = [{'term': {k: v}} for k, v in fields.items()]
+        if query is not None:
+            must.append(query)
+        return {
+            'query': {
+                'bool': {
+                    'must': must
+                }
+            }
+        }
+
+    def _aggregation_body(self, aggs, query, filters):
+        body = self._fields_query(filters, query)
+        body['size'] = 0
+        body['aggs'] = aggs
+        return body
+
+    @staticmethod
+    def _parse_aggregations(aggs, result):
+        return Aggregations.parse(aggs, result.get('aggregations', {}))
+
+    @staticmethod
+    def _merge_script(fields):
+        fields['updated_at'] = datetime.utcnow()
+
+        # Partial update via "doc" is not available in "update_by_query" call
+        # https://github.com/elastic/elasticsearch/issues/20135
+        return Scripts.stored(Scripts.MERGE, doc=fields)
+
+    @staticmethod
+    def _tags_script(script_id, tags):
+        assert isinstance(tags, list)
+        return Scripts.stored(script_id, tags=tags, updated_at=datetime.utcnow())
+
+    def _check_unprotected(self, fields):
+        for field in fields:
+            if field in self.model_class.PROTECTED_ATTRIBUTES:
+                raise ValueError("'%s' is a protected field of %s." % (field, self.model_class.__name__))
+
+    def _update_params(self, index, refresh):
+        return dict(self.client.refresh_params(index, refresh), retry_on_conflict=self.UPDATE_RETRY_ON_CONFLICT)
+
+    def _update_by_query_body(self, doc_id, script):
+        body = self._id_query(doc_id)
+        body['script'] = script
+        return body
+
+    def _update_many_pending(self, chunk, indices):
+        # Results of the documents that do not exist, and positions of the ones to be sent
+        chunk_results = [None] * len(chunk)
+        pending = []
+        for i, doc_id in enumerate(chunk):
+            self._uncache_document(doc_id)
+            if indices[doc_id] is None:
+                chunk_results[i] = BulkResult(doc_id, BulkResult.Status.NOT_FOUND,
+                                              error=self._not_found(doc_id).message)
+            else:
+                pending.append(i)
+        return chunk_results, pending
+
+    def _update_action(self, index, doc_id, fields):
+        return {
+            '_op_type': 'update',
+            '_index': index,
+            '_type': self.model_class.DOC_TYPE,
+            '_id': doc_id,
+            '_retry_on_conflict': self.UPDATE_RETRY_ON_CONFLICT,
+            'doc': fields
+        }
+
+    def _update_result(self, doc_id, item):
+        result = BulkResult.from_elasticsearch(item)
+        if result.status == BulkResult.Status.NOT_FOUND:
+            self._uncache_index(doc_id)
+        return result
+
+
+class DMSController(BaseDMSController):
     """
     Basic controller abstract class providing common operations.
 
@@ -17,8 +369,12 @@ class DMSController(abc.ABC):
     :param client: instance of DMSClient used for Elasticsearch requests
     """
 
-    def __init__(self, client):
-        self.client = client
+    # Bound in the class body for the default arguments
+    BULK_CHUNK_SIZE = BaseDMSController.BULK_CHUNK_SIZE
+    BULK_MAX_CHUNK_BYTES = BaseDMSController.BULK_MAX_CHUNK_BYTES
+    GET_MANY_CHUNK_SIZE = BaseDMSController.GET_MANY_CHUNK_SIZE
+    SEARCH_PAGE_SIZE = BaseDMSController.SEARCH_PAGE_SIZE
+    SEARCH_PREFETCH = BaseDMSController.SEARCH_PREFETCH
 
     @property
     @abc.abstractmethod
@@ -26,33 +382,38 @@ class DMSController(abc.ABC):
         pass
 
     @elasticsearch()
-    def index(self, document):
+    def index(self, document, refresh=None):
         """
         Index a document. Overrides the document if a document with the
         same ID already exists.
 
         :param document: the document object to be created
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
 
         assert isinstance(document, self.model_class)
 
+        index = self._index_for(document)
         self.client.elasticsearch.index(
-            index=self.model_class.INDEX,
+            index=index,
             doc_type=self.model_class.DOC_TYPE,
             id=document.id,
             body=document.to_dict(),
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(index, refresh)
         )
+        self._cache_index(document.id, index)
+        self._cache_document(document)
 
     @elasticsearch()
-    def create(self, document):
+    def create(self, document, refresh=None):
         """
         Create a document object
 
         :param document: the document object to be created
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         """
         assert isinstance(document, self.model_class)
 
@@ -64,92 +425,250 @@ class DMSController(abc.ABC):
         # A sensor document created on March 2018 will be indexed in
         # "volvo-z1-resim-v1-201803". If we create the same document
         # a month later, it will be indexed in "volvo-z1-resim-v1-201804".
-        # This check will prevent this from happening.
-        if self.model_class.timebased:
+        # This check will prevent this from happening. It is not needed
+        # if the index is derived from the document ID (see
+        # `DMSClient.deterministic_placement`): the `_create` request
+        # fails with a conflict if the document already exists.
+        index = self._index_for(document)
+        if self.model_class.timebased and self._placed_index(document.id) is None:
             try:
                 self.get(document.id)
-                raise DMSConflictError("A %s with the same ID already exists." %
-                                       (self.model_class.__name__,), status_code=409)
+                raise self._conflict()
             except DMSDocumentNotFoundError:
                 pass
 
         self.client.elasticsearch.create(
-            index=self.model_class.INDEX,
+            index=index,
             doc_type=self.model_class.DOC_TYPE,
             id=document.id,
             body=document.to_dict(),
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(index, refresh)
+        )
+        self._cache_index(document.id, index)
+        self._cache_document(document)
+
+    @elasticsearch()
+    def bulk_index(self, documents, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                   refresh=None):
+        """
+        Index a collection of documents using the `_bulk` endpoint. Overrides the
+        documents that already exist with the same ID.
+
+        Documents are streamed to Elasticsearch in chunks of at most `chunk_size`
+        documents and `max_chunk_bytes` bytes. A failing document does not abort
+        the rest of the batch.
+
+        :param documents: the document objects to be indexed
+        :type documents: iterable
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as the input
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self._bulk('index', documents, chunk_size, max_chunk_bytes, refresh)
+
+    @elasticsearch()
+    def bulk_create(self, documents, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                    refresh=None):
+        """
+        Create a collection of documents using the `_bulk` endpoint.
+
+        Documents are streamed to Elasticsearch in chunks of at most `chunk_size`
+        documents and `max_chunk_bytes` bytes. Documents whose ID already exists
+        are reported with a `conflict` status instead of failing the whole batch.
+
+        :param documents: the document objects to be created
+        :type documents: iterable
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as the input
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self._bulk('create', documents, chunk_size, max_chunk_bytes, refresh)
+
+    def _bulk(self, op_type, documents, chunk_size, max_chunk_bytes, refresh):
+        results = []
+
+        for chunk in chunks(documents, chunk_size):
+            existing = self._existing_ids(self._existing_candidates(op_type, chunk))
+            chunk_results, pending = self._bulk_pending(chunk, existing)
+
+            actions = (self._bulk_action(op_type, chunk[i]) for i in pending)
+            responses = streaming_bulk(self.client.elasticsearch,
+                                       actions,
+                                       chunk_size=chunk_size,
+                                       max_chunk_bytes=max_chunk_bytes,
+                                       raise_on_error=False,
+                                       raise_on_exception=False,
+                                       params=self.client.refresh_params(self._bulk_refresh_index(), refresh))
+
+            for i, (_, item) in zip(pending, responses):
+                chunk_results[i] = self._bulk_result(chunk[i], item)
+
+            results.extend(chunk_results)
+
+        return results
+
+    def _existing_ids(self, doc_ids):
+        if not doc_ids:
+            return {}
+
+        result = self.client.elasticsearch.search(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=dict(self._ids_query(doc_ids), _source=False),
+            size=len(doc_ids)
         )
+        return self._parse_existing_ids(result)
 
     @elasticsearch()
     def get(self, doc_id):
         """
         Retrieve the document object matching the given ID
 
+        If the document cache is enabled (see `DMSClient.document_cache`) and holds the
+        document, no request is sent. If the index holding the document is known (see
+        `DMSClient.index_cache`) or derived from its ID (see `DMSClient.deterministic_placement`),
+        the document is fetched with a real-time GET request on that index. Otherwise it is
+        searched across all the indices matching the model template.
+
         :param doc_id: the document ID to be retrieved
         :type doc_id: string
         :returns: the document object
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
+        document = self._cached_document(doc_id)
+        if document is not None:
+            return document
+
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                result = self.client.elasticsearch.get(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id
+                )
+                return self._parse_document(result)
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
 
         result = self.client.elasticsearch.search(
             index=self.model_class.TEMPLATE,
             doc_type=self.model_class.DOC_TYPE,
-            body={
-                "query": {
-                    "term": {
-                        "_id": doc_id
-                    }
-                }
-            },
+            body=self._id_query(doc_id),
             size=1
         )
+        return self._parse_get(doc_id, result)
 
-        if result['hits']['total'] == 0:
-            raise DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
-        return self.model_class.from_elasticsearch(result['hits']['hits'][0])
+    @elasticsearch()
+    def get_many(self, doc_ids, chunk_size=GET_MANY_CHUNK_SIZE):
+        """
+        Retrieve the document objects matching the given IDs.
+
+        IDs found in the document cache are not requested. IDs whose index is
+        known (see `DMSClient.index_cache`) or derived from the ID (see
+        `DMSClient.deterministic_placement`) are fetched with `mget` requests. The rest
+        are searched across all the indices matching the model template with a `terms`
+        query. Both are sent in chunks of `chunk_size` IDs.
+
+        :param doc_ids: the document IDs to be retrieved
+        :type doc_ids: iterable
+        :param chunk_size: maximum number of IDs per request
+        :type chunk_size: integer
+        :return: the document objects by ID, in the same order as `doc_ids`. IDs that
+                 could not be found are mapped to `dmsclient.controllers.MISSING`
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        documents = OrderedDict((doc_id, MISSING) for doc_id in doc_ids)
+        cached, uncached, placed = self._get_many_requests(documents)
+
+        for chunk in chunks(cached, chunk_size):
+            result = self.client.elasticsearch.mget(body={'docs': chunk})
+            self._parse_mget(result, documents, uncached, placed)
+
+        for chunk in chunks(uncached, chunk_size):
+            result = self.client.elasticsearch.search(
+                index=self.model_class.TEMPLATE,
+                doc_type=self.model_class.DOC_TYPE,
+                body=self._ids_query(chunk),
+                size=len(chunk)
+            )
+            self._parse_get_many(result, documents)
+
+        return documents
 
     @elasticsearch()
-    def delete(self, doc_id):
+    def delete(self, doc_id, refresh=None):
         """
-        Delete the document with the given ID.
+        Delete the document with the given ID. If the index holding the document is
+        known, it is deleted with a `_delete` request on that index. Otherwise all the
+        indices matching the model template are searched with a `delete_by_query` request.
 
         :param doc_id: the document ID to be deleted
         :type doc_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
+        self._uncache_document(doc_id)
+
+        # Use the `_delete` API if the index is known
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                self.client.elasticsearch.delete(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id,
+                    params=self.client.refresh_params(index, refresh)
+                )
+                self._uncache_index(doc_id)
+                return
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
+
         result = self.client.elasticsearch.delete_by_query(
             index=self.model_class.TEMPLATE,
             doc_type=self.model_class.DOC_TYPE,
-            body={
-                'query': {
-                    'term': {
-                        '_id': doc_id
-                    }
-                }
-            },
-            params={
-                'refresh': 'true'
-            }
+            body=self._id_query(doc_id),
+            params=self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True)
         )
-
-        if result['total'] == 0:
-            raise DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
-        if result['deleted'] != 1:
-            raise DMSClientException("Unexpected error deleting %s with ID '%s': %s"
-                                     % (self.model_class.__name__, doc_id, str(result)))
+        self._check_by_query(doc_id, result, 'deleted', 'deleting')
 
     @elasticsearch()
-    def find_by_query(self, query, postprocess=True):
+    def find_by_query(self, query, postprocess=True, source=None, docvalue_fields=None, slices=None,
+                      ordered=False, progress=None, columns=None):
         """
         Find documents that match the given query. The `postprocess` parameter allows you to
         choose to convert the search results to objects or return raw Elasticsearch
         documents.
 
+        The `source` and `docvalue_fields` parameters limit the data returned for each
+        document. Partial documents cannot be converted to objects, so `postprocess` must
+        be False when they are used.
+
+        With `slices`, the results are obtained by that number of threads scrolling over
+        slices of the results in parallel, with a page size adapted to the observed response
+        time and size (see `dmsclient.helpers.sliced_scan`).
+
+        With `columns`, the values of those fields are returned in a
+        :class:`dmsclient.columns.ColumnBatch` for each page of results instead of the
+        documents. Fields with doc values are read from them instead of the `_source`.
+
         Query example:
 
         query = {
@@ -165,18 +684,112 @@ class DMSController(abc.ABC):
         :type query: dict
         :param postprocess: transform search results to objects
         :type postprocess: bool
-        :return: a collection of objects
+        :param source: the `_source` filtering of the search: False, a list of fields or a
+                       dict with `includes` and `excludes` lists (optional)
+        :param docvalue_fields: fields returned from doc values, under the `fields` key of each
+                                document (optional)
+        :type docvalue_fields: list
+        :param slices: number of slices scanned in parallel (optional)
+        :type slices: integer
+        :param ordered: with `slices`, return the documents slice after slice instead of as
+                        soon as they are obtained
+        :type ordered: bool
+        :param progress: with `slices`, function called with the
+                         :class:`dmsclient.helpers.SliceProgress` of a slice after each page (optional)
+        :param columns: fields returned in column batches, instead of `source` and
+                        `docvalue_fields` (optional)
+        :type columns: list
+        :return: a collection of objects, or of :class:`dmsclient.columns.ColumnBatch` with `columns`
         :rtype: iterator
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        result = scan(self.client.elasticsearch,
-                      index=self.model_class.TEMPLATE,
-                      doc_type=self.model_class.DOC_TYPE,
-                      query=query,
-                      size=1000)
+        query, postprocess, batch = self._search_query(query, postprocess, source, docvalue_fields, columns)
+        if slices and slices > 1:
+            result = sliced_scan(self.client.elasticsearch,
+                                 index=self.model_class.TEMPLATE,
+                                 doc_type=self.model_class.DOC_TYPE,
+                                 query=query,
+                                 workers=slices,
+                                 ordered=ordered,
+                                 page_size=AdaptivePageSize(initial=self.SEARCH_PAGE_SIZE),
+                                 progress=progress)
+        else:
+            result = scan(self.client.elasticsearch,
+                          index=self.model_class.TEMPLATE,
+                          doc_type=self.model_class.DOC_TYPE,
+                          query=query,
+                          size=self.SEARCH_PAGE_SIZE)
+
+        try:
+            if batch is not None:
+                for page in self._column_batches(result, batch):
+                    yield page
+                return
+
+            for item in result:
+                yield self._parse_hit(item, postprocess)
+        except ElasticsearchException as e:
+            raise DMSClientException.from_exception(e)
 
+    def _column_batches(self, result, batch):
         for item in result:
-            yield self.model_class.from_elasticsearch(item) if postprocess else item
+            batch.append(self._parse_hit(item, False))
+            if len(batch) >= self.SEARCH_PAGE_SIZE:
+                yield batch
+                batch = batch.empty()
+        if len(batch) > 0:
+            yield batch
+
+    def find_sorted_by_query(self, query, sort=None, postprocess=True, source=None, docvalue_fields=None,
+                             size=SEARCH_PAGE_SIZE, prefetch=SEARCH_PREFETCH, **kwargs):
+        """
+        Find documents that match the given query, in the given order, using `search_after`
+        pagination. No scroll context is kept open on the cluster, so this is suitable for
+        large result sets and for iterators that are consumed slowly. The next `prefetch`
+        pages are requested from a background thread while the current one is consumed.
+
+        See `find_by_query` for the `source` and `docvalue_fields` parameters.
+
+        :param query: Elasticsearch query
+        :type query: dict
+        :param sort: sort clauses. The last one must be unique per document. By default, the
+                     ID field of the model (e.g. `drive_id`)
+        :type sort: sequence
+        :param postprocess: transform search results to objects
+        :type postprocess: bool
+        :param source: the `_source` filtering of the search (optional)
+        :param docvalue_fields: fields returned from doc values (optional)
+        :type docvalue_fields: list
+        :param size: number of documents per request
+        :type size: integer
+        :param prefetch: number of pages requested ahead of the one being consumed. If 0,
+                         pages are requested when the previous one has been consumed
+        :type prefetch: integer
+        :return: a collection of objects
+        :rtype: iterator
+        :raises ValueError: if the arguments are not valid, when called
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        # The arguments are validated here, the generator would only do it on the first document
+        query = self._projected_query(query, postprocess, source, docvalue_fields)
+        sort = self._id_sort() if sort is None else sort
+        return self._find_sorted_by_query(query, sort, postprocess, size, prefetch, **kwargs)
+
+    @elasticsearch()
+    def _find_sorted_by_query(self, query, sort, postprocess, size, prefetch):
+        result = search_after(self.client.elasticsearch,
+                              index=self.model_class.TEMPLATE,
+                              doc_type=self.model_class.DOC_TYPE,
+                              query=query,
+                              sort=sort,
+                              size=size,
+                              prefetch=prefetch)
+
+        try:
+            for item in result:
+                yield self._parse_hit(item, postprocess)
+        except ElasticsearchException as e:
+            raise DMSClientException.from_exception(e)
 
     def find_by_fields(self, **fields):
         """
@@ -187,23 +800,75 @@ class DMSController(abc.ABC):
         :rtype: iterator
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        query = {
-            'query': {
-                'bool': {
-                    'must': []
-                }
-            }
-        }
+        return self.find_by_query(self._fields_query(fields))
+
+    @elasticsearch()
+    def count(self, **fields):
+        """
+        Count the documents that match the given fields.
+
+        :param fields: keyword arguments with the fields to use in the search
+        :return: the number of documents
+        :rtype: int
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = self.client.elasticsearch.count(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._fields_query(fields)
+        )
+        return result['count']
+
+    def count_by(self, field, **filters):
+        """
+        Count the documents that match the given fields, grouped by the values of `field`.
+
+        Example:
+
+        client.drives.count_by('cluster_id', state='copying')
+
+        :param string field: the field to group by, which must be a keyword (or numeric) field
+        :param filters: keyword arguments with the fields to use in the search
+        :return: the number of documents by value, the most frequent ones first (at most
+                 `Aggregations.TERMS_SIZE` values)
+        :rtype: collections.OrderedDict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self.aggregate({field: Aggregations.terms(field)}, **filters)[field]
+
+    @elasticsearch()
+    def aggregate(self, aggs, query=None, **filters):
+        """
+        Run aggregations over the documents that match the given query and fields, without
+        returning the documents. See `dmsclient.aggregations.Aggregations` to build them.
+
+        Example:
 
-        for k, v in fields.items():
-            query['query']['bool']['must'].append({'term': {k: v}})
+        client.drives.aggregate({'cars': Aggregations.terms('car_id', aggs={'bytes': Aggregations.sum('size')})})
 
-        return self.find_by_query(query)
+        :param aggs: the aggregations by name
+        :type aggs: dict
+        :param query: Elasticsearch query clause, e.g. `{'range': {'size': {'gt': 0}}}` (optional)
+        :type query: dict
+        :param filters: keyword arguments with the fields to use in the search
+        :return: the result of each aggregation by name, as returned by `Aggregations.parse`
+        :rtype: dict
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = self.client.elasticsearch.search(
+            index=self.model_class.TEMPLATE,
+            doc_type=self.model_class.DOC_TYPE,
+            body=self._aggregation_body(aggs, query, filters)
+        )
+        return self._parse_aggregations(aggs, result)
 
     @elasticsearch()
-    def __update__(self, doc_id, fields):
+    def __update__(self, doc_id, fields, refresh=None):
         """
-        Update fields for the document matching the given ID.
+        Update fields for the document matching the given ID. If the index holding the
+        document is known, it is updated with an `_update` request on that index.
+        Otherwise all the indices matching the model template are searched with an
+        `update_by_query` request.
 
         WARNING: use this with caution as it will not prevent you from updating
         protected fields. To update or create new unprotected fields, use `set_fields`
@@ -213,44 +878,40 @@ class DMSController(abc.ABC):
         :type doc_id: string
         :param fields: fields to be updated
         :type fields: dict
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
+        self._update_document(doc_id, self._merge_script(fields), refresh)
 
-        fields['updated_at'] = datetime.utcnow()
+    def _update_document(self, doc_id, script, refresh):
+        # Use the `_update` API if the index is known
+        self._uncache_document(doc_id)
 
-        # Partial update via "doc" is not available in "update_by_query" call
-        # https://github.com/elastic/elasticsearch/issues/20135
-        script = {
-            "lang": "painless",
-            "source": "",
-            "params": {}
-        }
-        for field, value in fields.items():
-            script['source'] += "ctx._source.{} = params.{}; ".format(field, field)
-            script['params'][field] = value
+        placed_index, index = self._known_index(doc_id)
+        if index is not None:
+            try:
+                self.client.elasticsearch.update(
+                    index=index,
+                    doc_type=self.model_class.DOC_TYPE,
+                    id=doc_id,
+                    body={
+                        "script": script
+                    },
+                    params=self._update_params(index, refresh)
+                )
+                return
+            except NotFoundError:
+                self._fallback(doc_id, placed_index)
 
         result = self.client.elasticsearch.update_by_query(
             index=self.model_class.TEMPLATE,
             doc_type=self.model_class.DOC_TYPE,
-            body={
-                "query": {
-                    "term": {
-                        "_id": doc_id
-                    }
-                },
-                "script": script
-            },
-            params={
-                'refresh': 'true'
-            }
+            body=self._update_by_query_body(doc_id, script),
+            params=self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True)
         )
-
-        if result['total'] == 0:
-            raise DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
-        if result['updated'] != 1:
-            raise DMSClientException('Unexpected error updating %s with ID %s: %s'
-                                     % (self.model_class.__name__, doc_id, str(result)))
+        self._check_by_query(doc_id, result, 'updated', 'updating')
 
     def set_fields(self, doc_id, **fields):
         """
@@ -264,13 +925,64 @@ class DMSController(abc.ABC):
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
-        for field in fields:
-            if field in self.model_class.PROTECTED_ATTRIBUTES:
-                raise ValueError("'%s' is a protected field of %s." % (field, self.model_class.__name__))
+        self._check_unprotected(fields)
         self.__update__(doc_id, fields)
 
     @elasticsearch()
-    def remove_field(self, doc_id, field_key):
+    def update_many(self, doc_ids, fields, chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                    refresh=None):
+        """
+        Update the same fields for all the documents matching the given IDs, using
+        partial updates sent to the `_bulk` endpoint.
+
+        Partial updates need the index of each document. IDs whose index is not known
+        (see `DMSClient.index_cache`) are resolved with a single search per chunk.
+        A failing document does not abort the rest of the batch.
+
+        WARNING: like `__update__`, this will not prevent you from updating protected fields.
+
+        :param doc_ids: the IDs of the documents to be updated
+        :type doc_ids: iterable
+        :param fields: fields to be updated
+        :type fields: dict
+        :param chunk_size: maximum number of documents per request
+        :type chunk_size: integer
+        :param max_chunk_bytes: maximum size in bytes of a request
+        :type max_chunk_bytes: integer
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
+        :return: the result of each document, in the same order as `doc_ids`. Documents
+                 that could not be found have the `not_found` status
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        fields = dict(fields, updated_at=datetime.utcnow())
+        results = []
+
+        for chunk in chunks(doc_ids, chunk_size):
+            indices = {doc_id: self._placed_index(doc_id) or self._cached_index(doc_id) for doc_id in chunk}
+            indices.update(self._existing_ids([doc_id for doc_id in chunk if indices[doc_id] is None]))
+
+            chunk_results, pending = self._update_many_pending(chunk, indices)
+
+            actions = (self._update_action(indices[chunk[i]], chunk[i], fields) for i in pending)
+            responses = streaming_bulk(self.client.elasticsearch,
+                                       actions,
+                                       chunk_size=chunk_size,
+                                       max_chunk_bytes=max_chunk_bytes,
+                                       raise_on_error=False,
+                                       raise_on_exception=False,
+                                       params=self.client.refresh_params(self.model_class.TEMPLATE, refresh))
+
+            for i, (_, item) in zip(pending, responses):
+                chunk_results[i] = self._update_result(chunk[i], item)
+
+            results.extend(chunk_results)
+
+        return results
+
+    @elasticsearch()
+    def remove_field(self, doc_id, field_key, refresh=None):
         """
         Remove an unprotected field from the document matching the given ID
         and field key.
@@ -279,42 +991,17 @@ class DMSController(abc.ABC):
         :type doc_id: string
         :param field_key: the field key to be removed
         :type field_key: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises ValueError: if any of the fields is protected
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
-        if field_key in self.model_class.PROTECTED_ATTRIBUTES:
-            raise ValueError("'%s' is a protected field of %s." % (field_key, self.model_class.__name__))
-
-        result = self.client.elasticsearch.update_by_query(
-            index=self.model_class.TEMPLATE,
-            doc_type=self.model_class.DOC_TYPE,
-            body={
-                "query": {
-                    "term": {
-                        "_id": doc_id
-                    }
-                },
-                "script": {
-                    "source": "ctx._source.remove(params.field)",
-                    "params": {
-                        "field": field_key
-                    }
-                }
-            },
-            params={
-                'refresh': 'true'
-            }
-        )
-
-        if result['total'] == 0:
-            raise DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
-        if result['updated'] != 1:
-            raise DMSClientException('Unexpected error updating %s with ID %s: %s'
-                                     % (self.model_class.__name__, doc_id, str(result)))
+        self._check_unprotected([field_key])
+        self._update_document(doc_id, Scripts.stored(Scripts.REMOVE_FIELD, field=field_key), refresh)
 
     @elasticsearch()
-    def add_tags(self, doc_id, tags):
+    def add_tags(self, doc_id, tags, refresh=None):
         """
         Add tags to the document matching the given ID.
 
@@ -322,40 +1009,14 @@ class DMSController(abc.ABC):
         :type doc_id: string
         :param tags: the list of tags to be added
         :type tags: list
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        assert isinstance(tags, list)
-
-        result = self.client.elasticsearch.update_by_query(
-            index=self.model_class.TEMPLATE,
-            doc_type=self.model_class.DOC_TYPE,
-            body={
-                "query": {
-                    "term": {
-                        "_id": doc_id
-                    }
-                },
-                "script": {
-                    "source": "ctx._source.tags.addAll(params.tags); ctx._source.updated_at = params.updated_at;",
-                    "params": {
-                        "tags": tags,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            },
-            params={
-                'refresh': 'true'
-            }
-        )
-
-        if result['total'] == 0:
-            raise DMSDocumentNotFoundError("Could not find %s with ID '%s'" % (self.model_class.__name__, doc_id))
-        if result['updated'] != 1:
-            raise DMSClientException("Unexpected error updating %s with ID '%s': %s"
-                                     % (self.model_class.__name__, doc_id, str(result)))
+        self._update_document(doc_id, self._tags_script(Scripts.ADD_TAGS, tags), refresh)
 
     @elasticsearch()
-    def remove_tags(self, doc_id, tags):
+    def remove_tags(self, doc_id, tags, refresh=None):
         """
         Remove tags for the document matching the given ID.
 
@@ -363,37 +1024,11 @@ class DMSController(abc.ABC):
         :type doc_id: string
         :param tags: the list of tags to be removed
         :type tags: list
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        assert isinstance(tags, list)
-
-        result = self.client.elasticsearch.update_by_query(
-            index=self.model_class.INDEX,
-            doc_type=self.model_class.DOC_TYPE,
-            body={
-                "query": {
-                    "term": {
-                        "_id": doc_id
-                    }
-                },
-                "script": {
-                    "source": "ctx._source.tags.removeAll(params.tags); ctx._source.updated_at = params.updated_at;",
-                    "params": {
-                        "tags": tags,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            },
-            params={
-                'refresh': 'true'
-            }
-        )
-
-        if result['total'] == 0:
-            raise DMSDocumentNotFoundError('Could not find %s with ID %s' % (self.model_class.__name__, doc_id))
-        if result['updated'] != 1:
-            raise DMSClientException('Unexpected error updating %s with ID %s: %s'
-                                     % (self.model_class.__name__, doc_id, str(result)))
+        self._update_document(doc_id, self._tags_script(Scripts.REMOVE_TAGS, tags), refresh)
 
     @elasticsearch()
     def get_tags(self, doc_id):
@@ -428,12 +1063,30 @@ class DMSControllerWithState(DMSController):
         :type doc_id: string
         :param state: the desired state
         :type state: string
+        :param kwargs: extra arguments passed to `__update__` (e.g. `refresh`)
         :raises ValueError: if the state is not valid
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if document with the given ID does not exist
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
         self.__update__(doc_id, {'state': self.model_class.State(state)}, **kwargs)
 
+    def set_state_many(self, doc_ids, state, **kwargs):
+        """
+        Update the state for all the documents matching the given IDs with a
+        single bulk request per chunk (see `update_many`).
+
+        :param doc_ids: the IDs of the documents to be updated
+        :type doc_ids: iterable
+        :param state: the desired state
+        :type state: string
+        :param kwargs: extra arguments passed to `update_many` (e.g. `refresh`)
+        :return: the result of each document, in the same order as `doc_ids`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises ValueError: if the state is not valid
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        return self.update_many(doc_ids, {'state': self.model_class.State(state)}, **kwargs)
+
     @elasticsearch()
     def get_state(self, doc_id):
         """
@@ -78,11 +78,31 @@ class ClusterController(DMSController):
         for item in result:
             yield Cluster.from_elasticsearch(item)
 
+    def get_all_versioned(self):
+        """
+        Get all Cluster documents along with their version, which is incremented
+        by Elasticsearch on every update.
+
+        :return: a collection of (Cluster object, version) tuples
+        :rtype: iterator
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        result = scan(self.client.elasticsearch,
+                      index=Cluster.INDEX,
+                      doc_type=Cluster.DOC_TYPE,
+                      query={'version': True},
+                      size=1000)
+
+        for item in result:
+            yield Cluster.from_elasticsearch(item), item.get('_version')
+
     @elasticsearch()
-    def delete_all(self):
+    def delete_all(self, refresh=None):
         """
         Delete all Cluster documents.
 
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSClientException: if an error occur
         """
         self.client.elasticsearch.delete_by_query(
@@ -93,8 +113,7 @@ class ClusterController(DMSController):
                     'match_all': {}
                 }
             },
-            params={
-                'conflicts': 'proceed',
-                'refresh': 'true'
-            }
+            params=dict(self.client.refresh_params(Cluster.INDEX, refresh, by_query=True),
+                        conflicts='proceed')
         )
+        self._uncache_documents()
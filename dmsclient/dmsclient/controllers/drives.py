@@ -11,7 +11,7 @@ class DriveController(DMSControllerWithState):
     def model_class(self):
         return Drive
 
-    def create_from_ingest(self, dir_name, source_path, ingest_station, **kwargs):
+    def create_from_ingest(self, dir_name, source_path, ingest_station, refresh=None, **kwargs):
         """
         Utility method to create drives during the drive ingestion process.
 
@@ -21,6 +21,8 @@ class DriveController(DMSControllerWithState):
         :type source_path: string
         :param ingest_station: the hostname of the ingest station (e.g. amst01-mus-02)
         :type ingest_station: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :param kwargs: any extra fields that must be created with the Drive document
         :return: the drive object
         :rtype: :class:`dmsclient.models.drive.Drive`
@@ -32,5 +34,5 @@ class DriveController(DMSControllerWithState):
                                   ingest_station=ingest_station,
                                   **kwargs)
 
-        super(DriveController, self).create(drive)
+        super(DriveController, self).create(drive, refresh=refresh)
         return drive
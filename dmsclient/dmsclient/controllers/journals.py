@@ -22,10 +22,12 @@ class JournalController(DMSController):
         self.index(document)
 
     @elasticsearch()
-    def delete_all(self):
+    def delete_all(self, refresh=None):
         """
         Delete all Journal documents.
 
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSClientException: if an error occur
         """
         self.client.elasticsearch.delete_by_query(
@@ -36,8 +38,7 @@ class JournalController(DMSController):
                     'match_all': {}
                 }
             },
-            params={
-                'conflicts': 'proceed',
-                'refresh': 'true'
-            }
+            params=dict(self.client.refresh_params(self.model_class.TEMPLATE, refresh, by_query=True),
+                        conflicts='proceed')
         )
+        self._uncache_documents()
@@ -38,6 +38,34 @@ class SegmentController(DMSControllerWithState):
         self.create(s)
         return s
 
+    def bulk_create_from_drive(self, segment_ids, drive, first_sequence=1, **kwargs):
+        """
+        Utility method to create several Segments from a Drive using a single
+        bulk request per chunk. Sequences are assigned in the order of `segment_ids`,
+        starting at `first_sequence`.
+
+        :param segment_ids: the IDs of the Segments to be created
+        :type segment_ids: list
+        :param drive: Drive object
+        :type drive: :class:`dmsclient.models.drive.Drive`
+        :param first_sequence: numeric index of the first segment
+        :type first_sequence: integer
+        :param kwargs: any additional Segment fields
+        :type kwargs: keyword arguments
+        :return: the result of each segment, in the same order as `segment_ids`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSInvalidFormat: if any of the segment IDs cannot be parsed
+        """
+        assert isinstance(drive, Drive)
+        cluster = self.client.get_cluster(drive.drive_id)
+        segments = [Segment.from_drive(segment_id=segment_id,
+                                       sequence=sequence,
+                                       drive=drive,
+                                       cluster=cluster,
+                                       **kwargs)
+                    for sequence, segment_id in enumerate(segment_ids, first_sequence)]
+        return self.bulk_create(segments)
+
     def find_by_drive_id(self, drive_id):
         """
         Utility method to find segments by `drive_id`.
@@ -51,12 +79,14 @@ class SegmentController(DMSControllerWithState):
         return self.find_by_fields(drive_id=drive_id)
 
     @elasticsearch()
-    def delete_by_drive_id(self, drive_id):
+    def delete_by_drive_id(self, drive_id, refresh=None):
         """
         Utility method to delete segments by `drive_id`.
 
         :param drive_id: the Drive ID
         :type drive_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :returns: the number of segments successfully deleted
         :rtype: integer
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
@@ -71,8 +101,7 @@ class SegmentController(DMSControllerWithState):
                     }
                 }
             },
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(Segment.TEMPLATE, refresh, by_query=True)
         )
+        self._uncache_documents()
         return result['deleted']
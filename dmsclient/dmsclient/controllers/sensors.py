@@ -1,6 +1,6 @@
 import os
 import re
-from datetime import datetime
+from collections import OrderedDict
 
 from dmsclient.controllers import DMSControllerWithState
 from dmsclient.decorators import elasticsearch
@@ -40,6 +40,27 @@ class SensorController(DMSControllerWithState):
         self.create(s)
         return s
 
+    def bulk_create_from_segments(self, segments, sensor_type, **kwargs):
+        """
+        Utility method to create one Sensor document per Segment object using a
+        single bulk request per chunk.
+
+        :param segments: the Segment objects
+        :type segments: list
+        :param sensor_type: the sensor type (must be a valid type found in
+        `dmsclient.models.sensor.Sensor.SENSOR_TYPES`)
+        :type sensor_type: string
+        :param kwargs: any extra fields that must be created with the Sensor documents
+        :return: the result of each sensor, in the same order as `segments`
+        :rtype: list of :class:`dmsclient.bulk.BulkResult`
+        :raises dmsclient.exceptions.DMSClientException: if an error occurs
+        """
+        sensors = [Sensor.from_segment(segment=segment,
+                                       sensor_type=sensor_type,
+                                       **kwargs)
+                   for segment in segments]
+        return self.bulk_create(sensors)
+
     def create_from_filename(self, filename):
         """
         Utility method to create Sensor documents from a filename.
@@ -51,18 +72,7 @@ class SensorController(DMSControllerWithState):
         :rtype: :class:`dmsclient.models.sensor.Sensor`
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        sensor_id = os.path.splitext(filename)[0]
-        m = re.match(Sensor.INGEST_REGEX, sensor_id)
-        if not m:
-            raise DMSInvalidFormat("Could not parse sensor_id '%s'" % (sensor_id,))
-
-        sensor_id_split = sensor_id.split('_')
-        sensor_type = sensor_id_split[-1]
-        segment_id = '_'.join(sensor_id_split[:-1])
-        m = re.match(Segment.INGEST_REGEX, segment_id)
-        if not m:
-            raise DMSInvalidFormat("Could not parse segment_id '%s'" % (segment_id,))
-
+        segment_id, sensor_type = self._parse_sensor_filename(filename)
         segment = self.client.segments.get(segment_id)
         return self.create_from_segment(segment, sensor_type)
 
@@ -79,12 +89,14 @@ class SensorController(DMSControllerWithState):
         return self.find_by_fields(segment_id=segment_id)
 
     @elasticsearch()
-    def delete_by_segment_id(self, segment_id):
+    def delete_by_segment_id(self, segment_id, refresh=None):
         """
         Utility method to delete sensors by `segment_id`.
 
         :param segment_id: the Segment ID
         :type segment_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :returns: the number of sensors successfully deleted
         :rtype: integer
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
@@ -99,10 +111,9 @@ class SensorController(DMSControllerWithState):
                     }
                 }
             },
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(Sensor.TEMPLATE, refresh, by_query=True)
         )
+        self._uncache_documents()
         return result['deleted']
 
     def create_version_from_filename(self, filename, **kwargs):
@@ -116,23 +127,13 @@ class SensorController(DMSControllerWithState):
         :rtype: :class:`dmsclient.models.sensor.SensorVersion`
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        sensorversion_id = os.path.splitext(filename)[0]
-        m = re.match(SensorVersion.INGEST_REGEX, sensorversion_id)
-        if not m:
-            raise DMSInvalidFormat("Could not parse sensorversion_id '%s'" % (sensorversion_id,))
-
-        sensorid_split = sensorversion_id.split('_')[:-1]
-        version = sensorversion_id.split('_')[-1]
-        sensor_id = '_'.join(sensorid_split)
-        m = re.match(Sensor.INGEST_REGEX, sensor_id)
-        if not m:
-            raise DMSInvalidFormat("Could not parse sensor_id '%s'" % (sensor_id,))
+        sensor_id, version = self._parse_version_filename(filename)
         sensor = self.get(sensor_id)
 
         return self.create_version(sensor, version, **kwargs)
 
     @elasticsearch()
-    def create_version(self, sensor, version, **kwargs):
+    def create_version(self, sensor, version, refresh=None, **kwargs):
         """
         Create a SensorVersion document from a Sensor object and a version.
 
@@ -140,20 +141,21 @@ class SensorController(DMSControllerWithState):
         :type sensor: string
         :param version: the four-digit version
         :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :param kwargs: any extra fields that must be created with the SensorVersion document
         :return: the SensorVersion object
         :rtype: :class:`dmsclient.models.sensorversion.SensorVersion`
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
         sv = SensorVersion.from_sensor(sensor, version, **kwargs)
+        index = self._version_index(sv)
         self.client.elasticsearch.create(
-            index=SensorVersion.INDEX,
+            index=index,
             doc_type=SensorVersion.DOC_TYPE,
             id=sv.sensorversion_id,
             body=sv.to_dict(),
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(index, refresh)
         )
         return sv
 
@@ -168,20 +170,10 @@ class SensorController(DMSControllerWithState):
         :rtype: iterator
         :raises dmsclient.exceptions.DMSClientException: if an error occurs
         """
-        query = {
-            'query': {
-                'bool': {
-                    'must': [
-                        {'term': {'sensor_id': sensor_id}}
-                    ]
-                }
-            }
-        }
-
         result = self.client.elasticsearch.search(
             index=SensorVersion.TEMPLATE,
             doc_type=SensorVersion.DOC_TYPE,
-            body=query
+            body=self._fields_query({'sensor_id': sensor_id})
         )
 
         versions = []
@@ -203,21 +195,10 @@ class SensorController(DMSControllerWithState):
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
-        query = {
-            'query': {
-                'bool': {
-                    'must': [
-                        {'term': {'sensor_id': sensor_id}},
-                        {'term': {'version': version}}
-                    ]
-                }
-            }
-        }
-
         result = self.client.elasticsearch.search(
             index=SensorVersion.TEMPLATE,
             doc_type=SensorVersion.DOC_TYPE,
-            body=query,
+            body=self._version_query(sensor_id, version),
             size=1
         )
 
@@ -226,7 +207,7 @@ class SensorController(DMSControllerWithState):
         return SensorVersion.from_elasticsearch(result['hits']['hits'][0])
 
     @elasticsearch()
-    def delete_version(self, sensor_id, version):
+    def delete_version(self, sensor_id, version, refresh=None):
         """
         Delete a SensorVersion document identified by the Sensor ID and the version.
 
@@ -234,25 +215,16 @@ class SensorController(DMSControllerWithState):
         :type sensor_id: string
         :param version: the four-digit version
         :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
         result = self.client.elasticsearch.delete_by_query(
             index=SensorVersion.TEMPLATE,
             doc_type=SensorVersion.DOC_TYPE,
-            body={
-                'query': {
-                    'bool': {
-                        'must': [
-                            {'term': {'sensor_id': sensor_id}},
-                            {'term': {'version': version}}
-                        ]
-                    }
-                }
-            },
-            params={
-                'refresh': 'true'
-            }
+            body=self._version_query(sensor_id, version),
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True)
         )
 
         if result['total'] == 0:
@@ -261,12 +233,14 @@ class SensorController(DMSControllerWithState):
             raise DMSClientException('Unexpected error deleting: %s' % str(result))
 
     @elasticsearch()
-    def delete_all_versions(self, sensor_id):
+    def delete_all_versions(self, sensor_id, refresh=None):
         """
         Delete all SensorVersion documents identified by the Sensor ID.
 
         :param sensor_id: the Sensor ID
         :type sensor_id: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :returns: the number of SensorVersion documents successfully deleted
         :rtype: integer
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
@@ -281,15 +255,13 @@ class SensorController(DMSControllerWithState):
                     }
                 }
             },
-            params={
-                'refresh': 'true'
-            }
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True)
         )
 
         return result['deleted']
 
     @elasticsearch()
-    def update_version(self, sensor_id, version, **fields):
+    def update_version(self, sensor_id, version, refresh=None, **fields):
         """
         Update the fields of a SensorVersion document identified by the Sensor ID
         and the version.
@@ -298,51 +270,75 @@ class SensorController(DMSControllerWithState):
         :type sensor_id: string
         :param version: the four-digit version
         :type version: string
+        :param refresh: refresh policy for this request (`true`, `wait_for` or `false`),
+        overriding the client default (optional)
         :param fields: fields to be updated (fields `sensorversion_id`, `sensor_id`,
         and `version` cannot be updated)
         :type fields: kwargs
         :raises dmsclient.exceptions.DMSDocumentNotFoundError: if there's no match
         :raises dmsclient.exceptions.DMSClientException: if any other error occur
         """
-        fields.pop('_id', None)
-        fields.pop('sensorversion_id', None)
-        fields.pop('sensor_id', None)
-        fields.pop('version', None)
-        fields['updated_at'] = datetime.utcnow()
-
-        # Partial update via "doc" is not available in "update_by_query" call
-        # https://github.com/elastic/elasticsearch/issues/20135
-        script = {
-            "lang": "painless",
-            "source": "",
-            "params": {}
-        }
-        for field, value in fields.items():
-            if field == 'state':
-                # Will raise ValueError exception if 'value' is not a member of the enumerate
-                SensorVersion.State(value)
-            script['source'] += "ctx._source.{} = params.{}; ".format(field, field)
-            script['params'][field] = value
-
         result = self.client.elasticsearch.update_by_query(
             index=SensorVersion.TEMPLATE,
             doc_type=SensorVersion.DOC_TYPE,
-            body={
-                'query': {
-                    'bool': {
-                        'must': [
-                            {'term': {'sensor_id': sensor_id}},
-                            {'term': {'version': version}}
-                        ]
-                    }
-                },
-                "script": script
-            },
-            params={
-                'refresh': 'true'
-            },
+            body=self._version_update_body(sensor_id, version, fields),
+            params=self.client.refresh_params(SensorVersion.TEMPLATE, refresh, by_query=True),
             conflicts='proceed'
         )
 
         if result['updated'] == 0:
             raise DMSDocumentNotFoundError()
+
+    @staticmethod
+    def _parse_sensor_filename(filename):
+        # Return the segment ID and the sensor type of a Sensor file
+        sensor_id = os.path.splitext(filename)[0]
+        m = re.match(Sensor.INGEST_REGEX, sensor_id)
+        if not m:
+            raise DMSInvalidFormat("Could not parse sensor_id '%s'" % (sensor_id,))
+
+        sensor_id_split = sensor_id.split('_')
+        sensor_type = sensor_id_split[-1]
+        segment_id = '_'.join(sensor_id_split[:-1])
+        m = re.match(Segment.INGEST_REGEX, segment_id)
+        if not m:
+            raise DMSInvalidFormat("Could not parse segment_id '%s'" % (segment_id,))
+        return segment_id, sensor_type
+
+    @staticmethod
+    def _parse_version_filename(filename):
+        # Return the sensor ID and the version of a SensorVersion file
+        sensorversion_id = os.path.splitext(filename)[0]
+        m = re.match(SensorVersion.INGEST_REGEX, sensorversion_id)
+        if not m:
+            raise DMSInvalidFormat("Could not parse sensorversion_id '%s'" % (sensorversion_id,))
+
+        sensorid_split = sensorversion_id.split('_')[:-1]
+        version = sensorversion_id.split('_')[-1]
+        sensor_id = '_'.join(sensorid_split)
+        m = re.match(Sensor.INGEST_REGEX, sensor_id)
+        if not m:
+            raise DMSInvalidFormat("Could not parse sensor_id '%s'" % (sensor_id,))
+        return sensor_id, version
+
+    def _version_index(self, sensorversion):
+        index = None
+        if self.client.deterministic_placement:
+            index = SensorVersion.index_for_id(sensorversion.sensorversion_id)
+        return index or SensorVersion.INDEX
+
+    def _version_query(self, sensor_id, version):
+        return self._fields_query(OrderedDict([('sensor_id', sensor_id), ('version', version)]))
+
+    def _version_update_body(self, sensor_id, version, fields):
+        fields.pop('_id', None)
+        fields.pop('sensorversion_id', None)
+        fields.pop('sensor_id', None)
+        fields.pop('version', None)
+        if 'state' in fields:
+            # Will raise ValueError exception if 'value' is not a member of the enumerate
+            SensorVersion.State(fields['state'])
+
+        body = self._version_query(sensor_id, version)
+        body['script'] = self._merge_script(fields)
+        return body
@@ -23,9 +23,11 @@ def elasticsearch():
             sync = kwds.pop('sync', True)
             retries = kwds.pop('retries', 0)
 
+            client = args[0].client
+            client.ensure_initialized()
             if sync:
                 # Try to sync cluster information
-                args[0].client.sync_cluster_config()
+                client.sync_cluster_config()
 
             @retry(stop_max_attempt_number=retries, wait_fixed=1000)
             def inner_wrapper(*args, **kwds):
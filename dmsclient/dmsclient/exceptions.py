@@ -16,7 +16,7 @@ class DMSClientException(Exception):
         message = message or ''
         if hasattr(exception, 'error'):
             message += ': %s' % (exception.error,)
-        if hasattr(exception, 'info') and 'error' in exception.info:
+        if isinstance(getattr(exception, 'info', None), dict) and 'error' in exception.info:
             message += ': %s' % (exception.info['error'],)
         if not message:
             message = str(exception)
@@ -0,0 +1,258 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dmsclient.utils import read_ahead
+
+
+def search_after(client, query=None, sort=('_uid',), size=1000, prefetch=0, **kwargs):
+    """
+    Iterate over all the documents matching the query with `search_after` pagination.
+    Unlike `elasticsearch.helpers.scan`, no search context is kept open on the cluster
+    and the documents are returned in the given sort order.
+
+    :param client: instance of Elasticsearch
+    :param query: Elasticsearch query (optional)
+    :type query: dict
+    :param sort: sort clauses. The last one must be unique per document (e.g. `_uid`)
+    :type sort: sequence
+    :param size: number of documents per request
+    :type size: integer
+    :param prefetch: number of pages requested from a background thread ahead of the
+                     one being consumed. If 0, each page is requested when the previous
+                     one has been consumed
+    :type prefetch: integer
+    :param kwargs: extra arguments passed to the `search` request (e.g. `index`)
+    :return: the Elasticsearch documents
+    :rtype: iterator
+    """
+    pages = _search_after_pages(client, query, sort, size, **kwargs)
+    if prefetch > 0:
+        pages = read_ahead(pages, prefetch)
+
+    for page in pages:
+        yield from page
+
+
+def _search_after_pages(client, query, sort, size, **kwargs):
+    body = dict(query or {}, sort=list(sort), size=size)
+
+    while True:
+        response = client.search(body=body, **kwargs)
+        hits = response['hits']['hits']
+        yield hits
+        if len(hits) < size:
+            return
+        body = dict(body, search_after=hits[-1]['sort'])
+
+
+class AdaptivePageSize(object):
+    """
+    Number of documents requested per page, adapted to the observed responses so
+    that a page takes about `target_time` seconds and `target_bytes` bytes. It can
+    be shared by several threads.
+
+    :param int initial: the page size until the first observation
+    :param int minimum: the minimum page size
+    :param int maximum: the maximum page size
+    :param float target_time: the desired response time, in seconds
+    :param int target_bytes: the desired response size, in bytes
+    """
+
+    def __init__(self, initial=1000, minimum=100, maximum=10000, target_time=1.0, target_bytes=5 * 1024 * 1024):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_time = target_time
+        self.target_bytes = target_bytes
+        self._size = self._clamp(initial)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self._size
+
+    def observe(self, documents, elapsed, size_bytes):
+        """
+        Adapt the page size to a response.
+
+        :param int documents: the number of documents of the response
+        :param float elapsed: the response time, in seconds
+        :param int size_bytes: the (estimated) size of the response, in bytes
+        """
+        if documents <= 0:
+            return
+
+        ideal = self.maximum
+        if elapsed > 0:
+            ideal = min(ideal, self.target_time * documents / elapsed)
+        if size_bytes > 0:
+            ideal = min(ideal, self.target_bytes * documents / size_bytes)
+
+        with self._lock:
+            # Move half way to the ideal size, so a single slow response does not collapse it
+            self._size = self._clamp((self._size + ideal) / 2)
+
+    def _clamp(self, size):
+        return int(max(self.minimum, min(self.maximum, size)))
+
+
+class SliceProgress(object):
+    """
+    Progress of a slice of a scan run by `sliced_scan`.
+
+    :ivar int slice_id: the ID of the slice
+    :ivar int slices: the number of slices of the scan
+    :ivar total: the number of documents of the slice, known after the first page
+    :ivar int documents: the number of documents obtained so far
+    :ivar int pages: the number of pages obtained so far
+    :ivar int page_size: the page size of the slice
+    :ivar float elapsed: the time spent waiting for Elasticsearch, in seconds
+    :ivar bool done: whether the slice is complete
+    """
+
+    def __init__(self, slice_id, slices):
+        self.slice_id = slice_id
+        self.slices = slices
+        self.total = None
+        self.documents = 0
+        self.pages = 0
+        self.page_size = None
+        self.elapsed = 0.0
+        self.done = False
+
+    def __repr__(self):
+        return ('%s(slice_id=%d, slices=%d, documents=%d, total=%s, done=%s)'
+                % (self.__class__.__name__, self.slice_id, self.slices, self.documents, self.total, self.done))
+
+
+# Messages sent by the workers of `sliced_scan`
+_PAGE, _END, _ERROR = range(3)
+
+
+def sliced_scan(client, query=None, workers=2, splits=4, ordered=False, scroll='5m', page_size=None,
+                progress=None, buffer_size=2, **kwargs):
+    """
+    Iterate over all the documents matching the query using `workers` threads, each
+    of them scrolling over a slice of the results at a time. The results are split
+    in `workers * splits` slices, so the page size of the slices started later is
+    adapted to the responses of the previous ones.
+
+    Workers wait while the pages of their slice are not consumed, so the iterator
+    should be consumed faster than the `scroll` timeout.
+
+    :param client: instance of Elasticsearch
+    :param query: Elasticsearch query (optional)
+    :type query: dict
+    :param workers: number of slices scrolled in parallel
+    :type workers: integer
+    :param splits: number of slices per worker
+    :type splits: integer
+    :param ordered: return the documents of each slice after those of the previous
+                    slices, instead of as soon as they are obtained
+    :type ordered: bool
+    :param scroll: time the scroll contexts are kept alive between requests
+    :type scroll: string
+    :param page_size: the page size of the slices (optional)
+    :type page_size: :class:`dmsclient.helpers.AdaptivePageSize`
+    :param progress: function called with the :class:`dmsclient.helpers.SliceProgress` of a
+                     slice after each of its pages, from the worker threads (optional)
+    :param buffer_size: number of pages of each slice (or of all the slices, times
+                        `workers`, if not ordered) kept ready ahead of the consumer
+    :type buffer_size: integer
+    :param kwargs: extra arguments passed to the `search` request (e.g. `index`)
+    :return: the Elasticsearch documents
+    :rtype: iterator
+    """
+    slices = workers * splits
+    page_size = page_size or AdaptivePageSize()
+    stop = threading.Event()
+
+    if ordered:
+        outputs = [queue.Queue(buffer_size) for _ in range(slices)]
+    else:
+        outputs = [queue.Queue(buffer_size * workers)] * slices
+
+    def put(slice_id, message):
+        while not stop.is_set():
+            try:
+                outputs[slice_id].put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def scroll_slice(slice_id):
+        if stop.is_set():
+            return
+        try:
+            for page in _scroll_slice(client, query, slice_id, slices, scroll, page_size, progress, stop, **kwargs):
+                if not put(slice_id, (_PAGE, page)):
+                    return
+            put(slice_id, (_END, None))
+        except BaseException as e:
+            put(slice_id, (_ERROR, e))
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    for slice_id in range(slices):
+        executor.submit(scroll_slice, slice_id)
+
+    try:
+        pending = slices
+        slice_id = 0
+        while pending:
+            kind, payload = outputs[slice_id].get()
+            if kind == _PAGE:
+                yield from payload
+                continue
+            if kind == _ERROR:
+                raise payload
+            pending -= 1
+            if ordered:
+                slice_id += 1
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def _scroll_slice(client, query, slice_id, slices, scroll, page_size, progress, stop, **kwargs):
+    body = dict(query or {})
+    body.setdefault('sort', '_doc')
+    if slices > 1:
+        body['slice'] = {'id': slice_id, 'max': slices}
+
+    slice_progress = SliceProgress(slice_id, slices)
+    slice_progress.page_size = page_size.size
+
+    start = time.time()
+    response = client.search(body=body, scroll=scroll, size=slice_progress.page_size, **kwargs)
+    scroll_id = response.get('_scroll_id')
+    slice_progress.total = response['hits']['total']
+    try:
+        while True:
+            elapsed = time.time() - start
+            hits = response['hits']['hits']
+            if hits:
+                # Estimated from a single document to avoid serializing the whole page again
+                page_size.observe(len(hits), elapsed, len(hits) * len(json.dumps(hits[0])))
+
+            slice_progress.pages += 1
+            slice_progress.documents += len(hits)
+            slice_progress.elapsed += elapsed
+            slice_progress.done = not hits or not scroll_id
+            if progress is not None:
+                progress(slice_progress)
+
+            if not hits:
+                return
+            yield hits
+            if not scroll_id or stop.is_set():
+                return
+
+            start = time.time()
+            response = client.scroll(scroll_id=scroll_id, scroll=scroll)
+            scroll_id = response.get('_scroll_id')
+    finally:
+        if scroll_id:
+            client.clear_scroll(body={'scroll_id': [scroll_id]}, ignore=(404,))
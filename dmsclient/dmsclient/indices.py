@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 
 
@@ -8,6 +9,34 @@ class Indices(object):
     INDEX_JOURNAL_PREFIX = 'volvo-z1-log-v1'
 
     @staticmethod
-    def timebased(prefix):
-        utc_time = datetime.utcnow()
+    def timebased(prefix, timestamp=None):
+        """
+        Return the monthly index for the given prefix.
+
+        :param string prefix: the index prefix
+        :param datetime timestamp: the time the index belongs to. If None, the current
+                                   UTC time is used (optional)
+        :return: the index name (e.g. `volvo-z1-resim-v1-2018-03`)
+        :rtype: string
+        """
+        utc_time = timestamp or datetime.utcnow()
         return '-'.join([prefix, str(utc_time.year), str(utc_time.month).zfill(2)])
+
+    @staticmethod
+    def timestamp_from_id(regex, doc_id):
+        """
+        Parse the start month of a document ID whose format includes the segment
+        start timestamp (`start_year` and `start_month` groups of the regex).
+
+        :param string regex: the regular expression used to parse the ID
+        :param string doc_id: the document ID
+        :return: the first day of the start month, or None if the ID does not match
+        :rtype: datetime
+        """
+        m = re.match(regex, doc_id) if doc_id else None
+        if not m:
+            return None
+        try:
+            return datetime(year=int(m.group('start_year')), month=int(m.group('start_month')), day=1)
+        except ValueError:
+            return None
@@ -1,15 +1,53 @@
 import abc
 from enum import Enum
 
+from dmsclient.indices import Indices
+
 
 class BaseModel(abc.ABC):
     """
     Base class for DMS models (drive, segment, etc.).
+
+    Time-based models can define `INDEX_PREFIX` and `PLACEMENT_REGEX` to derive their
+    monthly index from the document ID (see `index_for_id`).
+
+    Models whose constructor only converts its arguments define `DATETIME_FIELDS`,
+    the fields parsed as datetimes, so their documents are decoded by a
+    :class:`dmsclient.models.codec.ModelCodec` instead of the constructor. The ones
+    that the constructor leaves as None when they are empty are listed in
+    `NULLABLE_DATETIME_FIELDS` as well.
+
+    Models loaded in large numbers also define `__slots__` with the parameters of
+    their constructor, so their objects have no `__dict__`.
     """
 
+    __slots__ = ('_extra_fields',)
+
+    INDEX_PREFIX = None
+    PLACEMENT_REGEX = None
+    DATETIME_FIELDS = None
+    NULLABLE_DATETIME_FIELDS = ()
+
     def __init__(self, *args, **kwargs):
         self.extra_fields = kwargs
 
+    @property
+    def extra_fields(self):
+        """
+        The fields of the document that are not attributes of the model. The dict is
+        only allocated when there are such fields or when it is accessed.
+
+        :rtype: dict
+        """
+        extra_fields = getattr(self, '_extra_fields', None)
+        if extra_fields is None:
+            extra_fields = self._extra_fields = {}
+        return extra_fields
+
+    @extra_fields.setter
+    def extra_fields(self, value):
+        self._extra_fields = value or None
+
     @property
     @abc.abstractmethod
     def id(self):
@@ -20,6 +58,38 @@ class BaseModel(abc.ABC):
     def timebased(self):
         pass
 
+    @classmethod
+    def index_for_id(cls, doc_id):
+        """
+        Return the monthly index of the document with the given ID, derived from the
+        start timestamp included in the ID. Used by the client when deterministic
+        placement is enabled.
+
+        :param doc_id: the document ID
+        :type doc_id: string
+        :return: the index name, or None if the index cannot be derived from the ID
+        :rtype: string
+        """
+        if cls.INDEX_PREFIX is None or cls.PLACEMENT_REGEX is None:
+            return None
+        timestamp = Indices.timestamp_from_id(cls.PLACEMENT_REGEX, doc_id)
+        return Indices.timebased(cls.INDEX_PREFIX, timestamp) if timestamp else None
+
+    @classmethod
+    def codec(cls):
+        """
+        Return the codec of the model class, which is generated on the first call.
+
+        :return: the codec
+        :rtype: :class:`dmsclient.models.codec.ModelCodec`
+        """
+        codec = cls.__dict__.get('_codec')
+        if codec is None:
+            from dmsclient.models.codec import ModelCodec
+            codec = ModelCodec(cls)
+            cls._codec = codec
+        return codec
+
     @classmethod
     def from_elasticsearch(cls, document):
         """
@@ -30,7 +100,9 @@ class BaseModel(abc.ABC):
         :type document: dict
         :return: a model object
         """
-        return cls(**document['_source'])
+        if cls.DATETIME_FIELDS is None:
+            return cls(**document['_source'])
+        return cls.codec().decode(document['_source'])
 
     def to_dict(self):
         """
@@ -40,15 +112,13 @@ class BaseModel(abc.ABC):
         :return: the model dict
         :rtype: dict
         """
-        def normalize(value):
-            if isinstance(value, Enum):
-                return value.value
-            return value
-
-        s = self.extra_fields.copy() if hasattr(self, 'extra_fields') else {}
-        s.update(self.__dict__)
-        s.pop('extra_fields', None)
-        s = {k: normalize(v) for k, v in s.items()}
+        if self.DATETIME_FIELDS is not None:
+            return self.codec().encode(self)
+
+        s = {}
+        for fields in (getattr(self, '_extra_fields', None) or {}, self.__dict__):
+            for k, v in fields.items():
+                s[k] = v.value if isinstance(v, Enum) else v
         return s
 
     def __eq__(self, other):
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from dmsclient.indices import Indices
 from dmsclient.models import BaseModel
+from dmsclient.models.segment import Segment
 from dmsclient.templates import Templates
 from dmsclient.utils import str_to_datetime
 
@@ -12,9 +13,13 @@ class AsdmOutput(BaseModel):
     """
 
     TEMPLATE = Templates.TEMPLATE_RESIM
-    INDEX = Indices.timebased(Indices.INDEX_RESIM_PREFIX)
+    INDEX_PREFIX = Indices.INDEX_RESIM_PREFIX
+    INDEX = Indices.timebased(INDEX_PREFIX)
     DOC_TYPE = 'asdmoutput'
 
+    # ASDM outputs are placed by the segment ID their ID starts with, if any
+    PLACEMENT_REGEX = Segment.INGEST_REGEX[:-1]
+
     PROTECTED_ATTRIBUTES = ['asdmoutput_id',
                             'segment_id',
                             'sensor_versions',
@@ -9,9 +9,15 @@ class Cluster(BaseModel):
     Represents the configuration of an Isilon cluster
     """
 
+    __slots__ = ('cluster_id', 'weight', 'available', 'updated_at', 'raw_export', 'perm_export', 'resim_export',
+                 'output_export', 'useroutput_export', 'raw_mount', 'perm_mount', 'resim_mount', 'output_mount',
+                 'useroutput_mount', 'raw_share', 'perm_share', 'resim_share', 'output_share', 'useroutput_share',
+                 'nfs_host', 'smb_host')
+
     TEMPLATE = Templates.TEMPLATE_CONFIG
     INDEX = Indices.INDEX_CONFIG
     DOC_TYPE = 'cluster'
+    DATETIME_FIELDS = ('updated_at',)
 
     def __init__(self, cluster_id, weight, available, updated_at, raw_export, perm_export, resim_export, output_export,
                  useroutput_export, raw_mount, perm_mount, resim_mount, output_mount, useroutput_mount, raw_share,
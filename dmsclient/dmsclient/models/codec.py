@@ -0,0 +1,145 @@
+import inspect
+from enum import Enum
+
+from dmsclient.utils import str_to_datetime
+
+DATETIME_CACHE_SIZE = 4096
+
+_datetimes = {}
+
+
+def intern_datetime(value):
+    """
+    Parse a date and time with `str_to_datetime` and return the same datetime object
+    for equal strings, since the documents loaded together often share their
+    timestamps. Up to `DATETIME_CACHE_SIZE` datetimes are kept.
+
+    :param string value: the date and time
+    :rtype: datetime.datetime
+    """
+    if not isinstance(value, str):
+        return str_to_datetime(value)
+
+    dt = _datetimes.get(value)
+    if dt is None:
+        dt = str_to_datetime(value)
+        if len(_datetimes) >= DATETIME_CACHE_SIZE:
+            _datetimes.clear()
+        _datetimes[value] = dt
+    return dt
+
+
+class ModelCodec(object):
+    """
+    Decoder and encoder of model objects, generated once for each model class from the
+    parameters of its constructor.
+
+    `decode` fills the attributes of the object directly instead of calling the
+    constructor with keyword arguments, and converts the fields listed in the
+    `DATETIME_FIELDS` attribute of the model and the fields whose default value is an
+    enum. Equal datetimes are shared between objects (see `intern_datetime`), and the
+    enums are their singleton members. It is only used for models whose constructor
+    does nothing else, which declare it by defining `DATETIME_FIELDS`.
+
+    Documents are validated like the constructor does: missing required fields,
+    invalid enum values, empty datetimes not listed in `NULLABLE_DATETIME_FIELDS` and,
+    if the constructor takes no `**kwargs`, unknown fields raise the same exceptions.
+
+    `encode` builds the dict of `to_dict` in a single pass. Both work with models
+    defining `__slots__` as well as with regular models.
+
+    :param model_class: the model class
+    """
+
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self.fields = []
+        self.datetime_fields = set(model_class.DATETIME_FIELDS)
+        self.nullable_datetime_fields = set(model_class.NULLABLE_DATETIME_FIELDS)
+        self.enum_fields = {}
+        self.extra_fields = False
+
+        signature = inspect.signature(model_class.__init__)
+        for name, parameter in list(signature.parameters.items())[1:]:
+            if parameter.kind == parameter.VAR_KEYWORD:
+                self.extra_fields = True
+            if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                continue
+            self.fields.append((name, parameter.default))
+            if isinstance(parameter.default, Enum):
+                self.enum_fields[name] = type(parameter.default)
+
+        self.decode = self._compile_decode()
+        self.encode = self._compile_encode()
+
+    def _compile_decode(self):
+        missing = object()
+        namespace = {
+            '_new': object.__new__,
+            '_model_class': self.model_class,
+            '_missing': missing,
+            '_names': frozenset(name for name, _ in self.fields),
+            '_datetime': intern_datetime,
+        }
+
+        lines = ['def decode(source):',
+                 '    obj = _new(_model_class)',
+                 '    get = source.get']
+        for i, (name, default) in enumerate(self.fields):
+            if default is inspect.Parameter.empty:
+                lines.append('    value = get(%r, _missing)' % (name,))
+                lines.append('    if value is _missing:')
+                lines.append('        raise TypeError("missing required field %r")' % (name,))
+            else:
+                namespace['_default_%d' % i] = default
+                lines.append('    value = get(%r, _default_%d)' % (name, i))
+
+            if name in self.nullable_datetime_fields:
+                lines.append('    if value:')
+                lines.append('        value = _datetime(value)')
+                lines.append('    else:')
+                lines.append('        value = None')
+            elif name in self.datetime_fields:
+                lines.append('    value = _datetime(value)')
+            elif name in self.enum_fields:
+                namespace['_enum_%d' % i] = self.enum_fields[name]
+                lines.append('    value = _enum_%d(value)' % (i,))
+            lines.append('    obj.%s = value' % (name,))
+
+        lines.append('    if source.keys() <= _names:')
+        lines.append('        obj._extra_fields = None')
+        lines.append('    else:')
+        if self.extra_fields:
+            lines.append('        obj._extra_fields = {k: v for k, v in source.items() if k not in _names}')
+        else:
+            lines.append('        raise TypeError("unexpected fields %s" % (sorted(source.keys() - _names),))')
+        lines.append('    return obj')
+
+        return self._function('decode', lines, namespace)
+
+    def _compile_encode(self):
+        names = [name for name, _ in self.fields]
+        namespace = {'_Enum': Enum}
+
+        lines = ['def encode(obj):',
+                 '    result = {%s}' % (', '.join('%r: obj.%s' % (name, name) for name in names),)]
+        for name in self.enum_fields:
+            lines.append('    value = result[%r]' % (name,))
+            lines.append('    if isinstance(value, _Enum):')
+            lines.append('        result[%r] = value.value' % (name,))
+        lines.append('    extra_fields = obj._extra_fields')
+        lines.append('    if extra_fields:')
+        lines.append('        for k, v in extra_fields.items():')
+        lines.append('            if k not in result:')
+        lines.append('                result[k] = v.value if isinstance(v, _Enum) else v')
+        lines.append('    return result')
+
+        return self._function('encode', lines, namespace)
+
+    def _function(self, name, lines, namespace):
+        code = compile('\n'.join(lines), '<%s %s>' % (self.model_class.__name__, name), 'exec')
+        exec(code, namespace)
+        return namespace[name]
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.model_class.__name__)
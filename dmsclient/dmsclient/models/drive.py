@@ -14,9 +14,14 @@ class Drive(BaseModel):
     Represents a Drive
     """
 
+    __slots__ = ('drive_id', 'car_id', 'project_name', 'cluster_id', 'ingest_station', 'logged_at', 'updated_at',
+                 'nfs_host', 'smb_host', 'smb_share', 'source_path', 'target_path', 'state', 'flc_state', 'tags',
+                 'size', 'file_count', 'ingest_duration')
+
     TEMPLATE = Templates.TEMPLATE_RAW
     INDEX = Indices.INDEX_RAW
     DOC_TYPE = 'drive'
+    DATETIME_FIELDS = ('logged_at', 'updated_at')
 
     PROTECTED_ATTRIBUTES = ['drive_id',
                             'car_id',
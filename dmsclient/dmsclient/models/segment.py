@@ -14,10 +14,15 @@ class Segment(BaseModel):
     Represents a drive segment
     """
 
+    __slots__ = ('segment_id', 'sequence', 'drive_id', 'project_name', 'car_id', 'cluster_id', 'started_at', 'ended_at',
+                 'created_at', 'updated_at', 'state', 'tags', 'nfs_host', 'smb_host', 'output_export', 'perm_export',
+                 'resim_export', 'output_share', 'perm_share', 'resim_share', 'perm_path', 'output_path', 'resim_path')
+
     TEMPLATE = Templates.TEMPLATE_RESIM
     INDEX = Indices.timebased(Indices.INDEX_RESIM_PREFIX)
 
     DOC_TYPE = 'segment'
+    DATETIME_FIELDS = ('started_at', 'ended_at', 'created_at', 'updated_at')
 
     PROTECTED_ATTRIBUTES = ['segment_id',
                             'drive_id',
@@ -14,10 +14,17 @@ class Sensor(BaseModel):
     Represents a particular sensor obtained from a segment
     """
 
+    __slots__ = ('sensor_id', 'segment_id', 'sensor_type', 'project_name', 'drive_id', 'car_id', 'cluster_id',
+                 'started_at', 'ended_at', 'created_at', 'updated_at', 'state', 'tags', 'perm_path', 'output_path',
+                 'resim_path')
+
     TEMPLATE = Templates.TEMPLATE_RESIM
-    INDEX = Indices.timebased(Indices.INDEX_RESIM_PREFIX)
+    INDEX_PREFIX = Indices.INDEX_RESIM_PREFIX
+    INDEX = Indices.timebased(INDEX_PREFIX)
 
     DOC_TYPE = 'sensor'
+    DATETIME_FIELDS = ('started_at', 'ended_at', 'created_at', 'updated_at')
+    NULLABLE_DATETIME_FIELDS = ('started_at', 'ended_at')
 
     SENSOR_TYPES = ('FLC',
                     'FLR',
@@ -49,6 +56,7 @@ class Sensor(BaseModel):
         INVALID_DATA = 'invalid_data'
 
     INGEST_REGEX = Segment.INGEST_REGEX[:-1] + "_(?P<sensor_type>[A-Z]{2,4})$"
+    PLACEMENT_REGEX = INGEST_REGEX
 
     def __init__(self, sensor_id, segment_id, sensor_type, project_name=None,
                  drive_id=None, car_id=None, cluster_id=None, started_at=None,
@@ -12,10 +12,16 @@ class SensorVersion(BaseModel):
     Represents the result of a resimed sensor using a specific software version
     """
 
+    __slots__ = ('sensorversion_id', 'sensor_id', 'segment_id', 'sensor_type', 'version', 'started_at', 'ended_at',
+                 'state', 'drive_id', 'created_at', 'updated_at', 'perm_path', 'output_path', 'resim_path', 'tags')
+
     TEMPLATE = Templates.TEMPLATE_RESIM
-    INDEX = Indices.timebased(Indices.INDEX_RESIM_PREFIX)
+    INDEX_PREFIX = Indices.INDEX_RESIM_PREFIX
+    INDEX = Indices.timebased(INDEX_PREFIX)
 
     DOC_TYPE = 'sensorversion'
+    DATETIME_FIELDS = ('started_at', 'ended_at', 'created_at', 'updated_at')
+    NULLABLE_DATETIME_FIELDS = ('started_at', 'ended_at')
 
     class State(StrEnum):
         CREATED = 'created'
@@ -25,6 +31,7 @@ class SensorVersion(BaseModel):
         COMPLETED = 'completed'
 
     INGEST_REGEX = Sensor.INGEST_REGEX[:-1] + "_(?P<version>\d{4})$"
+    PLACEMENT_REGEX = INGEST_REGEX
 
     def __init__(self, sensorversion_id, sensor_id, segment_id, sensor_type, version, started_at, ended_at,
                  state=State.CREATED, drive_id=None, created_at=datetime.utcnow(),
@@ -0,0 +1,157 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from uhashring import HashRing
+
+from dmsclient.exceptions import DMSClientException
+from dmsclient.models.cluster import Cluster
+from dmsclient.utils import str_to_datetime, write_json_atomic
+
+
+class ClusterRing(object):
+    """
+    Immutable snapshot of the cluster configuration: the available clusters and the
+    hash ring used to place drives on them.
+
+    A new snapshot is built whenever the configuration changes and replaces the
+    previous one in a single assignment, so readers never see a partially built ring.
+
+    :param clusters: the (cluster, version) tuples of all the Cluster documents, as
+                     returned by `ClusterController.get_all_versioned`
+    :param datetime created_at: time the configuration was obtained from Elasticsearch (optional)
+    :raises dmsclient.exceptions.DMSClientException: if there is no available cluster
+    """
+
+    SNAPSHOT_FORMAT = 1
+
+    def __init__(self, clusters, created_at=None):
+        clusters = list(clusters)
+        self.version = self.fingerprint(clusters)
+        self.created_at = created_at or datetime.utcnow()
+        self._entries = clusters
+        self.clusters = {cluster.cluster_id: cluster for cluster, _ in clusters if cluster.available}
+
+        if len(self.clusters) == 0:
+            raise DMSClientException('There are no available cluster configured in Elasticsearch')
+
+        self.hashring = HashRing(nodes={
+            cluster_id: {
+                'instance': cluster,
+                'weight': cluster.weight
+            } for cluster_id, cluster in self.clusters.items()
+        })
+
+    @staticmethod
+    def fingerprint(clusters):
+        """
+        Return a digest of the cluster configuration, which changes whenever a Cluster
+        document is created, updated or deleted.
+
+        :param clusters: the (cluster, version) tuples of all the Cluster documents
+        :return: the hexadecimal digest
+        :rtype: string
+        """
+        entries = sorted((cluster.cluster_id, str(version), str(cluster.updated_at))
+                         for cluster, version in clusters)
+        return hashlib.sha1(repr(entries).encode('utf-8')).hexdigest()
+
+    def get_cluster(self, key):
+        """
+        Return the cluster object for the provided key.
+
+        :param key: the key to look for, normally, the drive ID.
+        :return: a cluster object
+        :rtype: :py:class:`dmsclient.models.cluster.Cluster`
+        """
+        return self.hashring.get_node_instance(key)
+
+    def placement(self, keys):
+        """
+        Return the cluster each of the given keys is placed on, without sending any
+        request to Elasticsearch.
+
+        :param keys: the keys to look for, normally, drive IDs
+        :type keys: iterable
+        :return: the cluster objects by key, in the same order as `keys`
+        :rtype: collections.OrderedDict
+        """
+        get_node_instance = self.hashring.get_node_instance
+        return OrderedDict((key, get_node_instance(key)) for key in keys)
+
+    def to_dict(self):
+        """
+        Return the snapshot as a dict that can be serialized to JSON.
+
+        :rtype: dict
+        """
+        entries = []
+        for cluster, version in self._entries:
+            d = cluster.to_dict()
+            d['updated_at'] = cluster.updated_at.isoformat() if cluster.updated_at else None
+            entries.append({'cluster': d, 'version': version})
+
+        return {
+            'format': self.SNAPSHOT_FORMAT,
+            'version': self.version,
+            'created_at': self.created_at.isoformat(),
+            'clusters': entries
+        }
+
+    @classmethod
+    def from_dict(cls, snapshot):
+        """
+        Create a ring from a dict returned by `to_dict`.
+
+        :param snapshot: the snapshot dict
+        :type snapshot: dict
+        :return: the ring
+        :rtype: :class:`dmsclient.ring.ClusterRing`
+        :raises dmsclient.exceptions.DMSClientException: if the snapshot is not valid
+        """
+        if snapshot.get('format') != cls.SNAPSHOT_FORMAT:
+            raise DMSClientException('Unsupported ring snapshot format: %s' % (snapshot.get('format'),))
+
+        try:
+            clusters = [(Cluster(**entry['cluster']), entry['version']) for entry in snapshot['clusters']]
+            created_at = str_to_datetime(snapshot['created_at'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise DMSClientException('Invalid ring snapshot. %s' % (str(e),))
+
+        ring = cls(clusters, created_at=created_at)
+        if ring.version != snapshot.get('version'):
+            raise DMSClientException('Invalid ring snapshot. Version mismatch')
+        return ring
+
+    def save(self, path):
+        """
+        Write the snapshot to a file. The file is replaced atomically, so concurrent
+        readers either see the previous snapshot or the new one.
+
+        :param string path: path of the file
+        """
+        write_json_atomic(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a snapshot written by `save`.
+
+        :param string path: path of the file
+        :return: the ring
+        :rtype: :class:`dmsclient.ring.ClusterRing`
+        :raises dmsclient.exceptions.DMSClientException: if the file cannot be read or is not valid
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            raise DMSClientException("Could not read ring snapshot '%s'. %s" % (path, str(e)))
+        return cls.from_dict(snapshot)
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def __str__(self):
+        return "%s(version='%s', clusters=%d)" % (self.__class__.__name__, self.version, len(self))
@@ -0,0 +1,46 @@
+class Scripts:
+    """
+    Stored painless scripts used by the controllers to update documents. The scripts
+    are registered by `DMSClient.create_templates` and referenced by ID, so
+    Elasticsearch compiles each of them once regardless of the updated fields.
+    """
+
+    MERGE = 'volvo-dms-merge-v1'
+    ADD_TAGS = 'volvo-dms-add-tags-v1'
+    REMOVE_TAGS = 'volvo-dms-remove-tags-v1'
+    REMOVE_FIELD = 'volvo-dms-remove-field-v1'
+
+    @staticmethod
+    def stored(script_id, **params):
+        """
+        Return the reference to a stored script, to be used in update requests.
+
+        :param string script_id: the ID of the stored script
+        :param params: the script parameters
+        :return: the script reference
+        :rtype: dict
+        """
+        return {
+            'id': script_id,
+            'params': params
+        }
+
+
+SCRIPTS = {
+    # Set every entry of `params.doc` as a field of the document
+    Scripts.MERGE: "for (entry in params.doc.entrySet()) { ctx._source[entry.getKey()] = entry.getValue(); }",
+
+    # Add the tags of `params.tags` that the document does not have yet
+    Scripts.ADD_TAGS: "if (ctx._source.tags == null) { ctx._source.tags = []; } "
+                      "for (tag in params.tags) { "
+                      "if (!ctx._source.tags.contains(tag)) { ctx._source.tags.add(tag); } "
+                      "} "
+                      "ctx._source.updated_at = params.updated_at;",
+
+    # Remove all the occurrences of the tags of `params.tags`
+    Scripts.REMOVE_TAGS: "if (ctx._source.tags != null) { ctx._source.tags.removeAll(params.tags); } "
+                         "ctx._source.updated_at = params.updated_at;",
+
+    # Remove the field `params.field`
+    Scripts.REMOVE_FIELD: "ctx._source.remove(params.field);"
+}
@@ -1,11 +1,54 @@
 import datetime
+import json
+import os
+import queue
+import re
+import threading
+from itertools import islice
 
-from dateutil.parser import parse
+
+ISO_8601_REGEX = re.compile(r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6})\d*)?'
+                            r'(?:(Z)|([+-])(\d{2}):?(\d{2}))?$')
+
+
+def parse_iso8601(string):
+    """
+    Parse a strict ISO-8601 date and time, as serialized by Elasticsearch and
+    `datetime.isoformat`, without going through `dateutil`.
+
+    :param string string: the date and time
+    :return: the datetime, or None if the string is not strict ISO-8601
+    :rtype: datetime.datetime
+    """
+    m = ISO_8601_REGEX.match(string)
+    if m is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction, utc, sign, offset_hours, offset_minutes = m.groups()
+    try:
+        if utc:
+            tzinfo = datetime.timezone.utc
+        elif sign:
+            offset = datetime.timedelta(hours=int(offset_hours), minutes=int(offset_minutes))
+            tzinfo = datetime.timezone(-offset if sign == '-' else offset)
+        else:
+            tzinfo = None
+        return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                                 int(fraction.ljust(6, '0')) if fraction else 0, tzinfo)
+    except ValueError:
+        return None
 
 
 def str_to_datetime(string):
     if isinstance(string, datetime.datetime):
         return string
+
+    if isinstance(string, str):
+        dt = parse_iso8601(string)
+        if dt is not None:
+            return dt
+
+    from dateutil.parser import parse
     return parse(string)
 
 
@@ -15,3 +58,75 @@ def datetime_to_str(dt):
 
 def build_scenario_id(name, user):
     return '-'.join((name, user))
+
+
+def chunks(iterable, size):
+    """
+    Split an iterable into lists of at most `size` elements without
+    consuming it all at once.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def write_json_atomic(path, data):
+    """
+    Write `data` as JSON to the file at `path`. The file is replaced atomically,
+    so concurrent readers either see the previous content or the new one.
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.dms-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_ahead(iterable, size):
+    """
+    Iterate over `iterable` from a background thread, which keeps up to `size` items
+    ready ahead of the consumer. Exceptions raised by `iterable` are raised to the
+    consumer. If the consumer stops early, the thread stops after the item it is
+    producing.
+    """
+    items = queue.Queue(size)
+    stop = threading.Event()
+    end = object()
+
+    def put(item, failed=False):
+        while not stop.is_set():
+            try:
+                items.put((item, failed), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(end)
+        except BaseException as e:
+            put(e, failed=True)
+
+    threading.Thread(target=produce, name='dmsclient-read-ahead', daemon=True).start()
+    try:
+        while True:
+            item, failed = items.get()
+            if failed:
+                raise item
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
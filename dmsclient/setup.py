@@ -34,6 +34,10 @@ setup(
     author_email='dell@dell.com',
     tests_require=read('./test-requirements.txt'),
     install_requires=read('./requirements.txt'),
+    extras_require={
+        'async': ['elasticsearch-async>=5.0,<6.0'],
+        'numpy': ['numpy'],
+    },
     test_suite='nose.collector',
     zip_safe=False,
     include_package_data=True,
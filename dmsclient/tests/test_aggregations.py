@@ -0,0 +1,57 @@
+import datetime
+from unittest import TestCase
+
+from dateutil.tz import tzutc
+
+from dmsclient.aggregations import Aggregations
+
+
+class AggregationsTestCase(TestCase):
+
+    def test_builders(self):
+        self.assertEqual(Aggregations.terms('car_id', aggs={'bytes': Aggregations.sum('size')}),
+                         {'terms': {'field': 'car_id', 'size': Aggregations.TERMS_SIZE},
+                          'aggs': {'bytes': {'sum': {'field': 'size'}}}})
+        self.assertEqual(Aggregations.date_histogram('logged_at', 'day'),
+                         {'date_histogram': {'field': 'logged_at', 'interval': 'day'}})
+        self.assertEqual(Aggregations.min('size'), {'min': {'field': 'size'}})
+        self.assertEqual(Aggregations.max('size'), {'max': {'field': 'size'}})
+
+    def test_parse(self):
+        aggs = {
+            'cars': Aggregations.terms('car_id', aggs={'bytes': Aggregations.sum('size')}),
+            'days': Aggregations.date_histogram('logged_at', 'day'),
+            'first': Aggregations.min('logged_at'),
+            'largest': Aggregations.max('size')
+        }
+        result = {
+            'cars': {'buckets': [{'key': 'MLB090', 'doc_count': 3, 'bytes': {'value': 300.0}},
+                                 {'key': 'MLB091', 'doc_count': 1, 'bytes': {'value': 50.0}}]},
+            'days': {'buckets': [{'key': 1521158400000, 'key_as_string': '2018-03-16T00:00:00.000Z',
+                                  'doc_count': 4}]},
+            'first': {'value': 1521195600000.0, 'value_as_string': '2018-03-16T10:20:00.000Z'},
+            'largest': {'value': 200.0}
+        }
+
+        parsed = Aggregations.parse(aggs, result)
+        self.assertEqual(list(parsed['cars'].items()),
+                         [('MLB090', {'count': 3, 'bytes': 300.0}), ('MLB091', {'count': 1, 'bytes': 50.0})])
+        self.assertEqual(parsed['days'], {datetime.datetime(2018, 3, 16, tzinfo=tzutc()): 4})
+        self.assertEqual(parsed['first'], datetime.datetime(2018, 3, 16, 10, 20, tzinfo=tzutc()))
+        self.assertEqual(parsed['largest'], 200.0)
+
+        # No values
+        self.assertIsNone(Aggregations.parse({'first': Aggregations.min('logged_at')},
+                                             {'first': {'value': None}})['first'])
+
+    def test_parse_missing(self):
+        aggs = {
+            'cars': Aggregations.terms('car_id', aggs={'bytes': Aggregations.sum('size')}),
+            'bytes': Aggregations.sum('size'),
+            'first': Aggregations.min('logged_at')
+        }
+        expected = {'cars': {}, 'bytes': 0.0, 'first': None}
+
+        # No index matches the pattern
+        self.assertEqual(Aggregations.parse(aggs, {}), expected)
+        self.assertEqual(Aggregations.parse(aggs, None), expected)
@@ -0,0 +1,252 @@
+import asyncio
+import datetime
+import sys
+import unittest
+from unittest import mock
+
+from elasticsearch import NotFoundError
+from elasticsearch.serializer import JSONSerializer
+
+from dmsclient import factories
+from dmsclient.aio import helpers
+from dmsclient.aio.client import AsyncDMSClient
+from dmsclient.client import DMSClient
+from dmsclient.exceptions import DMSClientException, DMSConflictError, DMSDocumentNotFoundError
+from dmsclient.models.cluster import Cluster
+from dmsclient.models.drive import Drive
+
+
+# The tests use asyncio.run and mock.AsyncMock
+requires_py38 = unittest.skipIf(sys.version_info < (3, 8), 'Requires Python 3.8')
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def _hits(*ids, **kwargs):
+    return {'hits': {'total': len(ids),
+                     'hits': [{'_id': i, '_index': 'index-1', 'sort': [i], '_source': {}} for i in ids]},
+            **kwargs}
+
+
+@requires_py38
+class AsyncHelpersTestCase(unittest.TestCase):
+
+    def test_scan(self):
+        es = mock.AsyncMock()
+        es.search.return_value = _hits('1', '2', _scroll_id='scroll-1')
+        es.scroll.side_effect = [_hits('3', _scroll_id='scroll-2'), _hits(_scroll_id='scroll-2')]
+
+        hits = _run(_collect(helpers.scan(es, {'query': {'match_all': {}}}, index='index-*')))
+        self.assertEqual([h['_id'] for h in hits], ['1', '2', '3'])
+        es.search.assert_called_once_with(body={'query': {'match_all': {}}, 'sort': '_doc'},
+                                          scroll='5m', size=1000, index='index-*')
+        es.clear_scroll.assert_called_once_with(body={'scroll_id': ['scroll-2']}, ignore=(404,))
+
+    def test_search_after(self):
+        for prefetch in (0, 2):
+            es = mock.AsyncMock()
+            es.search.side_effect = [_hits('1', '2'), _hits('3')]
+
+            hits = _run(_collect(helpers.search_after(es, size=2, prefetch=prefetch)))
+            self.assertEqual([h['_id'] for h in hits], ['1', '2', '3'])
+            self.assertEqual(es.search.call_count, 2)
+            self.assertEqual(es.search.call_args[1]['body']['search_after'], ['2'])
+
+    def test_read_ahead(self):
+        async def failing():
+            yield 1
+            raise ValueError('error')
+
+        async def consume():
+            items = []
+            with self.assertRaises(ValueError):
+                async for item in helpers.read_ahead(failing(), 2):
+                    items.append(item)
+            return items
+
+        self.assertEqual(_run(consume()), [1])
+
+    def test_streaming_bulk(self):
+        es = mock.AsyncMock()
+        es.transport = mock.Mock(serializer=JSONSerializer())
+        es.bulk.side_effect = [
+            {'items': [{'create': {'_id': '1', 'status': 201}}, {'create': {'_id': '2', 'status': 409}}]},
+            {'items': [{'create': {'_id': '3', 'status': 201}}]}
+        ]
+        actions = [{'_op_type': 'create', '_index': 'index-1', '_type': 'doc', '_id': str(i), '_source': {}}
+                   for i in range(1, 4)]
+
+        results = _run(_collect(helpers.streaming_bulk(es, actions, chunk_size=2)))
+        self.assertEqual([ok for ok, _ in results], [True, False, True])
+        self.assertEqual(es.bulk.call_count, 2)
+        self.assertEqual(es.bulk.call_args_list[0][0][0].count('\n'), 4)
+
+
+@requires_py38
+@mock.patch('dmsclient.aio.client.AsyncElasticsearch', mock.MagicMock())
+class AsyncDMSClientTestCase(unittest.TestCase):
+
+    def _get_client(self, **kwargs):
+        c = AsyncDMSClient(
+            es_endpoint='http://endpoint',
+            es_user='someone',
+            es_password='password',
+            initial_sync=False,
+            verify_templates=False,
+            create_templates=False,
+            **kwargs
+        )
+        c.elasticsearch = mock.AsyncMock()
+        return c
+
+    def _sync(self, client):
+        cluster = factories.ClusterFactory(available=True)
+        client.elasticsearch.search.return_value = {'_scroll_id': 'scroll-1', 'hits': {'hits': [
+            {'_id': cluster.cluster_id, '_index': Cluster.INDEX, '_source': cluster.to_dict()}
+        ]}}
+        client.elasticsearch.scroll.return_value = {'_scroll_id': 'scroll-1', 'hits': {'hits': []}}
+        _run(client.sync_cluster_config())
+        client.elasticsearch.reset_mock()
+        return cluster
+
+    def test_refresh_policy(self):
+        c = self._get_client(refresh='wait_for')
+        self.assertEqual(c.refresh_params('index-1'), {'refresh': 'wait_for'})
+        self.assertEqual(c.refresh_params('index-1', by_query=True), {'refresh': 'true'})
+        self.assertEqual(c.refresh_params('index-1', refresh=False), {'refresh': 'false'})
+
+    def test_concurrent_sync(self):
+        c = self._get_client()
+        cluster = factories.ClusterFactory(available=True)
+        c.elasticsearch.search.return_value = {'_scroll_id': 'scroll-1', 'hits': {'hits': [
+            {'_id': cluster.cluster_id, '_index': Cluster.INDEX, '_source': cluster.to_dict()}
+        ]}}
+        c.elasticsearch.scroll.return_value = {'_scroll_id': 'scroll-1', 'hits': {'hits': []}}
+
+        async def sync_many():
+            await asyncio.gather(*(c.sync_cluster_config() for _ in range(10)))
+
+        _run(sync_many())
+        c.elasticsearch.search.assert_called_once()
+        self.assertEqual(c.get_cluster('some-drive').cluster_id, cluster.cluster_id)
+
+    def test_background_sync(self):
+        c = self._get_client(sync_interval=datetime.timedelta(milliseconds=10))
+        cluster = factories.ClusterFactory(available=True)
+        changes = []
+
+        async def listener(old, new):
+            changes.append((old, new))
+
+        async def get_all_versioned():
+            yield cluster, 1
+
+        async def run():
+            c.add_topology_listener(listener)
+            c.start_background_sync()
+            await asyncio.sleep(0.1)
+            await c.stop_background_sync()
+
+        with mock.patch.object(c.clusters, 'get_all_versioned', side_effect=get_all_versioned):
+            _run(run())
+
+        self.assertEqual(c.get_cluster('some-drive').cluster_id, cluster.cluster_id)
+        # The ring is only rebuilt once, since the configuration did not change
+        self.assertEqual(changes, [(None, c.ring)])
+
+    def test_get(self):
+        c = self._get_client()
+        self._sync(c)
+        drive = factories.DriveFactory()
+        c.elasticsearch.search.return_value = {'hits': {'total': 1, 'hits': [
+            {'_id': drive.drive_id, '_index': 'index-1', '_source': drive.to_dict()}
+        ]}}
+
+        self.assertEqual(_run(c.drives.get(drive.drive_id)), drive)
+        self.assertEqual(c.index_cache.get((Drive.DOC_TYPE, drive.drive_id)), 'index-1')
+
+        c.elasticsearch.get.side_effect = NotFoundError(404, 'not found', {})
+        c.elasticsearch.search.return_value = {'hits': {'total': 0, 'hits': []}}
+        with self.assertRaises(DMSDocumentNotFoundError):
+            _run(c.drives.get(drive.drive_id))
+        self.assertIsNone(c.index_cache.get((Drive.DOC_TYPE, drive.drive_id)))
+
+    def test_create_conflict(self):
+        c = self._get_client()
+        self._sync(c)
+        segment = factories.SegmentFactory()
+        c.elasticsearch.search.return_value = {'hits': {'total': 1, 'hits': [
+            {'_id': segment.segment_id, '_index': 'index-1', '_source': segment.to_dict()}
+        ]}}
+
+        with self.assertRaises(DMSConflictError):
+            _run(c.segments.create(segment))
+        c.elasticsearch.create.assert_not_called()
+
+    def test_find_by_fields_error(self):
+        c = self._get_client()
+        self._sync(c)
+        c.elasticsearch.search.side_effect = NotFoundError(404, 'index_not_found_exception', {})
+
+        with self.assertRaises(DMSClientException):
+            _run(_collect(c.drives.find_by_fields(state='created')))
+
+    def test_count(self):
+        c = self._get_client()
+        self._sync(c)
+        c.elasticsearch.count.return_value = {'count': 3}
+        c.elasticsearch.search.return_value = {'aggregations': {'state': {'buckets': [
+            {'key': 'copying', 'doc_count': 3}]}}}
+
+        self.assertEqual(_run(c.drives.count(state='copying')), 3)
+        self.assertEqual(dict(_run(c.drives.count_by('state'))), {'copying': 3})
+
+    def test_find_sorted_by_query(self):
+        c = self._get_client()
+        self._sync(c)
+        c.elasticsearch.search.side_effect = [_hits('1', '2'), _hits()]
+
+        hits = _run(_collect(c.drives.find_sorted_by_query({}, postprocess=False, size=2, prefetch=0)))
+        self.assertEqual([h['_id'] for h in hits], ['1', '2'])
+        self.assertEqual(c.elasticsearch.search.call_args_list[0][1]['body']['sort'], ['drive_id'])
+
+        with self.assertRaises(ValueError):
+            c.drives.find_sorted_by_query({}, source=['state'])
+
+    def test_columnar_find_by_query(self):
+        c = self._get_client()
+        self._sync(c)
+        c.drives.SEARCH_PAGE_SIZE = 2
+        c.elasticsearch.search.return_value = _hits('1', '2', '3', _scroll_id='scroll-1')
+        c.elasticsearch.scroll.return_value = _hits(_scroll_id='scroll-1')
+
+        batches = _run(_collect(c.drives.find_by_query({}, columns=['car_id', 'size'])))
+        self.assertEqual([b.ids for b in batches], [['1', '2'], ['3']])
+        self.assertEqual(c.elasticsearch.search.call_args[1]['body']['docvalue_fields'], ['car_id', 'size'])
+
+    def test_same_requests_as_sync(self):
+        c = self._get_client()
+        self._sync(c)
+        sync_client = DMSClient(es_endpoint='http://endpoint', es_user='someone', es_password='password',
+                                initial_sync=False, verify_templates=False, create_templates=False)
+        sync_client.elasticsearch = mock.Mock()
+        sync_client.sync_cluster_config = mock.Mock()
+        for client in (c, sync_client):
+            client.elasticsearch.delete_by_query.return_value = {'total': 1, 'deleted': 1}
+            client.elasticsearch.update_by_query.return_value = {'total': 1, 'updated': 1}
+
+        _run(c.drives.delete('drive-1'))
+        sync_client.drives.delete('drive-1')
+        self.assertEqual(c.elasticsearch.delete_by_query.call_args, sync_client.elasticsearch.delete_by_query.call_args)
+
+        _run(c.sensors.update_version('sensor-1', '0001', state='created'))
+        sync_client.sensors.update_version('sensor-1', '0001', state='created')
+        body, sync_body = (client.elasticsearch.update_by_query.call_args[1]['body'] for client in (c, sync_client))
+        self.assertEqual(body['query'], sync_body['query'])
+        self.assertEqual(body['script']['params']['doc']['state'], 'created')
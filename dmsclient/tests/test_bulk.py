@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from dmsclient import factories
+from dmsclient.bulk import BulkResult
+
+
+class BulkResultTestCase(TestCase):
+
+    def test_created(self):
+        segment = factories.SegmentFactory()
+        r = BulkResult.from_elasticsearch({'create': {'_id': segment.segment_id, 'status': 201}},
+                                          document=segment)
+        self.assertEqual(r.doc_id, segment.segment_id)
+        self.assertEqual(r.status, BulkResult.Status.CREATED)
+        self.assertIs(r.document, segment)
+        self.assertTrue(r.ok)
+
+    def test_updated(self):
+        r = BulkResult.from_elasticsearch({'index': {'_id': 'DOC_1', 'status': 200}})
+        self.assertEqual(r.status, BulkResult.Status.UPDATED)
+        self.assertTrue(r.ok)
+
+    def test_conflict(self):
+        r = BulkResult.from_elasticsearch({'create': {'_id': 'DOC_1', 'status': 409,
+                                                      'error': {'type': 'version_conflict_engine_exception'}}})
+        self.assertEqual(r.status, BulkResult.Status.CONFLICT)
+        self.assertEqual(r.error['type'], 'version_conflict_engine_exception')
+        self.assertFalse(r.ok)
+
+    def test_error(self):
+        r = BulkResult.from_elasticsearch({'create': {'_id': 'DOC_1', 'status': 400,
+                                                      'error': {'type': 'mapper_parsing_exception'}}})
+        self.assertEqual(r.status, BulkResult.Status.ERROR)
+        self.assertFalse(r.ok)
+
+    def test_transport_error(self):
+        r = BulkResult.from_elasticsearch({'create': {'_id': 'DOC_1', 'status': 'N/A', 'error': 'ConnectionError'}})
+        self.assertEqual(r.status, BulkResult.Status.ERROR)
+        self.assertEqual(r.error, 'ConnectionError')
+        self.assertFalse(r.ok)
+
+    def test_not_found(self):
+        r = BulkResult.from_elasticsearch({'update': {'_id': 'DOC_1', 'status': 404,
+                                                      'error': {'type': 'document_missing_exception'}}})
+        self.assertEqual(r.status, BulkResult.Status.NOT_FOUND)
+        self.assertFalse(r.ok)
@@ -0,0 +1,66 @@
+import time
+from unittest import TestCase
+
+from dmsclient.cache import LRUCache
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_get_set(self):
+        cache = LRUCache(10)
+        cache.set('key-1', 'value-1')
+        self.assertEqual(cache.get('key-1'), 'value-1')
+        self.assertIsNone(cache.get('key-2'))
+        self.assertEqual(cache.get('key-2', 'default'), 'default')
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['size'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3.0)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(2)
+        cache.set('key-1', 'value-1')
+        cache.set('key-2', 'value-2')
+        cache.get('key-1')
+        cache.set('key-3', 'value-3')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('key-1'), 'value-1')
+        self.assertIsNone(cache.get('key-2'))
+        self.assertEqual(cache.get('key-3'), 'value-3')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl(self):
+        cache = LRUCache(10, ttl=0.05)
+        cache.set('key-1', 'value-1')
+        self.assertEqual(cache.get('key-1'), 'value-1')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('key-1'))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        cache = LRUCache(10)
+        cache.set('key-1', 'value-1')
+        cache.set('key-2', 'value-2')
+        cache.invalidate('key-1')
+        cache.invalidate('key-3')
+        self.assertIsNone(cache.get('key-1'))
+        self.assertEqual(cache.get('key-2'), 'value-2')
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate_where(self):
+        cache = LRUCache(10)
+        cache.set(('drive', 'id-1'), 'value-1')
+        cache.set(('drive', 'id-2'), 'value-2')
+        cache.set(('segment', 'id-1'), 'value-3')
+        cache.invalidate_where(lambda key: key[0] == 'drive')
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(('segment', 'id-1')), 'value-3')
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
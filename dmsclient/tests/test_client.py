@@ -1,12 +1,26 @@
 import datetime
+import gzip
+import json
+import os
+import tempfile
 import time
 import unittest
+from unittest import mock
 
+from elasticsearch import ConnectionError, NotFoundError, TransportError
+
+from dmsclient import factories
+from dmsclient.aggregations import Aggregations
+from dmsclient.bulk import BulkResult
 from dmsclient.client import DMSClient
 from dmsclient.controllers.clusters import ClusterController
 from dmsclient.controllers.drives import DriveController
 from dmsclient.controllers.readers import ReaderController
 from dmsclient.controllers.segments import SegmentController
+from dmsclient.exceptions import DMSClientException, DMSDocumentNotFoundError
+from dmsclient.models.sensor import Sensor
+from dmsclient.scripts import Scripts, SCRIPTS
+from tests.test_helpers import SlicedElasticsearch
 
 
 class DMSClientTestCase(unittest.TestCase):
@@ -36,6 +50,7 @@ class DMSClientTestCase(unittest.TestCase):
             self.assertTrue(hasattr(c, controller[0]),
                             "Client does not have controller '%s'" % controller[0])
             self.assertIsInstance(getattr(c, controller[0]), controller[1])
+            self.assertIs(c.__dict__[controller[0]], getattr(c, controller[0]))
 
     def test_verify_initial_syncd(self):
         c = DMSClient(
@@ -48,3 +63,477 @@ class DMSClientTestCase(unittest.TestCase):
         )
 
         self.assertEqual(c.last_sync, datetime.datetime.min)
+
+    def _get_client(self, **kwargs):
+        kwargs.setdefault('es_endpoint', 'http://endpoint')
+        return DMSClient(
+            es_user='someone',
+            es_password='password',
+            initial_sync=False,
+            verify_templates=False,
+            create_templates=False,
+            **kwargs
+        )
+
+    def test_refresh_policy(self):
+        c = self._get_client()
+        self.assertEqual(c.refresh_params('index-1'), {'refresh': 'true'})
+        self.assertEqual(c.refresh_params('index-1', refresh='false'), {'refresh': 'false'})
+        self.assertEqual(c.refresh_params('index-1', refresh=False), {'refresh': 'false'})
+
+        c = self._get_client(refresh='wait_for')
+        self.assertEqual(c.refresh_params('index-1'), {'refresh': 'wait_for'})
+        self.assertEqual(c.refresh_params('index-1', by_query=True), {'refresh': 'true'})
+
+    def test_invalid_refresh_policy(self):
+        with self.assertRaises(ValueError):
+            self._get_client(refresh='sometimes')
+
+    def test_batch(self):
+        c = self._get_client()
+        with mock.patch.object(c.elasticsearch.indices, 'refresh') as refresh:
+            with c.batch():
+                self.assertEqual(c.refresh_params('index-2'), {'refresh': 'false'})
+                with c.batch():
+                    self.assertEqual(c.refresh_params('index-1'), {'refresh': 'false'})
+                self.assertEqual(c.refresh_params('index-1', refresh='true'), {'refresh': 'true'})
+                refresh.assert_not_called()
+            refresh.assert_called_once_with(index='index-1,index-2', ignore_unavailable=True)
+
+        self.assertEqual(c.refresh_params('index-1'), {'refresh': 'true'})
+
+    def test_batch_error(self):
+        c = self._get_client()
+        with mock.patch.object(c.elasticsearch.indices, 'refresh', side_effect=ConnectionError('N/A', 'refresh', None)):
+            with self.assertRaises(ValueError):
+                with c.batch():
+                    c.refresh_params('index-1')
+                    raise ValueError('error in the batch')
+
+            with self.assertRaises(DMSClientException):
+                with c.batch():
+                    c.refresh_params('index-1')
+
+        self.assertEqual(c.refresh_params('index-1'), {'refresh': 'true'})
+
+    def test_multiple_endpoints(self):
+        c = self._get_client(es_endpoint='http://node-1:9200, http://node-2:9200', maxsize=16)
+        stats = c.connection_stats()
+        self.assertEqual(stats['live'], 2)
+        self.assertEqual(stats['dead'], 0)
+        self.assertEqual(sorted(s['host'] for s in stats['connections']),
+                         ['http://node-1:9200', 'http://node-2:9200'])
+        for s in stats['connections']:
+            self.assertEqual(s['maxsize'], 16)
+            self.assertEqual(s['requests'], 0)
+
+        with self.assertRaises(ValueError):
+            self._get_client(es_endpoint=' , ')
+
+    def test_http_compress(self):
+        c = self._get_client(http_compress=True)
+        connection = c.elasticsearch.transport.connection_pool.connections[0]
+        response = mock.Mock(status=200, data=b'{}', getheaders=lambda: {})
+
+        with mock.patch.object(connection.pool, 'urlopen', return_value=response) as urlopen:
+            connection.perform_request('POST', '/_bulk', body=b'{"index": {}}\n{}\n')
+            connection.perform_request('GET', '/')
+
+        body, headers = urlopen.call_args_list[0][0][2], urlopen.call_args_list[0][1]['headers']
+        self.assertEqual(gzip.decompress(body), b'{"index": {}}\n{}\n')
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertEqual(headers['accept-encoding'], 'gzip,deflate')
+        self.assertNotIn('content-encoding', urlopen.call_args_list[1][1]['headers'])
+        self.assertEqual(connection.stats()['requests'], 2)
+
+    def test_document_cache(self):
+        c = self._get_client(document_cache_size=10)
+        drive = factories.DriveFactory()
+        hit = {'_id': drive.drive_id, '_index': 'index-1', '_source': drive.to_dict()}
+
+        with mock.patch.object(c.elasticsearch, 'search',
+                               return_value={'hits': {'total': 1, 'hits': [hit]}}) as search, \
+                mock.patch.object(c.elasticsearch, 'get', return_value=hit) as get, \
+                mock.patch.object(c.elasticsearch, 'update'):
+            d1 = c.drives.get(drive.drive_id, sync=False)
+            d1.state = 'modified'
+            d2 = c.drives.get(drive.drive_id, sync=False)
+            self.assertEqual(search.call_count, 1)
+            get.assert_not_called()
+            self.assertEqual(d2, drive)
+
+            c.drives.set_state(drive.drive_id, 'copying', sync=False)
+            c.drives.get(drive.drive_id, sync=False)
+            get.assert_called_once()
+
+        stats = c.cache_stats()['document']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertIsNone(self._get_client().cache_stats()['document'])
+
+    def test_deterministic_placement(self):
+        c = self._get_client(deterministic_placement=True)
+        sensor = factories.SensorFactory(sensor_id='Z1_BK031_CONT_20180316T102815-20180316T102915_FLC')
+        index = 'volvo-z1-resim-v1-2018-03'
+
+        with mock.patch.object(c.elasticsearch, 'search') as search, \
+                mock.patch.object(c.elasticsearch, 'create') as create, \
+                mock.patch.object(c.elasticsearch, 'get',
+                                  side_effect=NotFoundError(404, 'not found', {})) as get:
+            c.sensors.create(sensor, sync=False)
+            self.assertEqual(create.call_args[1]['index'], index)
+
+            c.index_cache.clear()
+            with self.assertRaises(DMSDocumentNotFoundError):
+                c.sensors.get(sensor.sensor_id, sync=False)
+            self.assertEqual(get.call_args[1]['index'], index)
+            search.assert_not_called()
+
+    def test_timebased_create(self):
+        c = self._get_client()
+        sensor = factories.SensorFactory(sensor_id='Z1_BK031_CONT_20180316T102815-20180316T102915_FLC')
+
+        with mock.patch.object(c.elasticsearch, 'search',
+                               return_value={'hits': {'total': 0, 'hits': []}}) as search, \
+                mock.patch.object(c.elasticsearch, 'create') as create, \
+                mock.patch.object(c, 'sync_cluster_config'):
+            c.sensors.create(sensor, sync=False)
+            search.assert_called_once()
+            self.assertEqual(create.call_args[1]['index'], Sensor.INDEX)
+
+    def test_direct_update(self):
+        c = self._get_client()
+        drive = factories.DriveFactory()
+
+        with mock.patch.object(c.elasticsearch, 'update') as update, \
+                mock.patch.object(c.elasticsearch, 'update_by_query',
+                                  return_value={'total': 1, 'updated': 1}) as update_by_query, \
+                mock.patch.object(c.elasticsearch, 'delete') as delete:
+            c.drives.set_state(drive.drive_id, 'copying', sync=False)
+            update.assert_not_called()
+            update_by_query.assert_called_once()
+
+            c.index_cache.set((drive.DOC_TYPE, drive.drive_id), 'index-1')
+            c.drives.set_state(drive.drive_id, 'copied', sync=False)
+            self.assertEqual(update.call_args[1]['index'], 'index-1')
+            self.assertEqual(update.call_args[1]['body']['script']['id'], Scripts.MERGE)
+            self.assertEqual(update.call_args[1]['body']['script']['params']['doc']['state'], 'copied')
+            self.assertEqual(update_by_query.call_count, 1)
+
+            c.drives.delete(drive.drive_id, sync=False)
+            self.assertEqual(delete.call_args[1]['index'], 'index-1')
+            self.assertIsNone(c.index_cache.get((drive.DOC_TYPE, drive.drive_id)))
+
+    def test_sensor_version_refresh(self):
+        c = self._get_client(refresh='wait_for')
+        sensor = factories.SensorFactory()
+
+        with mock.patch.object(c.elasticsearch, 'create') as create, \
+                mock.patch.object(c.elasticsearch, 'update_by_query',
+                                  return_value={'total': 1, 'updated': 1}) as update_by_query:
+            c.sensors.create_version(sensor, '0011', sync=False)
+            self.assertEqual(create.call_args[1]['params'], {'refresh': 'wait_for'})
+            c.sensors.create_version(sensor, '0012', refresh='false', sync=False)
+            self.assertEqual(create.call_args[1]['params'], {'refresh': 'false'})
+            self.assertNotIn('refresh', create.call_args[1]['body'])
+
+            c.sensors.update_version(sensor.sensor_id, '0011', refresh='false', tag='x', sync=False)
+            self.assertEqual(update_by_query.call_args[1]['params'], {'refresh': 'false'})
+            self.assertEqual(set(update_by_query.call_args[1]['body']['script']['params']['doc']),
+                             {'tag', 'updated_at'})
+
+    def test_get_index(self):
+        c = self._get_client()
+        hits = {'hits': {'total': 1, 'hits': [{'_id': 'DRIVE_1', '_index': 'index-1'}]}}
+
+        with mock.patch.object(c.elasticsearch, 'search', return_value=hits) as search:
+            self.assertEqual(c.get_index('drive-*', 'drive', drive_id='DRIVE_1'), 'index-1')
+            self.assertEqual(c.index_cache.get(('drive', 'DRIVE_1')), 'index-1')
+
+            # Lookups by fields are not cached, the document might have been deleted or moved
+            search.return_value = {'hits': {'total': 0, 'hits': []}}
+            with self.assertRaises(DMSClientException):
+                c.get_index('drive-*', 'drive', drive_id='DRIVE_1')
+            self.assertEqual(search.call_count, 2)
+
+    def test_update_many(self):
+        c = self._get_client()
+        c.index_cache.set(('drive', 'DRIVE_1'), 'index-1')
+        hits = {'hits': {'total': 1, 'hits': [{'_id': 'DRIVE_2', '_index': 'index-2'}]}}
+
+        def bulk(body, **kwargs):
+            items = []
+            for action in body.splitlines()[::2]:
+                _id = json.loads(action)['update']['_id']
+                items.append({'update': {'_id': _id, 'status': 200}})
+            return {'items': items}
+
+        with mock.patch.object(c.elasticsearch, 'search', return_value=hits) as search, \
+                mock.patch.object(c.elasticsearch, 'bulk', side_effect=bulk) as bulk_request:
+            results = c.drives.set_state_many(['DRIVE_1', 'DRIVE_2', 'DRIVE_3'], 'copied', sync=False)
+
+        search.assert_called_once()
+        bulk_request.assert_called_once()
+        lines = [json.loads(line) for line in bulk_request.call_args[0][0].splitlines()]
+        self.assertEqual(lines[0]['update']['_index'], 'index-1')
+        self.assertEqual(lines[2]['update']['_index'], 'index-2')
+        self.assertEqual(lines[1]['doc']['state'], 'copied')
+        self.assertEqual([r.status for r in results],
+                         [BulkResult.Status.UPDATED, BulkResult.Status.UPDATED, BulkResult.Status.NOT_FOUND])
+
+    def test_find_sorted_by_query(self):
+        c = self._get_client()
+        page = [{'_id': 'DRIVE_%d' % i, '_index': 'index-1', 'sort': ['drive#DRIVE_%d' % i],
+                 '_source': {'state': 'ready'}, 'fields': {'size': [i]}} for i in range(2)]
+
+        with mock.patch.object(c.elasticsearch, 'search',
+                               side_effect=[{'hits': {'hits': page}}, {'hits': {'hits': []}}]) as search:
+            hits = list(c.drives.find_sorted_by_query({'query': {'term': {'state': 'ready'}}},
+                                                      postprocess=False, source=['state'],
+                                                      docvalue_fields=['size'], size=2, sync=False))
+
+        self.assertEqual([h['_id'] for h in hits], ['DRIVE_0', 'DRIVE_1'])
+        self.assertEqual(c.index_cache.get(('drive', 'DRIVE_1')), 'index-1')
+        body = search.call_args_list[0][1]['body']
+        self.assertEqual(body['_source'], ['state'])
+        self.assertEqual(body['docvalue_fields'], ['size'])
+        self.assertEqual(body['sort'], ['drive_id'])
+        self.assertEqual(search.call_args_list[1][1]['body']['search_after'], ['drive#DRIVE_1'])
+
+        # Invalid arguments are reported when called, not on the first document
+        with self.assertRaises(ValueError):
+            c.drives.find_sorted_by_query({}, source=['state'], sync=False)
+        with self.assertRaises(ValueError):
+            c.journals.find_sorted_by_query({}, sync=False)
+
+        with mock.patch.object(c.elasticsearch, 'search', side_effect=ConnectionError('N/A', 'error', None)):
+            with self.assertRaises(DMSClientException):
+                list(c.drives.find_sorted_by_query({}, sync=False))
+
+    def test_sliced_find_by_query(self):
+        c = self._get_client()
+        es = SlicedElasticsearch(pages=2)
+        progress = []
+
+        with mock.patch.object(c.elasticsearch, 'search', side_effect=es.search), \
+                mock.patch.object(c.elasticsearch, 'scroll', side_effect=es.scroll), \
+                mock.patch.object(c.elasticsearch, 'clear_scroll', side_effect=es.clear_scroll):
+            hits = list(c.drives.find_by_query({}, postprocess=False, slices=2, progress=progress.append,
+                                               sync=False))
+
+        slices = {p.slice_id: p for p in progress}
+        self.assertEqual(sorted(slices), list(range(2 * 4)))
+        self.assertTrue(all(p.done for p in slices.values()))
+        self.assertEqual(len(hits), sum(p.documents for p in slices.values()))
+        self.assertEqual(c.index_cache.get(('drive', hits[-1]['_id'])), 'index-1')
+
+    def test_columnar_find_by_query(self):
+        c = self._get_client()
+        c.drives.SEARCH_PAGE_SIZE = 2
+        page = [{'_id': 'DRIVE_%d' % i, '_index': 'index-1', 'fields': {'car_id': ['MLB090'], 'size': [i]}}
+                for i in range(3)]
+        shards = {'successful': 1, 'failed': 0, 'total': 1}
+
+        with mock.patch.object(c.elasticsearch, 'search', return_value={'_scroll_id': 'scroll-1', '_shards': shards,
+                                                                        'hits': {'hits': page}}) as search, \
+                mock.patch.object(c.elasticsearch, 'scroll', return_value={'_scroll_id': 'scroll-1', '_shards': shards,
+                                                                           'hits': {'hits': []}}), \
+                mock.patch.object(c.elasticsearch, 'clear_scroll'):
+            batches = list(c.drives.find_by_query({}, columns=['car_id', 'size'], sync=False))
+
+        self.assertEqual([len(b) for b in batches], [2, 1])
+        self.assertEqual(list(batches[1]['size']), [2.0])
+        self.assertEqual(c.index_cache.get(('drive', 'DRIVE_2')), 'index-1')
+        body = search.call_args[1]['body']
+        self.assertEqual(body['_source'], False)
+        self.assertEqual(body['docvalue_fields'], ['car_id', 'size'])
+
+        with self.assertRaises(ValueError):
+            list(c.drives.find_by_query({}, columns=['size'], source=['size'], sync=False))
+
+    def test_count_and_aggregate(self):
+        c = self._get_client()
+        buckets = {'aggregations': {'cluster_id': {'buckets': [{'key': 'cluster-1', 'doc_count': 2},
+                                                               {'key': 'cluster-2', 'doc_count': 1}]}}}
+
+        with mock.patch.object(c.elasticsearch, 'count', return_value={'count': 3}) as count, \
+                mock.patch.object(c.elasticsearch, 'search', return_value=buckets) as search:
+            self.assertEqual(c.drives.count(state='copying', sync=False), 3)
+            self.assertEqual(count.call_args[1]['body'],
+                             {'query': {'bool': {'must': [{'term': {'state': 'copying'}}]}}})
+
+            result = c.drives.count_by('cluster_id', state='copying', sync=False)
+            self.assertEqual(list(result.items()), [('cluster-1', 2), ('cluster-2', 1)])
+            body = search.call_args[1]['body']
+            self.assertEqual(body['size'], 0)
+            self.assertEqual(body['aggs'], {'cluster_id': {'terms': {'field': 'cluster_id', 'size': 1000}}})
+
+            c.drives.aggregate({'cluster_id': Aggregations.terms('cluster_id')},
+                               query={'range': {'size': {'gt': 0}}}, state='copying', sync=False)
+            self.assertEqual(search.call_args[1]['body']['query']['bool']['must'],
+                             [{'term': {'state': 'copying'}}, {'range': {'size': {'gt': 0}}}])
+
+            # No index matches the pattern
+            search.return_value = {'hits': {'total': 0, 'hits': []}}
+            self.assertEqual(c.drives.count_by('cluster_id', sync=False), {})
+
+    def test_create_templates(self):
+        c = self._get_client()
+
+        with mock.patch.object(c.elasticsearch.indices, 'put_template'), \
+                mock.patch.object(c.elasticsearch.transport, 'perform_request') as perform_request:
+            c.create_templates()
+
+        paths = [call[0][1] for call in perform_request.call_args_list]
+        self.assertEqual(paths, ['/_scripts/%s' % (script_id,) for script_id in SCRIPTS])
+        self.assertEqual(perform_request.call_args[1]['body']['script']['lang'], 'painless')
+
+    def test_verify_missing_scripts(self):
+        c = self._get_client()
+
+        def not_found(method, path, body=None):
+            if method == 'GET':
+                raise NotFoundError(404, 'not found', {})
+
+        def forbidden(method, path, body=None):
+            if method == 'GET':
+                raise NotFoundError(404, 'not found', {})
+            raise TransportError(403, 'forbidden', {})
+
+        # Missing scripts are created
+        with mock.patch.object(c.elasticsearch.indices, 'exists_template', return_value=True), \
+                mock.patch.object(c.elasticsearch.transport, 'perform_request',
+                                  side_effect=not_found) as perform_request:
+            c.verify_templates()
+        puts = [call[0][1] for call in perform_request.call_args_list if call[0][0] == 'PUT']
+        self.assertEqual(puts, ['/_scripts/%s' % (script_id,) for script_id in SCRIPTS])
+
+        # Scripts that cannot be created are skipped
+        with mock.patch.object(c.elasticsearch.indices, 'exists_template', return_value=True), \
+                mock.patch.object(c.elasticsearch.transport, 'perform_request',
+                                  side_effect=forbidden):
+            with self.assertLogs('dmsclient', level='WARNING'):
+                c.verify_templates()
+
+        with mock.patch.object(c.elasticsearch.indices, 'exists_template', return_value=False):
+            with self.assertRaises(DMSClientException):
+                c.verify_templates()
+
+    def test_lazy_initialization(self):
+        with mock.patch.object(DMSClient, 'verify_templates') as verify, \
+                mock.patch.object(DMSClient, 'sync_cluster_config') as sync:
+            c = DMSClient(es_endpoint='http://endpoint', es_user='someone', es_password='password', lazy=True)
+            verify.assert_not_called()
+            sync.assert_not_called()
+
+            with mock.patch.object(c.elasticsearch, 'delete_by_query'):
+                c.clusters.delete_all()
+                c.clusters.delete_all()
+
+            verify.assert_called_once_with()
+            self.assertEqual(sync.call_count, 3)
+
+    def test_template_cache_file(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(DMSClient, 'verify_templates') as verify:
+            path = os.path.join(directory, 'templates.json')
+            kwargs = dict(es_user='someone', es_password='password', initial_sync=False,
+                          template_cache_file=path)
+
+            DMSClient(es_endpoint='http://endpoint', **kwargs)
+            DMSClient(es_endpoint='http://endpoint', **kwargs)
+            self.assertEqual(verify.call_count, 1)
+
+            # Other endpoints are verified on their own
+            DMSClient(es_endpoint='http://other', **kwargs)
+            self.assertEqual(verify.call_count, 2)
+
+            # Changing the templates invalidates the fingerprint
+            with mock.patch.object(DMSClient, 'templates_fingerprint', return_value='changed'):
+                DMSClient(es_endpoint='http://endpoint', **kwargs)
+            self.assertEqual(verify.call_count, 3)
+
+            c = DMSClient(es_endpoint='http://other', **kwargs)
+            c.forget_templates()
+            DMSClient(es_endpoint='http://other', **kwargs)
+            self.assertEqual(verify.call_count, 4)
+
+            # Failed verifications are not recorded
+            with mock.patch.object(DMSClient, 'verify_templates', side_effect=DMSClientException('missing')):
+                with self.assertRaises(DMSClientException):
+                    DMSClient(es_endpoint='http://missing', **kwargs)
+            with open(path) as f:
+                self.assertNotIn('http://missing', json.load(f))
+
+    def test_sync_cluster_config(self):
+        c = self._get_client()
+        cluster = factories.ClusterFactory(available=True)
+        versions = [(cluster, 1)]
+        changes = []
+        c.add_topology_listener(lambda old, new: changes.append((old, new)))
+
+        with mock.patch.object(c.clusters, 'get_all_versioned', side_effect=lambda: iter(versions)):
+            c.sync_cluster_config()
+            ring = c.ring
+            self.assertEqual(c.get_cluster('some-drive').cluster_id, cluster.cluster_id)
+            self.assertIs(c.hashring, ring.hashring)
+
+            c.sync_cluster_config(force=True)
+            self.assertIs(c.ring, ring)
+
+            other = factories.ClusterFactory(available=True)
+            versions.append((other, 1))
+            c.sync_cluster_config(force=True)
+            self.assertIsNot(c.ring, ring)
+            self.assertEqual(len(c.ring), 2)
+
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(changes[0], (None, ring))
+        self.assertEqual(changes[1], (ring, c.ring))
+
+    def test_ring_cache_file(self):
+        cluster = factories.ClusterFactory(available=True)
+        versions = [(cluster, 1)]
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(ClusterController, 'get_all_versioned',
+                                  side_effect=lambda: iter(versions)) as get_all:
+            path = os.path.join(directory, 'ring.json')
+            c = self._get_client(ring_cache_file=path)
+            with self.assertRaises(DMSClientException):
+                c.placement(['some-drive'])
+            c.sync_cluster_config()
+            self.assertTrue(os.path.exists(path))
+
+            # A new client starts from the snapshot and revalidates it in the background
+            get_all.reset_mock()
+            other = DMSClient(es_endpoint='http://endpoint', es_user='someone', es_password='password',
+                              verify_templates=False, create_templates=False, ring_cache_file=path)
+            self.assertEqual(other.ring.version, c.ring.version)
+            self.assertEqual(other.placement(['some-drive'])['some-drive'].cluster_id, cluster.cluster_id)
+            other._revalidate_thread.join(5)
+            self.assertEqual(get_all.call_count, 1)
+
+    def test_background_sync(self):
+        c = self._get_client(sync_interval=datetime.timedelta(milliseconds=10))
+        cluster = factories.ClusterFactory(available=True)
+
+        with mock.patch.object(c.clusters, 'get_all_versioned', return_value=[(cluster, 1)]) as get_all:
+            c.start_background_sync()
+            try:
+                for _ in range(100):
+                    if c.ring is not None:
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(c.get_cluster('some-drive').cluster_id, cluster.cluster_id)
+
+                # Requests do not sync while the background sync runs
+                with mock.patch.object(c, 'sync_interval', datetime.timedelta(hours=1)):
+                    c.stop_background_sync()
+                    c.start_background_sync()
+                    calls = get_all.call_count
+                    c.last_sync = datetime.datetime.min
+                    c.sync_cluster_config()
+                    self.assertEqual(get_all.call_count, calls)
+            finally:
+                c.stop_background_sync()
@@ -0,0 +1,176 @@
+import inspect
+import json
+import pickle
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+
+from dmsclient import factories
+from dmsclient.models.cluster import Cluster
+from dmsclient.models.drive import Drive
+from dmsclient.models.segment import Segment
+from dmsclient.models.sensor import Sensor
+from dmsclient.models.sensorversion import SensorVersion
+from dmsclient.utils import parse_iso8601, str_to_datetime
+
+
+def _source(model):
+    return json.loads(json.dumps(model.to_dict(), default=lambda dt: dt.isoformat()))
+
+
+def _attributes(model):
+    attributes = {name: getattr(model, name) for name in model.__slots__}
+    attributes['extra_fields'] = model.extra_fields
+    return attributes
+
+
+class ModelCodecTestCase(TestCase):
+    FACTORIES = [factories.DriveFactory,
+                 factories.SegmentFactory,
+                 factories.SensorFactory,
+                 factories.SensorVersionFactory,
+                 factories.ClusterFactory]
+
+    def test_same_as_constructor(self):
+        for factory in self.FACTORIES:
+            source = _source(factory())
+            model_class = factory._meta.model
+
+            decoded = model_class.from_elasticsearch({'_source': source})
+            constructed = model_class(**source)
+
+            self.assertIs(type(decoded), model_class)
+            self.assertEqual(_attributes(decoded), _attributes(constructed))
+            self.assertEqual(decoded.to_dict(), constructed.to_dict())
+
+    def test_extra_fields(self):
+        source = _source(factories.SegmentFactory())
+        source['unknown_field'] = 'value'
+
+        decoded = Segment.from_elasticsearch({'_source': source})
+        self.assertEqual(decoded.extra_fields, {'unknown_field': 'value'})
+        self.assertEqual(_source(decoded), source)
+
+    def test_conversions(self):
+        source = _source(factories.DriveFactory())
+        source['state'] = 'copying'
+        del source['flc_state']
+
+        drive = Drive.from_elasticsearch({'_source': source})
+        self.assertIs(drive.state, Drive.State.COPYING)
+        self.assertIs(drive.flc_state, Drive.FLCState.NOT_READY)
+        self.assertIsInstance(drive.logged_at, datetime)
+
+        source['state'] = 'unknown'
+        with self.assertRaises(ValueError):
+            Drive.from_elasticsearch({'_source': source})
+
+    def test_missing_field(self):
+        source = _source(factories.SegmentFactory())
+        del source['drive_id']
+
+        with self.assertRaises(TypeError):
+            Segment.from_elasticsearch({'_source': source})
+
+    def test_validated_as_constructor(self):
+        def error(function, source):
+            try:
+                function(source)
+            except Exception as e:
+                return type(e)
+
+        # Empty datetimes are only accepted where the constructor accepts them
+        source = _source(factories.SensorFactory())
+        source['started_at'] = None
+        self.assertIsNone(Sensor.from_elasticsearch({'_source': source}).started_at)
+        source['updated_at'] = None
+        expected = error(lambda s: Sensor(**s), source)
+        self.assertIsNotNone(expected)
+        self.assertIs(error(lambda s: Sensor.from_elasticsearch({'_source': s}), source), expected)
+
+        # Unknown fields are rejected by models without extra fields
+        source = _source(factories.ClusterFactory())
+        source['unknown_field'] = 'value'
+        self.assertIs(error(lambda s: Cluster(**s), source), TypeError)
+        self.assertIs(error(lambda s: Cluster.from_elasticsearch({'_source': s}), source), TypeError)
+
+    def test_encode(self):
+        drive = factories.DriveFactory(state='copying', unknown_field=Drive.State.COPIED)
+        d = drive.to_dict()
+        self.assertEqual(d['state'], 'copying')
+        self.assertIs(type(d['state']), str)
+        self.assertEqual(d['unknown_field'], 'copied')
+        self.assertNotIn('extra_fields', d)
+        self.assertNotIn('_extra_fields', d)
+
+    def test_codec_is_cached(self):
+        self.assertIs(Drive.codec(), Drive.codec())
+        self.assertIsNot(Drive.codec(), Segment.codec())
+
+
+class ModelSlotsTestCase(TestCase):
+    MODELS = [Drive, Segment, Sensor, SensorVersion, Cluster]
+
+    def test_slots_match_constructor(self):
+        for model_class in self.MODELS:
+            parameters = [name for name, parameter in inspect.signature(model_class.__init__).parameters.items()
+                          if parameter.kind == parameter.POSITIONAL_OR_KEYWORD]
+            self.assertEqual(list(model_class.__slots__), parameters[1:])
+
+    def test_no_dict(self):
+        drive = factories.DriveFactory()
+        self.assertFalse(hasattr(drive, '__dict__'))
+        with self.assertRaises(AttributeError):
+            drive.unknown_attribute = 1
+
+    def test_extra_fields_allocated_when_present(self):
+        source = _source(factories.SensorFactory())
+        sensor = Sensor.from_elasticsearch({'_source': source})
+        self.assertIsNone(sensor._extra_fields)
+        self.assertIsNone(Sensor(**source)._extra_fields)
+
+        sensor.extra_fields['unknown_field'] = 'value'
+        self.assertEqual(sensor.to_dict()['unknown_field'], 'value')
+
+    def test_interned_datetimes(self):
+        source = _source(factories.SegmentFactory())
+        a = Segment.from_elasticsearch({'_source': dict(source)})
+        b = Segment.from_elasticsearch({'_source': dict(source)})
+        self.assertIs(a.started_at, b.started_at)
+        self.assertIs(a.state, b.state)
+
+    def test_pickle_and_equality(self):
+        for model in (factories.DriveFactory(unknown_field='value'), factories.ClusterFactory()):
+            copy = pickle.loads(pickle.dumps(model))
+            self.assertEqual(copy, model)
+            self.assertEqual(copy.extra_fields, model.extra_fields)
+
+
+class ISO8601TestCase(TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parse_iso8601('2017-08-23T07:32:18'), datetime(2017, 8, 23, 7, 32, 18))
+        self.assertEqual(parse_iso8601('2017-08-23 07:32:18.25'), datetime(2017, 8, 23, 7, 32, 18, 250000))
+        self.assertEqual(parse_iso8601('2017-08-23T07:32:18.123Z'),
+                         datetime(2017, 8, 23, 7, 32, 18, 123000, tzinfo=timezone.utc))
+        self.assertEqual(parse_iso8601('2017-08-23T07:32:18+02:00'),
+                         datetime(2017, 8, 23, 7, 32, 18, tzinfo=timezone(timedelta(hours=2))))
+        self.assertEqual(parse_iso8601('2017-08-23T07:32:18-0530'),
+                         datetime(2017, 8, 23, 7, 32, 18, tzinfo=timezone(-timedelta(hours=5, minutes=30))))
+
+    def test_not_strict(self):
+        for string in ('2017-08-23', '20170823T073218', '2017-13-23T07:32:18', 'Aug 23 2017'):
+            self.assertIsNone(parse_iso8601(string))
+
+    def test_fallback(self):
+        self.assertEqual(str_to_datetime('20170823T073218'), datetime(2017, 8, 23, 7, 32, 18))
+        self.assertEqual(str_to_datetime('2017-08-23'), datetime(2017, 8, 23))
+        with self.assertRaises(ValueError):
+            str_to_datetime('2017-13-23T07:32:18')
+
+    def test_same_as_dateutil(self):
+        from dateutil.parser import parse
+
+        for string in ('2017-08-23T07:32:18', '2017-08-23T07:32:18.000123',
+                       '2017-08-23T07:32:18Z', '2017-08-23T07:32:18.5-03:00'):
+            self.assertEqual(parse_iso8601(string), parse(string))
+            self.assertEqual(parse_iso8601(string).isoformat(), parse(string).isoformat())
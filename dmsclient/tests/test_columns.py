@@ -0,0 +1,99 @@
+import math
+from datetime import datetime, timezone
+from unittest import TestCase, skipIf
+
+from dmsclient.columns import ColumnBatch, field_types
+from dmsclient.models.drive import Drive
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _hit(i, **fields):
+    return {'_id': 'DRIVE_%d' % i, '_source': {'source_path': '/source/%d' % i},
+            'fields': {name: [value] for name, value in fields.items()}}
+
+
+class ColumnBatchTestCase(TestCase):
+
+    def setUp(self):
+        self.batch = ColumnBatch.for_model(Drive, ['car_id', 'size', 'logged_at', 'source_path'])
+
+    def test_types(self):
+        types = field_types(Drive)
+        self.assertEqual(types['size'], 'long')
+        self.assertEqual(types['logged_at'], 'date')
+        self.assertEqual(list(self.batch.types.values()), ['keyword', 'long', 'date', 'keyword'])
+        self.assertEqual(ColumnBatch.for_model(Drive, ['unknown']).types['unknown'], None)
+
+    def test_projection(self):
+        self.assertEqual(self.batch.projection(), (False, ['car_id', 'size', 'logged_at', 'source_path']))
+
+        batch = ColumnBatch.for_model(Drive, ['size', 'tags'])
+        self.assertEqual(batch.projection(), (['tags'], ['size']))
+
+    def test_append(self):
+        self.batch.append(_hit(0, car_id='MLB090', size=10, logged_at=1503473538000))
+        self.batch.append({'_id': 'DRIVE_1', '_source': {'car_id': 'MLB' + '090', 'size': 20,
+                                                         'logged_at': '2017-08-23T07:32:18'}})
+        self.batch.append({'_id': 'DRIVE_2'})
+
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.ids, ['DRIVE_0', 'DRIVE_1', 'DRIVE_2'])
+        self.assertEqual(self.batch['car_id'], ['MLB090', 'MLB090', None])
+        self.assertIs(self.batch['car_id'][0], self.batch['car_id'][1])
+        self.assertEqual(list(self.batch['size'][:2]), [10.0, 20.0])
+        self.assertTrue(math.isnan(self.batch['size'][2]))
+        self.assertEqual(list(self.batch['logged_at'][:2]), [1503473538000.0, 1503473538000.0])
+        self.assertTrue(math.isnan(self.batch['logged_at'][2]))
+        self.assertEqual(self.batch['source_path'], ['/source/0', None, None])
+
+    def test_source_fields(self):
+        batch = ColumnBatch.for_model(Drive, ['tags', 'logged_at'])
+        batch.append({'_id': 'DRIVE_0', '_source': {'tags': ['raw', 'test'],
+                                                    'logged_at': '2017-08-23T09:32:18+02:00'}})
+
+        self.assertEqual(batch['tags'], [['raw', 'test']])
+        millis = datetime(2017, 8, 23, 7, 32, 18, tzinfo=timezone.utc).timestamp() * 1000
+        self.assertEqual(list(batch['logged_at']), [millis])
+
+    def test_concat(self):
+        batches = []
+        for i in range(3):
+            batch = self.batch.empty()
+            batch.append(_hit(i, size=i))
+            batches.append(batch)
+
+        result = ColumnBatch.concat(batches)
+        self.assertEqual(result.ids, ['DRIVE_0', 'DRIVE_1', 'DRIVE_2'])
+        self.assertEqual(list(result['size']), [0.0, 1.0, 2.0])
+
+        with self.assertRaises(ValueError):
+            ColumnBatch.concat([])
+        with self.assertRaises(ValueError):
+            ColumnBatch.concat([self.batch, ColumnBatch.for_model(Drive, ['size'])])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_to_numpy(self):
+        self.batch.append(_hit(0, car_id='MLB090', size=10, logged_at=1503473538000))
+        self.batch.append({'_id': 'DRIVE_1'})
+
+        arrays = self.batch.to_numpy()
+        self.assertEqual(arrays['size'].dtype, numpy.float64)
+        self.assertEqual(arrays['logged_at'][0], numpy.datetime64('2017-08-23T07:32:18', 'ms'))
+        self.assertTrue(numpy.isnat(arrays['logged_at'][1]))
+        self.assertEqual(list(arrays['car_id']), ['MLB090', None])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_append_after_to_numpy(self):
+        self.batch.append(_hit(0, size=10))
+        arrays = self.batch.to_numpy()
+
+        self.batch.append(_hit(1, size=20))
+        self.assertEqual(list(arrays['size']), [10.0])
+        self.assertEqual(list(self.batch['size']), [10.0, 20.0])
+
+        arrays['size'][0] = 0
+        self.assertEqual(self.batch['size'][0], 10.0)
@@ -83,6 +83,22 @@ class DriveControllerTestCase(BaseTestCase):
         self.assertIsInstance(drive, Drive)
         self.assertEqual(drive.drive_id, self.drive_1.drive_id)
 
+    def test_get_drive_cached_index(self):
+        self.client.index_cache.clear()
+        self.client.drives.get(self.drive_1.drive_id)
+        hits = self.client.index_cache.hits
+
+        drive = self.client.drives.get(self.drive_1.drive_id)
+        self.assertEqual(drive.drive_id, self.drive_1.drive_id)
+        self.assertEqual(self.client.index_cache.hits, hits + 1)
+
+    def test_get_deleted_drive_cached_index(self):
+        self.client.drives.get(self.drive_1.drive_id)
+        self.client.drives.delete(self.drive_1.drive_id)
+
+        with self.assertRaises(DMSDocumentNotFoundError):
+            self.client.drives.get(self.drive_1.drive_id)
+
     def test_get_drive_invalid_id(self):
         with self.assertRaises(DMSDocumentNotFoundError) as error:
             self.client.drives.get('FAKE_ID_123')
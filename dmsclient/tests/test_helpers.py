@@ -0,0 +1,137 @@
+import threading
+from unittest import TestCase, mock
+
+from dmsclient import helpers
+from dmsclient.utils import read_ahead
+
+
+def _hits(*ids):
+    return {'hits': {'total': len(ids),
+                     'hits': [{'_id': i, '_index': 'index-1', 'sort': [i], '_source': {}} for i in ids]}}
+
+
+class SlicedElasticsearch(object):
+    """
+    Fake client returning `pages` pages of `page_size` documents for every slice
+    """
+
+    def __init__(self, pages=3):
+        self.pages = pages
+        self.scrolls = {}
+        self.cleared = []
+        self.bodies = []
+        self.lock = threading.Lock()
+
+    def search(self, body, scroll, size, **kwargs):
+        with self.lock:
+            self.bodies.append(body)
+        slice_id = body['slice']['id']
+        scroll_id = 'scroll-%d' % (slice_id,)
+        self.scrolls[scroll_id] = iter([['%d-%d-%d' % (slice_id, page, i) for i in range(size)]
+                                        for page in range(self.pages)] + [[]])
+        return self.scroll(scroll_id, scroll, total=self.pages * size)
+
+    def scroll(self, scroll_id, scroll, total=None):
+        ids = next(self.scrolls[scroll_id])
+        return {'_scroll_id': scroll_id,
+                'hits': {'total': total, 'hits': [{'_id': i, '_index': 'index-1'} for i in ids]}}
+
+    def clear_scroll(self, body, ignore):
+        with self.lock:
+            self.cleared.extend(body['scroll_id'])
+
+
+class HelpersTestCase(TestCase):
+
+    def test_search_after(self):
+        for prefetch in (0, 1, 3):
+            es = mock.Mock()
+            es.search.side_effect = [_hits('1', '2'), _hits('3', '4'), _hits()]
+
+            hits = list(helpers.search_after(es, {'query': {'match_all': {}}}, size=2, prefetch=prefetch,
+                                             index='index-*'))
+            self.assertEqual([h['_id'] for h in hits], ['1', '2', '3', '4'])
+            self.assertEqual(es.search.call_count, 3)
+
+            bodies = [call[1]['body'] for call in es.search.call_args_list]
+            self.assertNotIn('search_after', bodies[0])
+            self.assertEqual(bodies[1]['search_after'], ['2'])
+            self.assertEqual(bodies[2]['search_after'], ['4'])
+            self.assertEqual(bodies[2]['sort'], ['_uid'])
+            self.assertEqual(es.search.call_args[1]['index'], 'index-*')
+
+    def test_read_ahead(self):
+        self.assertEqual(list(read_ahead(iter(range(10)), 2)), list(range(10)))
+
+        def failing():
+            yield 1
+            raise ValueError('error')
+
+        items = read_ahead(failing(), 2)
+        self.assertEqual(next(items), 1)
+        with self.assertRaises(ValueError):
+            next(items)
+
+    def test_read_ahead_bounded(self):
+        produced = []
+
+        def producer():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        items = read_ahead(producer(), 2)
+        self.assertEqual(next(items), 0)
+        items.close()
+        # The consumed item, the buffered ones and the one waiting to be buffered
+        self.assertLessEqual(len(produced), 5)
+
+    def test_sliced_scan(self):
+        es = SlicedElasticsearch()
+        page_size = helpers.AdaptivePageSize(initial=10, minimum=10)
+        progress = {}
+
+        def on_progress(slice_progress):
+            progress[slice_progress.slice_id] = (slice_progress.documents, slice_progress.done)
+
+        hits = list(helpers.sliced_scan(es, {'query': {'match_all': {}}}, workers=2, splits=2, ordered=True,
+                                        page_size=page_size, progress=on_progress, index='index-*'))
+
+        # Ordered by slice, the page size of each slice is the one when it started
+        slice_ids = [int(h['_id'].split('-')[0]) for h in hits]
+        self.assertEqual(slice_ids, sorted(slice_ids))
+        self.assertEqual(set(slice_ids), {0, 1, 2, 3})
+        self.assertEqual([b['slice'] for b in sorted(es.bodies, key=lambda b: b['slice']['id'])],
+                         [{'id': i, 'max': 4} for i in range(4)])
+        self.assertEqual(sorted(es.cleared), ['scroll-%d' % (i,) for i in range(4)])
+        self.assertEqual(sorted(progress), [0, 1, 2, 3])
+        self.assertTrue(all(done for _, done in progress.values()))
+        self.assertEqual(sum(documents for documents, _ in progress.values()), len(hits))
+
+        es = SlicedElasticsearch()
+        hits = list(helpers.sliced_scan(es, workers=3, splits=1, page_size=helpers.AdaptivePageSize(10, 10, 10)))
+        self.assertEqual(len(hits), 3 * 3 * 10)
+
+    def test_sliced_scan_error(self):
+        es = SlicedElasticsearch()
+        es.scroll = mock.Mock(side_effect=ValueError('error'))
+
+        with self.assertRaises(ValueError):
+            list(helpers.sliced_scan(es, workers=2, splits=1))
+
+    def test_adaptive_page_size(self):
+        page_size = helpers.AdaptivePageSize(initial=1000, minimum=100, maximum=5000,
+                                             target_time=1.0, target_bytes=1000000)
+        # Slow responses shrink the pages
+        page_size.observe(1000, 4.0, 100000)
+        self.assertEqual(page_size.size, 625)
+        # Large documents shrink them too
+        page_size.observe(625, 0.1, 6250000)
+        self.assertEqual(page_size.size, 362)
+        # Fast responses of small documents grow them towards the maximum
+        for _ in range(10):
+            page_size.observe(page_size.size, 0.01, 100)
+        size = page_size.size
+        self.assertGreater(size, 4900)
+        page_size.observe(0, 0, 0)
+        self.assertEqual(page_size.size, size)
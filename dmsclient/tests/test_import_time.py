@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+# Maximum cumulative time, in microseconds, of a cold import of `dmsclient.client`
+IMPORT_TIME_BUDGET = int(os.environ.get('DMS_IMPORT_TIME_BUDGET', 100000))
+
+# Modules that must not be imported until the client is used
+DEFERRED_MODULES = ('elasticsearch', 'urllib3', 'uhashring', 'dateutil',
+                    'dmsclient.controllers', 'dmsclient.models', 'dmsclient.mappings', 'dmsclient.ring')
+
+
+def _run(code):
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+
+def _cumulative_time(stderr, module):
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError("Module '%s' was not imported" % (module,))
+
+
+class ImportTimeTestCase(TestCase):
+
+    def test_deferred_modules(self):
+        result = _run('import sys, dmsclient.client; print("\\n".join(sys.modules))')
+        for module in result.stdout.splitlines():
+            self.assertFalse(module.startswith(DEFERRED_MODULES), "'%s' imported by dmsclient.client" % (module,))
+
+    def test_import_time(self):
+        # The best of a few runs, to be less sensitive to the load of the machine
+        elapsed = min(_cumulative_time(_run('import dmsclient.client').stderr, 'dmsclient.client') for _ in range(3))
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET,
+                        'Importing dmsclient.client took %d us, the budget is %d us' % (elapsed, IMPORT_TIME_BUDGET))
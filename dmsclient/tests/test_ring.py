@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from dmsclient import factories
+from dmsclient.exceptions import DMSClientException
+from dmsclient.ring import ClusterRing
+
+
+class ClusterRingTestCase(TestCase):
+
+    def setUp(self):
+        self.clusters = [(factories.ClusterFactory(available=True), 1),
+                         (factories.ClusterFactory(available=True), 3),
+                         (factories.ClusterFactory(available=False), 1)]
+
+    def test_no_available_cluster(self):
+        with self.assertRaises(DMSClientException):
+            ClusterRing([(factories.ClusterFactory(available=False), 1)])
+
+    def test_placement(self):
+        ring = ClusterRing(self.clusters)
+        keys = ['drive-%d' % i for i in range(20)]
+        placement = ring.placement(keys)
+
+        self.assertEqual(list(placement.keys()), keys)
+        for key, cluster in placement.items():
+            self.assertIs(cluster, ring.get_cluster(key))
+            self.assertTrue(cluster.available)
+
+    def test_save_load(self):
+        ring = ClusterRing(self.clusters)
+        keys = ['drive-%d' % i for i in range(20)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ring.json')
+            ring.save(path)
+            loaded = ClusterRing.load(path)
+
+        self.assertEqual(loaded.version, ring.version)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual({k: c.cluster_id for k, c in loaded.placement(keys).items()},
+                         {k: c.cluster_id for k, c in ring.placement(keys).items()})
+
+    def test_load_invalid(self):
+        snapshot = ClusterRing(self.clusters).to_dict()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ring.json')
+            with self.assertRaises(DMSClientException):
+                ClusterRing.load(path)
+
+            snapshot['clusters'][0]['version'] = 2
+            with open(path, 'w') as f:
+                json.dump(snapshot, f)
+            with self.assertRaises(DMSClientException):
+                ClusterRing.load(path)
+
+            with open(path, 'w') as f:
+                f.write('{')
+            with self.assertRaises(DMSClientException):
+                ClusterRing.load(path)
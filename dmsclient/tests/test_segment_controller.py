@@ -3,6 +3,8 @@ import os
 import time
 
 from dmsclient import factories
+from dmsclient.bulk import BulkResult
+from dmsclient.controllers import MISSING
 from dmsclient.exceptions import DMSClientException, DMSDocumentNotFoundError, DMSConflictError
 from dmsclient.models.segment import Segment
 from tests import BaseTestCase
@@ -86,6 +88,28 @@ class SegmentControllerTestCase(BaseTestCase):
         exception = error.exception
         self.assertEqual(409, exception.status_code)
 
+    def test_bulk_create_from_drive(self):
+        segment_ids = ['Z1_21YD3_CONT_20170823T073455-20170823T073828',
+                       self.segment_1_id,
+                       'Z1_21YD3_CONT_20170823T073829-20170823T074000']
+        results = self.client.segments.bulk_create_from_drive(segment_ids, self.drive_1, first_sequence=2)
+
+        self.assertEqual([r.doc_id for r in results], segment_ids)
+        self.assertEqual(results[0].status, BulkResult.Status.CREATED)
+        self.assertEqual(results[1].status, BulkResult.Status.CONFLICT)
+        self.assertEqual(results[2].status, BulkResult.Status.CREATED)
+
+        s = self.client.segments.get('Z1_21YD3_CONT_20170823T073829-20170823T074000')
+        self.assertEqual(s.sequence, 4)
+        self.assertEqual(s.drive_id, self.drive_1.drive_id)
+
+    def test_get_many(self):
+        segments = self.client.segments.get_many([self.segment_1_id, 'FAKE_ID_123'])
+
+        self.assertEqual(segments[self.segment_1_id].segment_id, self.segment_1_id)
+        self.assertEqual(segments[self.segment_1_id].drive_id, self.drive_1.drive_id)
+        self.assertIs(segments['FAKE_ID_123'], MISSING)
+
     def test_find_segments_by_drive_id(self):
         segments = self.client.segments.find_by_drive_id(self.drive_1.drive_id)
 
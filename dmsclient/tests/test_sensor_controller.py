@@ -2,6 +2,8 @@ import os
 import time
 
 from dmsclient import factories
+from dmsclient.bulk import BulkResult
+from dmsclient.controllers import MISSING
 from dmsclient.exceptions import DMSClientException, DMSDocumentNotFoundError, DMSConflictError
 from dmsclient.models.sensor import Sensor
 from dmsclient.models.sensorversion import SensorVersion
@@ -87,6 +89,32 @@ class SensorControllerTestCase(BaseTestCase):
         for field in extra_fields:
             self.assertIn(field, s.extra_fields)
 
+    def test_bulk_create(self):
+        results = self.client.sensors.bulk_create([self.sensor_2, self.sensor_1])
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].doc_id, self.sensor_2.sensor_id)
+        self.assertEqual(results[0].status, BulkResult.Status.CREATED)
+        self.assertEqual(results[1].doc_id, self.sensor_1.sensor_id)
+        self.assertEqual(results[1].status, BulkResult.Status.CONFLICT)
+
+        s = self.client.sensors.get(self.sensor_2.sensor_id)
+        self.assertEqual(s, self.sensor_2)
+
+    def test_bulk_create_from_segments(self):
+        segments = [factories.SegmentFactory() for _ in range(3)]
+        results = self.client.sensors.bulk_create_from_segments(segments, 'FLC')
+
+        try:
+            for segment, result in zip(segments, results):
+                self.assertEqual(result.doc_id, segment.segment_id + '_FLC')
+                self.assertTrue(result.ok)
+                s = self.client.sensors.get(segment.segment_id + '_FLC')
+                self.assertEqual(s.segment_id, segment.segment_id)
+        finally:
+            for segment in segments:
+                self.client.sensors.delete_by_segment_id(segment.segment_id)
+
     def test_find_sensors_by_segment_id(self):
         sensors = self.client.sensors.find_by_segment_id(self.sensor_1.segment_id)
 
@@ -109,6 +137,19 @@ class SensorControllerTestCase(BaseTestCase):
         self.assertEqual(Sensor.State.CREATED, sensors[0].state)
         self.assertEqual('FSRL', sensors[0].sensor_type)
 
+    def test_get_many(self):
+        self.client.sensors.create(self.sensor_2)
+        self.client.index_cache.clear()
+
+        # First call resolves the indices with a search, second one uses mget
+        for _ in range(2):
+            sensors = self.client.sensors.get_many([self.sensor_2.sensor_id, 'FAKE_ID_123', self.sensor_1.sensor_id])
+
+            self.assertEqual(list(sensors.keys()), [self.sensor_2.sensor_id, 'FAKE_ID_123', self.sensor_1.sensor_id])
+            self.assertEqual(sensors[self.sensor_1.sensor_id], self.sensor_1)
+            self.assertEqual(sensors[self.sensor_2.sensor_id], self.sensor_2)
+            self.assertIs(sensors['FAKE_ID_123'], MISSING)
+
     def test_delete_sensor(self):
         self.client.sensors.get(self.sensor_1.sensor_id)
 
@@ -48,3 +48,9 @@ class SensorModelTestCase(TestCase):
         self.assertEqual(s.perm_path, self.segment_1.perm_path)
         self.assertEqual(s.resim_path, self.segment_1.resim_path)
         self.assertEqual(s.output_path, self.segment_1.output_path)
+
+    def test_index_for_id(self):
+        self.assertEqual(Sensor.index_for_id('Z1_BK031_CONT_20180316T102815-20180316T102915_FLC'),
+                         'volvo-z1-resim-v1-2018-03')
+        self.assertIsNone(Sensor.index_for_id('sensor-1'))
+        self.assertIsNone(Sensor.index_for_id('Z1_BK031_CONT_20181316T102815-20181316T102915_FLC'))
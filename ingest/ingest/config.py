@@ -36,6 +36,11 @@ class ConfigSectionSchema(object):
     @matches_section("general")
     class General(SectionSchema):
         rsync_args = Param(type=str, default='-rlptDv')
+        copy_engine = Param(type=str, default='rsync')  # rsync or native
+        copy_parallelism = Param(type=int, default=4)  # files copied at the same time by the native engine
+        rsync_streams = Param(type=int, default=1)  # concurrent rsync processes copying each drive
+        max_rsync_processes = Param(type=int, default=0)  # rsync processes running on the station, 0 for no limit
+        lock_directory = Param(type=str, default='')  # lock files shared by the ingest processes of the station
         ignore_directories = Param(type=str, multiple=True, default=[])
         fail_if_parse_error = Param(type=bool, default=False)
         check_mountpoints = Param(type=bool, default=True)
@@ -57,6 +62,20 @@ class ConfigSectionSchema(object):
         password = Param(type=str, default='changeme')
         create_templates = Param(type=bool, default=False)
         verify_templates = Param(type=bool, default=False)
+        refresh = Param(type=str, default='true')
+        maxsize = Param(type=int, default=25)
+        timeout = Param(type=float, default=10)
+        keep_alive = Param(type=bool, default=True)
+        sniff_on_start = Param(type=bool, default=False)
+        sniffer_timeout = Param(type=float, default=0)
+        sniff_on_connection_fail = Param(type=bool, default=False)
+        http_compress = Param(type=bool, default=False)
+        document_cache_size = Param(type=int, default=0)
+        document_cache_ttl = Param(type=int, default=300)
+        deterministic_placement = Param(type=bool, default=False)
+        background_sync = Param(type=bool, default=False)
+        ring_cache_file = Param(type=str, default='')
+        template_cache_file = Param(type=str, default='')
 
 
 class ConfigFileProcessor(ConfigFileReader):
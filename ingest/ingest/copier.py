@@ -0,0 +1,194 @@
+import errno
+import logging
+import os
+import stat
+import time
+
+from ingest.executor import Executor
+
+
+class CopyStats(object):
+    """
+    Summary of a copy: the files copied and skipped, the bytes copied and the time
+    it took.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return "%d files copied (%d skipped), %d bytes in %.1fs (%.1f MB/s, %.1f files/s)" \
+               % (self.files, self.skipped, self.bytes, self.elapsed, self.bytes_per_second / 1e6,
+                  self.files_per_second)
+
+
+class NativeCopier(object):
+    """
+    Copies a directory tree without spawning rsync, with the semantics of
+    `rsync -rlptD`: directories are copied recursively, symbolic links are recreated,
+    and the permissions and modification times are preserved. Device and special
+    files are recreated as well, which requires running as root.
+
+    Regular files are copied concurrently by `parallelism` threads, in the kernel with
+    `os.copy_file_range` or `os.sendfile` when available. Files whose size and
+    modification time match the target are skipped, so an interrupted copy can be
+    resumed. Each file is written to a temporary name and renamed when complete.
+
+    :param int parallelism: number of files copied at the same time
+    :param int buffer_size: bytes copied by each system call
+    """
+
+    TMP_PREFIX = '.ingest-'
+
+    def __init__(self, parallelism=4, buffer_size=8 * 1024 * 1024):
+        self.log = logging.getLogger('ingest.copier')
+        self.parallelism = parallelism
+        self.buffer_size = buffer_size
+
+    def copy_tree(self, source, target):
+        """
+        Copy the contents of the `source` directory into the `target` directory.
+
+        :param string source: the source directory
+        :param string target: the target directory, created if it does not exist
+        :return: the copy statistics
+        :rtype: :class:`ingest.copier.CopyStats`
+        :raises OSError: if a file could not be copied
+        """
+        stats = CopyStats()
+        start_time = time.time()
+        directories = []
+
+        executor = Executor(self._copy_file, self.parallelism, name='copy')
+        try:
+            for entry, target_path in self._walk(source, target, directories):
+                executor.submit((entry, target_path))
+        finally:
+            results = executor.wait()
+
+        for result in results:
+            if not result.ok:
+                raise result.error
+            if result.value is None:
+                stats.skipped += 1
+            else:
+                stats.files += 1
+                stats.bytes += result.value
+
+        # Directory times are set last, since copying their contents changes them
+        for source_stat, target_path in reversed(directories):
+            self._copy_metadata(source_stat, target_path)
+
+        stats.elapsed = time.time() - start_time
+        return stats
+
+    def _walk(self, source, target, directories):
+        source_stat = os.stat(source)
+        os.makedirs(target, exist_ok=True)
+        directories.append((source_stat, target))
+
+        # Consuming the iterator closes it (the context manager needs Python 3.6)
+        for entry in list(os.scandir(source)):
+            target_path = os.path.join(target, entry.name)
+            if entry.is_symlink():
+                self._copy_symlink(entry.path, target_path)
+            elif entry.is_dir():
+                for item in self._walk(entry.path, target_path, directories):
+                    yield item
+            elif entry.is_file():
+                yield entry, target_path
+            else:
+                self._copy_special(entry.stat(follow_symlinks=False), target_path)
+
+    def _copy_file(self, item):
+        entry, target_path = item
+        source_stat = entry.stat()
+
+        try:
+            target_stat = os.stat(target_path, follow_symlinks=False)
+            if stat.S_ISREG(target_stat.st_mode) and target_stat.st_size == source_stat.st_size \
+                    and int(target_stat.st_mtime) == int(source_stat.st_mtime):
+                return None
+        except FileNotFoundError:
+            pass
+
+        directory, name = os.path.split(target_path)
+        tmp_path = os.path.join(directory, self.TMP_PREFIX + name)
+        try:
+            with open(entry.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                self._copy_data(src.fileno(), dst.fileno(), source_stat.st_size)
+            self._copy_metadata(source_stat, tmp_path)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return source_stat.st_size
+
+    def _copy_data(self, src, dst, size):
+        copied = 0
+        if hasattr(os, 'copy_file_range'):
+            copied = self._copy_loop(os.copy_file_range, src, dst, size)
+        if copied == 0 and hasattr(os, 'sendfile'):
+            copied = self._copy_loop(lambda src, dst, count: os.sendfile(dst, src, None, count), src, dst, size)
+
+        # Copy whatever the kernel could not copy (e.g. unsupported file systems)
+        os.lseek(src, copied, os.SEEK_SET)
+        os.lseek(dst, copied, os.SEEK_SET)
+        while True:
+            data = os.read(src, self.buffer_size)
+            if not data:
+                break
+            view = memoryview(data)
+            while view:
+                view = view[os.write(dst, view):]
+
+    def _copy_loop(self, copy, src, dst, size):
+        copied = 0
+        try:
+            while copied < size:
+                count = copy(src, dst, min(self.buffer_size, size - copied))
+                if count == 0:
+                    break
+                copied += count
+        except OSError as e:
+            if copied > 0 or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+                                             errno.EOPNOTSUPP, errno.EBADF):
+                raise
+        return copied
+
+    @staticmethod
+    def _copy_symlink(source_path, target_path):
+        link = os.readlink(source_path)
+        try:
+            if os.readlink(target_path) == link:
+                return
+        except OSError:
+            pass
+        if os.path.lexists(target_path):
+            os.unlink(target_path)
+        os.symlink(link, target_path)
+
+    def _copy_special(self, source_stat, target_path):
+        if os.path.lexists(target_path):
+            os.unlink(target_path)
+        os.mknod(target_path, source_stat.st_mode, source_stat.st_rdev)
+        self._copy_metadata(source_stat, target_path)
+
+    @staticmethod
+    def _copy_metadata(source_stat, target_path):
+        os.chmod(target_path, stat.S_IMODE(source_stat.st_mode))
+        os.utime(target_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
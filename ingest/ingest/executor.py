@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskResult(object):
+    """
+    Outcome of a task run by an :class:`ingest.executor.Executor`: the processed item,
+    the value returned or the exception raised by the task, and when it ran.
+    """
+
+    def __init__(self, item, value=None, error=None, started_at=None, finished_at=None, thread_name=None):
+        self.item = item
+        self.value = value
+        self.error = error
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.thread_name = thread_name
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def duration(self):
+        return self.finished_at - self.started_at
+
+    def __str__(self):
+        status = 'ok' if self.ok else 'error: %s' % (self.error,)
+        return "%s(item=%s, %.1fs, %s)" % (self.__class__.__name__, self.item, self.duration, status)
+
+
+class Executor(object):
+    """
+    Runs a function over work items on a pool of threads.
+
+    `submit` blocks while `max_pending` tasks are waiting or running, so items can be
+    produced lazily without queueing all of them. `callback` is called with the
+    :class:`ingest.executor.TaskResult` of each task as soon as it finishes, from the
+    thread that ran it. `wait` returns when the last submitted task finishes and stops
+    the threads.
+
+    Exceptions raised by the function are stored in the results. Exceptions that are
+    not an `Exception` (e.g. `KeyboardInterrupt` or `SystemExit`) stop the executor
+    instead: they are raised again by `submit` and `wait` without waiting for the
+    pending tasks.
+
+    :param fn: function called with each item
+    :param int workers: number of threads
+    :param int max_pending: maximum number of submitted tasks not finished yet (default: twice the number of threads)
+    :param callback: function called with the result of each task (optional)
+    :param string name: prefix of the thread names
+    """
+
+    def __init__(self, fn, workers, max_pending=None, callback=None, name='ingest-worker'):
+        self.log = logging.getLogger('ingest.executor')
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.callback = callback
+        self.name = name
+        self.results = []
+        self.submitted = 0
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 2)
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._thread_count = 0
+        self._interrupt = None
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def submit(self, item):
+        """
+        Submit an item, blocking while `max_pending` tasks are not finished.
+
+        :param item: the item passed to the function
+        """
+        self._slots.acquire()
+        self._submit(item)
+
+    def _submit(self, item):
+        # The caller holds a slot, released when the task finishes
+        with self._lock:
+            if self._interrupt is not None:
+                self._slots.release()
+                raise self._interrupt
+            self.submitted += 1
+        try:
+            self._pool.submit(self._run, item).add_done_callback(self._done)
+        except BaseException:
+            with self._lock:
+                self.submitted -= 1
+            self._slots.release()
+            raise
+
+    def map(self, items):
+        """
+        Submit all the items and wait for their tasks to finish. The next item is only
+        taken from `items` once it can be submitted, so iterables that hand out work
+        on demand (e.g. :class:`ingest.scheduler.ClusterScheduler`) do not count it
+        as started while it waits for a free thread.
+
+        :param items: the items
+        :type items: iterable
+        :return: the results, in completion order
+        :rtype: list
+        """
+        iterator = iter(items)
+        try:
+            while True:
+                self._slots.acquire()
+                try:
+                    item = next(iterator)
+                except BaseException:
+                    # Including StopIteration, when there are no items left
+                    self._slots.release()
+                    raise
+                self._submit(item)
+        except StopIteration:
+            pass
+        finally:
+            results = self.wait()
+        return results
+
+    def wait(self):
+        """
+        Wait for all the submitted tasks to finish and stop the threads.
+
+        :return: the results, in completion order
+        :rtype: list
+        """
+        with self._finished:
+            while len(self.results) < self.submitted and self._interrupt is None:
+                self._finished.wait()
+        if self._interrupt is not None:
+            self._pool.shutdown(wait=False)
+            raise self._interrupt
+        self._pool.shutdown(wait=True)
+        return list(self.results)
+
+    @property
+    def errors(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self.submitted - len(self.results)
+
+    def _run(self, item):
+        thread = threading.current_thread()
+        if not getattr(self._local, 'named', False):
+            with self._lock:
+                self._thread_count += 1
+                thread.name = '%s-%d' % (self.name, self._thread_count)
+            self._local.named = True
+
+        started_at = time.time()
+        try:
+            value = self.fn(item)
+        except Exception as e:
+            return TaskResult(item, error=e, started_at=started_at, finished_at=time.time(), thread_name=thread.name)
+        return TaskResult(item, value=value, started_at=started_at, finished_at=time.time(), thread_name=thread.name)
+
+    def _done(self, future):
+        if future.exception() is not None:
+            # Interrupted (e.g. KeyboardInterrupt), the task did not return a result
+            with self._finished:
+                self._interrupt = future.exception()
+                self._finished.notify_all()
+            self._slots.release()
+            return
+
+        result = future.result()
+        try:
+            if self.callback is not None:
+                self.callback(result)
+        except Exception:
+            self.log.exception('Error in the completion callback of %s' % (result,))
+        finally:
+            with self._finished:
+                self.results.append(result)
+                self._finished.notify_all()
+            self._slots.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wait()
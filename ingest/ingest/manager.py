@@ -1,11 +1,14 @@
 import abc
 import logging
 import os
+import threading
+from datetime import timedelta
 
 from dmsclient.client import DMSClient
 from dmsclient.exceptions import DMSClientException
 from ingest import util
 from ingest.logger import ElasticsearchHandler, JournalFormatter
+from ingest.scheduler import ClusterScheduler
 
 
 class AbstractIngestManager(abc.ABC):
@@ -19,11 +22,27 @@ class AbstractIngestManager(abc.ABC):
         self.mount_path = mount_path
         self.reader_id = reader_id
         self.cartridge_id = cartridge_id
+        self.lock = threading.Lock()
+        self.scheduler = None
         self.client = DMSClient(es_endpoint=config['elasticsearch']['endpoint'],
                                 es_user=config['elasticsearch']['user'],
                                 es_password=config['elasticsearch']['password'],
                                 create_templates=config['elasticsearch']['create_templates'],
-                                verify_templates=config['elasticsearch']['verify_templates'])
+                                verify_templates=config['elasticsearch']['verify_templates'],
+                                refresh=config['elasticsearch']['refresh'],
+                                maxsize=max(config['elasticsearch']['maxsize'], self.thread_count),
+                                timeout=config['elasticsearch']['timeout'],
+                                keep_alive=config['elasticsearch']['keep_alive'],
+                                sniff_on_start=config['elasticsearch']['sniff_on_start'],
+                                sniffer_timeout=config['elasticsearch']['sniffer_timeout'] or None,
+                                sniff_on_connection_fail=config['elasticsearch']['sniff_on_connection_fail'],
+                                http_compress=config['elasticsearch']['http_compress'],
+                                document_cache_size=config['elasticsearch']['document_cache_size'],
+                                document_cache_ttl=timedelta(seconds=config['elasticsearch']['document_cache_ttl']),
+                                deterministic_placement=config['elasticsearch']['deterministic_placement'],
+                                background_sync=config['elasticsearch']['background_sync'],
+                                ring_cache_file=config['elasticsearch']['ring_cache_file'] or None,
+                                template_cache_file=config['elasticsearch']['template_cache_file'] or None)
 
         if self.log_to_es:
             handler = ElasticsearchHandler(self.client)
@@ -44,6 +63,46 @@ class AbstractIngestManager(abc.ABC):
         if self.reader_id:
             self.client.readers.set_message(self.reader_id, message)
 
+    def log_client_stats(self):
+        stats = self.client.connection_stats()
+        self.log.info("Elasticsearch nodes: %d live, %d dead" % (stats['live'], stats['dead']))
+        for s in stats['connections']:
+            self.log.info("Elasticsearch node '%s': %d requests, %d failures, %.3fs avg, %d connections opened "
+                          "(pool size %d)" % (s['host'], s['requests'], s['failures'], s['avg_request_time'],
+                                              s['opened'], s['maxsize']))
+        for cache, s in self.client.cache_stats().items():
+            if s is not None:
+                self.log.info("DMS %s cache: %d hits, %d misses (%.1f%% hit rate), %d evictions"
+                              % (cache, s['hits'], s['misses'], s['hit_rate'] * 100, s['evictions']))
+
+    def create_scheduler(self):
+        """
+        Return a scheduler limiting the items in progress of each cluster to its share
+        of the worker threads, proportional to its weight.
+
+        :rtype: :class:`ingest.scheduler.ClusterScheduler`
+        """
+        limits = ClusterScheduler.limits_from_weights(self.client.hashring.get_instances(), self.thread_count)
+        self.log.info("Items in progress by cluster: %s"
+                      % (', '.join('%s: %d' % item for item in sorted(limits.items())),))
+        return ClusterScheduler(limits)
+
+    def log_queue_depths(self):
+        depths = self.scheduler.depths()
+        in_progress = self.scheduler.in_progress()
+        queues = ["%s: %d (%d in progress)" % (cluster_id, depth, in_progress.get(cluster_id, 0))
+                  for cluster_id, depth in depths.items()]
+        self.log.info("Queued by cluster: %s" % (', '.join(queues),))
+
+    def log_task_stats(self, results):
+        if len(results) == 0:
+            return
+        failed = len([result for result in results if not result.ok])
+        slowest = max(results, key=lambda result: result.duration)
+        self.log.info("Tasks: %d succeeded, %d failed, %.1fs avg, %.1fs max (%s)"
+                      % (len(results) - failed, failed, sum(result.duration for result in results) / len(results),
+                         slowest.duration, slowest.item))
+
     def set_cartridge_workflow_type(self, cartridge_id, workflow_type):
         if self.cartridge_id:
             self.client.cartridges.set_workflow_type(self.cartridge_id, workflow_type)
@@ -1,10 +1,9 @@
-import time
-from queue import Queue
-
 import logging
+import time
 
 from dmsclient.models.cartridge import Cartridge
 from dmsclient.exceptions import DMSClientException
+from ingest.executor import Executor
 from ingest.manager import AbstractIngestManager
 from ingest.regular.worker import RegularWorker
 
@@ -34,48 +33,93 @@ class RegularIngestManager(AbstractIngestManager):
         dirs = util.scan_directories(self.mount_path)
         self.log.info("Found %s directories" % (len(dirs),))
 
-        # Create a single input and a single error queue for all threads
-        input_q = Queue()
-        error_q = Queue()
-
-        # Create the thread pool
-        self.log.info("Creating %d worker threads" % (self.thread_count,))
-        pool = [RegularWorker(self.config, self.client, input_q, error_q)
-                for _ in range(self.thread_count)]
+        ignored = [dir_ for dir_ in dirs if dir_[0] in self.ignore_directories]
+        for dir_name, _ in ignored:
+            self.log.info("Ignoring directory '%s' based on 'ignore_directories' configuration value" % (dir_name, ))
+        dirs = [dir_ for dir_ in dirs if dir_[0] not in self.ignore_directories]
 
-        # Start all threads
-        for worker in pool:
-            worker.daemon = True
-            worker.start()
+        self.update_reader("Computing drive sizes (%d drives)" % (len(dirs),))
+        self.__stats = self.__collect_stats(dirs)
 
-        # Give each worker a directory to ingest
+        # Group the drives by target cluster, the largest ones are copied first
+        self.scheduler = self.create_scheduler()
         for dir_ in dirs:
-            if dir_[0] in self.ignore_directories:
-                self.log.info("Ignoring directory '%s' based on 'ignore_directories' configuration value" % (dir_[0], ))
-                continue
-            input_q.put(dir_)
-
-        # Wait until the workers have finished
-        processed_elements = -1
-        while not input_q.empty():
-            if len(dirs) - input_q.qsize() != processed_elements:
-                processed_elements = len(dirs) - input_q.qsize()
-                self.update_reader("Drive ingestion in progress (%d/%d)" % (processed_elements, len(dirs)))
-            time.sleep(10)
-
-        # Ask threads to die and wait for them to do it
-        for worker in pool:
-            worker.join()
+            self.scheduler.add(self.client.get_cluster(dir_[0]).cluster_id, dir_, size=self.__size(dir_[0]))
+        self.log_queue_depths()
+
+        self.log.info("Creating %d worker threads" % (self.thread_count,))
+        worker = RegularWorker(self.config, self.client)
+        executor = Executor(lambda entry: worker.process(entry[1], self.__stats.get(entry[1][0])), self.thread_count,
+                            max_pending=self.thread_count, callback=self.__task_done)
+        self.__processed = 0
+        self.__total = len(dirs)
+        self.__bytes_processed = 0
+        self.__bytes_failed = 0
+        self.__total_bytes = sum(self.__size(dir_name) for dir_name, _ in dirs)
+        self.__start_time = time.time()
+
+        self.update_reader("Drive ingestion in progress (0/%d, 0 B of %s)"
+                           % (self.__total, util.format_size(self.__total_bytes)))
+        results = executor.map(self.scheduler)
 
         # Check if there were errors
-        errors = []
-        while not error_q.empty():
-            drive, error = error_q.get()
-            errors.append("Drive '%s'. Error: %s" % (drive, error))
-            error_q.task_done()
+        errors = ["Drive '%s'. Error: %s" % (result.item[1][0], result.error) for result in executor.errors]
 
-        self.update_reader("Drive ingestion done (total: %d, errors: %d)" % (len(dirs), len(errors)))
-        self.log.info("Processed %d directories. Found %d errors" % (len(dirs), len(errors), ))
+        self.log_client_stats()
+        self.log_task_stats(results)
+
+        self.update_reader("Drive ingestion done (total: %d, errors: %d)" % (len(dirs) + len(ignored), len(errors)))
+        self.log.info("Processed %d directories. Found %d errors" % (len(dirs) + len(ignored), len(errors), ))
 
         if len(errors) > 0:
             raise Exception('Ingestion failed with the following errors: %s' % (str(errors),))
+
+    def __collect_stats(self, dirs):
+        """
+        Return the size and file count of the drive directories, computed in parallel.
+        The drives whose stats could not be obtained are left out, their workers try
+        again.
+
+        :param dirs: the (directory name, source path) tuples
+        :return: the (size, file count) tuples by directory name
+        :rtype: dict
+        """
+        start_time = time.time()
+        executor = Executor(lambda dir_: util.get_dir_stats(dir_[1]), self.thread_count, name='ingest-stats')
+        stats = {}
+        for result in executor.map(dirs):
+            if result.ok:
+                stats[result.item[0]] = result.value
+            else:
+                self.log.warning("Could not obtain size and file count of '%s': %s" % (result.item[0], result.error))
+        self.log.info("Computed the size of %d directories in %.1fs (%s)"
+                      % (len(stats), time.time() - start_time,
+                         util.format_size(sum(size for size, _ in stats.values()))))
+        return stats
+
+    def __size(self, dir_name):
+        return self.__stats.get(dir_name, (0, 0))[0]
+
+    def __task_done(self, result):
+        cluster_id, (dir_name, _) = result.item
+        self.scheduler.done(cluster_id)
+        with self.lock:
+            self.__processed += 1
+            # The bytes of failed drives are not copied, they are only left out of the remaining bytes
+            if result.ok:
+                self.__bytes_processed += self.__size(dir_name)
+            else:
+                self.__bytes_failed += self.__size(dir_name)
+            processed, bytes_processed = self.__processed, self.__bytes_processed
+            bytes_remaining = self.__total_bytes - self.__bytes_processed - self.__bytes_failed
+        self.log.info("Directory '%s' (cluster '%s', %s) processed in %.1fs by %s%s"
+                      % (dir_name, cluster_id, util.format_size(self.__size(dir_name)), result.duration,
+                         result.thread_name, '' if result.ok else ' (failed)'))
+        self.log_queue_depths()
+
+        message = "Drive ingestion in progress (%d/%d, %s of %s" \
+                  % (processed, self.__total, util.format_size(bytes_processed), util.format_size(self.__total_bytes))
+        if bytes_processed > 0 and bytes_remaining > 0:
+            elapsed = time.time() - self.__start_time
+            message += ", ETA %s" % (util.format_duration(elapsed * bytes_remaining / bytes_processed),)
+        self.update_reader(message + ")")
@@ -1,10 +1,8 @@
 import logging
 import os
 import socket
-import subprocess
 import threading
 import time
-from queue import Empty
 
 from retrying import retry
 
@@ -12,52 +10,67 @@ import dmsclient
 import ingest
 from dmsclient.exceptions import DMSClientException, DMSInvalidFormat
 from ingest import util
+from ingest.copier import NativeCopier
+from ingest.exceptions import IngestException
+from ingest.rsync import RsyncRunner, StationSlots
 from ingest.util import is_mounted
 
 
-class RegularWorker(threading.Thread):
-    def __init__(self, config, client, input_q, error_q):
-        threading.Thread.__init__(self)
+class RegularWorker(object):
+    """
+    Ingests drive directories. `process` is run by the threads of an
+    :class:`ingest.executor.Executor` and shared by all of them.
+    """
+
+    COPY_ENGINES = ('rsync', 'native')
+
+    def __init__(self, config, client):
         self.log = logging.getLogger('ingest.regular.worker')
         self.config = config
-        self.input_q = input_q
-        self.error_q = error_q
-        self.stoprequest = threading.Event()
         self.client = client
 
-    def join(self, timeout=None):
-        self.stoprequest.set()
-        super(RegularWorker, self).join(timeout)
+        if config['general']['copy_engine'] not in self.COPY_ENGINES:
+            raise IngestException("Invalid copy_engine '%s'. Expected one of: %s"
+                                  % (config['general']['copy_engine'], ', '.join(self.COPY_ENGINES)))
 
-    def run(self):
-        while not self.stoprequest.isSet():
-            try:
-                dir_name, source_path = self.input_q.get(True, 0.05)
-                self.log.info("[%s] Processing directory '%s'" % (self.getName(), dir_name,))
-
-                try:
-                    self.process_drive(dir_name, source_path)
-                except DMSInvalidFormat as e:
-                    if self.config['general']['fail_if_parse_error']:
-                        self.error_q.put((dir_name, e))
-                    else:
-                        self.log.warning("Ignoring invalid directory: %s (%s)" % (dir_name, e))
-                except Exception as e:
-                    self.error_q.put((dir_name, e))
-
-                self.input_q.task_done()
-            except Empty:
-                continue
-
-    def process_drive(self, dir_name, source_path):
+        slots = StationSlots(config['general']['max_rsync_processes'], config['general']['lock_directory'] or None)
+        self.rsync = RsyncRunner(config['general']['rsync_args'].split(), slots)
+
+    def getName(self):
+        return threading.current_thread().name
+
+    def process(self, directory, stats=None):
+        """
+        Ingest a drive directory.
+
+        :param directory: the (directory name, source path) tuple
+        :param stats: the (size, file count) tuple of the directory, if already known
+        :return: the directory name
+        :raises Exception: if the drive could not be ingested
+        """
+        dir_name, source_path = directory
+        self.log.info("[%s] Processing directory '%s'" % (self.getName(), dir_name,))
+
+        try:
+            self.process_drive(dir_name, source_path, stats)
+        except DMSInvalidFormat as e:
+            if self.config['general']['fail_if_parse_error']:
+                raise e
+            self.log.warning("Ignoring invalid directory: %s (%s)" % (dir_name, e))
+        return dir_name
+
+    def process_drive(self, dir_name, source_path, stats=None):
         start_time = time.time()
         drive = None
 
-        try:
-            total_size, file_count = util.get_dir_stats(source_path)
-        except Exception as e:
-            self.log.warning("[%s] Could not obtain drive size and file count: %s" % (self.getName(), e,))
-            total_size, file_count = 0, 0
+        if stats is not None:
+            total_size, file_count = stats
+        else:
+            try:
+                total_size, file_count = util.get_dir_stats(source_path)
+            except Exception as e:
+                self.log.warning("[%s] Could not obtain drive size and file count: %s" % (self.getName(), e,))
+                total_size, file_count = 0, 0
 
         hostname = socket.gethostname()
 
@@ -66,6 +79,7 @@ class RegularWorker(threading.Thread):
                 dir_name=dir_name,
                 source_path=source_path,
                 ingest_station=hostname,
+                refresh='wait_for',
                 size=total_size,
                 file_count=file_count,
                 ingest_version=ingest.__version__,
@@ -82,11 +96,11 @@ class RegularWorker(threading.Thread):
             self.log.info("Drive '{}' (state: '{}') already existed. Reingesting...".format(dir_name, drive.state))
 
         if not is_mounted(drive.target_path) and self.config['general']['check_mountpoints']:
-            self.client.drives.set_state(drive.drive_id, 'copy_failed')
+            self.client.drives.set_state(drive.drive_id, 'copy_failed', refresh='wait_for')
             raise DMSClientException("No mount point found for path '{}'".format(drive.target_path))
 
         try:
-            self.client.drives.set_state(drive.drive_id, 'copying')
+            self.client.drives.set_state(drive.drive_id, 'copying', refresh='wait_for')
             self.__copy_data(drive)
             ingest_duration = drive.ingest_duration + int(time.time() - start_time)
             self.client.drives.__update__(drive.drive_id,
@@ -94,10 +108,10 @@ class RegularWorker(threading.Thread):
                                            'ingest_duration': ingest_duration,
                                            'ingest_version': ingest.__version__,
                                            'dmsclient_version': dmsclient.__version__,
-                                           })
+                                           }, refresh='wait_for')
             self.log.info("Drive '{}' ingested successfully".format(dir_name))
         except Exception as e:
-            self.client.drives.set_state(drive.drive_id, 'copy_failed')
+            self.client.drives.set_state(drive.drive_id, 'copy_failed', refresh='wait_for')
             self.log.error("Drive '%s' failed. Error: %s" % (dir_name, e))
             raise e
 
@@ -127,11 +141,10 @@ class RegularWorker(threading.Thread):
         if not os.path.exists(drive.target_path):
             os.makedirs(drive.target_path)
 
-        rsync_args = self.config['general']['rsync_args'].split()
-        source_path = os.path.join(drive.source_path, '') # append trailing slash to tell rsync to copy dir contents
-        command = ['rsync'] + rsync_args + [source_path, drive.target_path]
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        output, _ = process.communicate()
+        if self.config['general']['copy_engine'] == 'native' and not drive.source_path.startswith('rsync://'):
+            copier = NativeCopier(parallelism=self.config['general']['copy_parallelism'])
+            stats = copier.copy_tree(drive.source_path, drive.target_path)
+            self.log.info("[%s] Drive %s: %s" % (self.getName(), drive.drive_id, stats))
+            return
 
-        if process.returncode > 0:
-            raise Exception(output)
+        self.rsync.copy(drive.source_path, drive.target_path, streams=self.config['general']['rsync_streams'])
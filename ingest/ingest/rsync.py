@@ -0,0 +1,183 @@
+import fcntl
+import heapq
+import logging
+import os
+import subprocess
+import tempfile
+import time
+
+from ingest.executor import Executor
+
+
+def list_files(path):
+    """
+    Return the files under a directory, or an rsync URL, with their size. Symbolic
+    links and special files are included, directories are not.
+
+    :param string path: the directory or rsync URL
+    :return: the (path relative to `path`, size) tuples
+    :rtype: list
+    """
+    if path.startswith('rsync://'):
+        return list_files_rsync(path)
+    return list_files_local(path)
+
+
+def list_files_local(path):
+    files = []
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        # Consuming the iterator closes it (the context manager needs Python 3.6)
+        for entry in list(os.scandir(os.path.join(path, relative))):
+            entry_path = os.path.join(relative, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry_path)
+            else:
+                files.append((entry_path, entry.stat(follow_symlinks=False).st_size))
+    return files
+
+
+def list_files_rsync(path):
+    command = ['rsync', '--list-only', '-r', os.path.join(path, '')]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output, _ = process.communicate()
+
+    if process.returncode > 0:
+        raise Exception(output)
+
+    files = []
+    for line in output.decode('utf-8').splitlines():
+        fields = line.split(None, 4)
+        if len(fields) < 5 or fields[0].startswith('d'):
+            continue
+        name = fields[4].split(' -> ')[0] if fields[0].startswith('l') else fields[4]
+        files.append((name, int(fields[1].replace(',', ''))))
+    return files
+
+
+def partition_by_size(files, count):
+    """
+    Split files into at most `count` shards of similar total size, assigning the
+    largest files first to the smallest shard.
+
+    :param files: the (path, size) tuples
+    :param int count: the number of shards
+    :return: the non-empty shards, lists of paths
+    :rtype: list
+    """
+    shards = [(0, i, []) for i in range(max(1, count))]
+    for name, size in sorted(files, key=lambda f: f[1], reverse=True):
+        total, i, names = heapq.heappop(shards)
+        names.append(name)
+        heapq.heappush(shards, (total + size, i, names))
+    return [names for _, _, names in sorted(shards, key=lambda s: s[1]) if names]
+
+
+class StationSlots(object):
+    """
+    Limits the number of processes of some kind running at the same time on the
+    station, across all the ingest processes. Each slot is a lock file in `directory`,
+    held with `flock` while the process runs, so slots are released even if the ingest
+    process dies.
+
+    :param int count: number of slots, 0 for no limit
+    :param string directory: directory of the lock files
+    :param string name: name of the slots
+    """
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, count, directory=None, name='rsync'):
+        self.count = count
+        self.directory = directory or tempfile.gettempdir()
+        self.name = name
+
+    def acquire(self):
+        """
+        Wait for a free slot and take it.
+
+        :return: the open lock file of the slot, to be passed to `release`, or None without limit
+        """
+        if self.count <= 0:
+            return None
+
+        while True:
+            for i in range(self.count):
+                fd = os.open(os.path.join(self.directory, 'ingest-%s-%d.lock' % (self.name, i)),
+                             os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except OSError:
+                    os.close(fd)
+            time.sleep(self.POLL_INTERVAL)
+
+    @staticmethod
+    def release(slot):
+        if slot is not None:
+            fcntl.flock(slot, fcntl.LOCK_UN)
+            os.close(slot)
+
+
+class RsyncRunner(object):
+    """
+    Copies directories with rsync. Large directories can be split into several
+    streams of similar size copied by concurrent rsync processes (`--files-from`
+    lists), followed by a pass copying the directory tree, so empty directories and
+    directory attributes are copied too. The rsync processes of the station are
+    limited by `slots`.
+
+    :param rsync_args: the rsync arguments
+    :type rsync_args: list
+    :param slots: the station-wide limit of rsync processes
+    :type slots: :class:`ingest.rsync.StationSlots`
+    """
+
+    def __init__(self, rsync_args, slots):
+        self.log = logging.getLogger('ingest.rsync')
+        self.rsync_args = rsync_args
+        self.slots = slots
+
+    def copy(self, source_path, target_path, streams=1):
+        """
+        Copy the contents of `source_path` into `target_path`.
+
+        :param string source_path: the source directory or rsync URL
+        :param string target_path: the target directory
+        :param int streams: number of concurrent rsync processes
+        :raises Exception: with the output of rsync, if a process failed
+        """
+        source_path = os.path.join(source_path, '')  # append trailing slash to tell rsync to copy dir contents
+        shards = partition_by_size(list_files(source_path), streams) if streams > 1 else []
+        if len(shards) <= 1:
+            self.run([source_path, target_path])
+            return
+
+        self.log.info("Copying '%s' in %d rsync streams" % (source_path, len(shards)))
+        executor = Executor(lambda shard: self._run_shard(shard, source_path, target_path), len(shards),
+                            name='rsync')
+        errors = [result.error for result in executor.map(shards) if not result.ok]
+        if errors:
+            raise errors[0]
+
+        # The lists only contain files, copy the directories (including the empty ones) last
+        self.run(['-r', '--include=*/', '--exclude=*', source_path, target_path])
+
+    def _run_shard(self, shard, source_path, target_path):
+        with tempfile.NamedTemporaryFile(prefix='ingest-files-', suffix='.lst') as files_from:
+            files_from.write(b'\0'.join(name.encode('utf-8') for name in shard))
+            files_from.flush()
+            self.run(['--from0', '--files-from=%s' % (files_from.name,), source_path, target_path])
+
+    def run(self, args):
+        command = ['rsync'] + self.rsync_args + args
+        slot = self.slots.acquire()
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output, _ = process.communicate()
+        finally:
+            self.slots.release(slot)
+
+        if process.returncode > 0:
+            raise Exception(output)
@@ -0,0 +1,124 @@
+import heapq
+import itertools
+import math
+import threading
+from collections import OrderedDict
+
+
+class ClusterScheduler(object):
+    """
+    Hands out work items grouped by cluster, so the worker threads are spread over
+    the clusters instead of all copying to (or from) the same one.
+
+    The largest item of the clusters that have less than `limits[cluster]` items in
+    progress is handed out first (longest processing time first), so the large items
+    do not start last and delay the end of the whole run. Clusters whose next items
+    have the same size are taken in turn (round-robin), which is also the order when
+    no sizes are given. Iterating over the scheduler blocks until an item can be
+    handed out, and stops when all of them have been. `done` must be called with the
+    cluster of each item when it finishes. Items of clusters without limit (e.g. None,
+    for unknown clusters) are handed out without restriction.
+
+    :param limits: the maximum number of items in progress by cluster ID (optional)
+    :type limits: dict
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+        self._queues = OrderedDict()
+        self._in_progress = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def limits_from_weights(clusters, workers):
+        """
+        Return the limits of the clusters, the share of `workers` proportional to their
+        weight (at least one).
+
+        :param clusters: the cluster objects
+        :param int workers: the number of worker threads
+        :return: the limits by cluster ID
+        :rtype: dict
+        """
+        clusters = list(clusters)
+        total_weight = sum(cluster.weight for cluster in clusters)
+        if total_weight <= 0:
+            return {cluster.cluster_id: workers for cluster in clusters}
+        return {cluster.cluster_id: max(1, int(math.ceil(workers * cluster.weight / total_weight)))
+                for cluster in clusters}
+
+    def add(self, cluster_id, item, size=0):
+        """
+        Queue an item. Items of the same cluster and size are handed out in the order
+        they were added.
+
+        :param string cluster_id: the cluster of the item
+        :param item: the item
+        :param int size: the size of the item, e.g. in bytes
+        """
+        with self._condition:
+            heapq.heappush(self._queues.setdefault(cluster_id, []), (-size, next(self._counter), item))
+            self._condition.notify_all()
+
+    def done(self, cluster_id):
+        """
+        Record that an item of the given cluster finished.
+
+        :param string cluster_id: the cluster of the item
+        """
+        with self._condition:
+            self._in_progress[cluster_id] -= 1
+            self._condition.notify_all()
+
+    def depths(self):
+        """
+        Return the number of queued items of each cluster.
+
+        :rtype: collections.OrderedDict
+        """
+        with self._condition:
+            return OrderedDict((cluster_id, len(queue)) for cluster_id, queue in self._queues.items())
+
+    def in_progress(self):
+        """
+        Return the number of items in progress of each cluster.
+
+        :rtype: dict
+        """
+        with self._condition:
+            return {cluster_id: count for cluster_id, count in self._in_progress.items() if count > 0}
+
+    def __len__(self):
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def __iter__(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not any(self._queues.values()):
+                        return
+                    entry = self._next()
+                    if entry is not None:
+                        break
+                    self._condition.wait()
+            yield entry
+
+    def _next(self):
+        # The cluster ID can be None, so the selected cluster is kept with its queue
+        selected = None
+        for cluster_id, queue in self._queues.items():
+            limit = self.limits.get(cluster_id)
+            if queue and (limit is None or self._in_progress.get(cluster_id, 0) < limit) \
+                    and (selected is None or queue[0][0] < selected[1][0][0]):
+                selected = cluster_id, queue
+        if selected is None:
+            return None
+
+        cluster_id, queue = selected
+
+        # Move the cluster to the end, so the next item of the same size is taken from another one
+        self._queues.move_to_end(cluster_id)
+        self._in_progress[cluster_id] = self._in_progress.get(cluster_id, 0) + 1
+        return cluster_id, heapq.heappop(queue)[2]
@@ -6,7 +6,7 @@ import subprocess
 import time
 from retrying import retry
 
-from dmsclient.exceptions import DMSDocumentNotFoundError
+from dmsclient.controllers import MISSING
 from dmsclient.models.drive import Drive
 from dmsclient.models.sensor import Sensor
 from ingest import util
@@ -50,14 +50,13 @@ class EgestSensorWorker(AbstractSensorWorker):
     def egest_drive(self, drive):
         # obtain all drive segments and associated FLC sensor documents
         segments = self.client.segments.find_by_fields(drive_id=drive.drive_id)
+        segment_sensors = self.client.sensors.get_many(segment.id + '_FLC' for segment in segments)
         sensors = []
         total_size = 0
-        for segment in segments:
-            try:
-                sensor = self.client.sensors.get(segment.id + '_FLC')
-            except DMSDocumentNotFoundError:
+        for sensor_id, sensor in segment_sensors.items():
+            if sensor is MISSING:
                 self.log.warn("[%s] Could not find sensor document for segment '%s'"
-                              % (self.getName(), segment.id))
+                              % (self.getName(), sensor_id[:-len('_FLC')]))
                 continue
             if sensor.state != Sensor.State.CREATED:
                 raise IngestException("[%s] Error with sensor '%s': State is '%s'"
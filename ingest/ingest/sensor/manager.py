@@ -1,7 +1,5 @@
 import logging
 import os
-import time
-from queue import Queue
 from random import shuffle
 
 from dmsclient.exceptions import DMSClientException
@@ -9,6 +7,7 @@ from dmsclient.models.cartridge import Cartridge
 from dmsclient.models.drive import Drive
 from ingest import util
 from ingest.exceptions import EgestTruncatedError
+from ingest.executor import Executor
 from ingest.manager import AbstractIngestManager
 from ingest.sensor.egest_worker import EgestSensorWorker
 from ingest.sensor.ingest_worker import IngestSensorWorker
@@ -43,11 +42,11 @@ class SensorManager(AbstractIngestManager):
         return os.path.exists(ingest_path) and len(os.listdir(ingest_path)) > 0
 
     def run(self):
-        # Create a single input and a single error queue for all threads
-        input_q = Queue()
-        error_q = Queue()
+        # The mode is decided once, the ingest directory is emptied while the files are processed
+        ingest_mode = self.__is_ingest_mode()
+        self.__mode = self.mode()
 
-        if self.__is_ingest_mode():
+        if ingest_mode:
             self.log.info("Ingesting sensor data")
             self.update_reader("Starting FLC ingestion")
             worker_class = IngestSensorWorker
@@ -76,41 +75,34 @@ class SensorManager(AbstractIngestManager):
             egest_path = os.path.join(self.mount_path, self.egest_dir)
             os.makedirs(egest_path, exist_ok=True)
 
-        # Create the thread pool
-        self.log.info("Creating %d worker threads" % (self.thread_count,))
-        pool = [worker_class(self.config, self.mount_path, self.client, input_q, error_q)
-                for _ in range(self.thread_count)]
-
-        # Start all threads
-        for worker in pool:
-            worker.daemon = True
-            worker.start()
-
-        # Give each worker an element to process
+        # Group the drives by source cluster, the largest ones are egested first. The cluster of the sensor files is
+        # not known until they are processed
+        self.scheduler = self.create_scheduler()
         for e in elements:
-            input_q.put(e)
+            if ingest_mode:
+                self.scheduler.add(None, e)
+            else:
+                self.scheduler.add(e.cluster_id, e, size=e.size or 0)
+        self.log_queue_depths()
 
-        # Wait until the workers have finished
-        processed_elements = -1
-        while not input_q.empty():
-            if len(elements) - input_q.qsize() != processed_elements:
-                processed_elements = len(elements) - input_q.qsize()
-                self.update_reader("%s in progress (processed: %d, total: %d)" % (self.mode(), processed_elements, len(elements)))
-            time.sleep(10)
+        self.log.info("Creating %d worker threads" % (self.thread_count,))
+        worker = worker_class(self.config, self.mount_path, self.client)
+        executor = Executor(lambda entry: worker.process(entry[1]), self.thread_count, max_pending=self.thread_count,
+                            callback=self.__task_done)
+        self.__processed = 0
+        self.__total = len(elements)
 
-        # Ask threads to die and wait for them to do it
-        for worker in pool:
-            worker.join()
+        results = executor.map(self.scheduler)
 
         # Check if there were errors
-        errors = []
-        while not error_q.empty():
-            element, error = error_q.get()
-            errors.append("'%s'. Error: %s" % (element, error))
-            error_q.task_done()
+        failed = executor.errors
+        errors = ["'%s'. Error: %s" % (result.item[1], result.error) for result in failed]
+
+        self.log_client_stats()
+        self.log_task_stats(results)
 
         truncated = False
-        if self.__is_ingest_mode():
+        if ingest_mode:
             self.log.info("Purging ingest directory...")
             # Purge ingest directory recursively
             ingest_path = os.path.join(self.mount_path, self.ingest_dir)
@@ -123,12 +115,13 @@ class SensorManager(AbstractIngestManager):
                     # Directory not empty
                     pass
         else:
-            if len(errors) > 0:
+            if len(failed) > 0:
                 # Check if all errors are due to not enough space in disk
-                errors = list(filter(lambda e: type(e) != EgestTruncatedError, errors))
+                errors = ["'%s'. Error: %s" % (result.item[1], result.error) for result in failed
+                          if not isinstance(result.error, EgestTruncatedError)]
                 truncated = len(errors) == 0
 
-        message = "%s done (total: %d, errors: %d)" % (self.mode(), len(elements), len(errors),)
+        message = "%s done (total: %d, errors: %d)" % (self.__mode, len(elements), len(errors),)
         if truncated:
             message += " (truncated)"
 
@@ -138,5 +131,17 @@ class SensorManager(AbstractIngestManager):
         if len(errors) > 0:
             raise Exception('Ingestion failed with the following errors: %s' % (str(errors),))
 
+    def __task_done(self, result):
+        cluster_id, element = result.item
+        self.scheduler.done(cluster_id)
+        with self.lock:
+            self.__processed += 1
+            processed = self.__processed
+        self.log.info("'%s' processed in %.1fs by %s%s"
+                      % (element, result.duration, result.thread_name, '' if result.ok else ' (failed)'))
+        if cluster_id is not None:
+            self.log_queue_depths()
+        self.update_reader("%s in progress (processed: %d, total: %d)" % (self.__mode, processed, self.__total))
+
     def mode(self):
         return "FLC Ingestion" if self.__is_ingest_mode() else "FLC Egestion"
\ No newline at end of file
@@ -126,3 +126,19 @@ def sensorversionid_to_sensorid(sensorversion_id):
 def get_free_space(path):
     r = os.statvfs(path)
     return r.f_bsize * r.f_bavail
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            break
+        size /= 1024.0
+    return '%.1f %s' % (size, unit)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return '%dh%02dm' % (hours, minutes)
+    return '%dm%02ds' % (minutes, seconds)
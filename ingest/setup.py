@@ -42,6 +42,7 @@ setup(
     install_requires=read('./requirements.txt'),
     test_suite='nose.collector',
     zip_safe=False,
+    python_requires='>=3.5',
     packages=find_packages(exclude=['ez_setup']),
     package_data={
         'ingest': ['config/logging.yaml'],
@@ -54,7 +55,6 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         'Programming Language :: Python :: 3.6',
         'Topic :: Software Development :: Libraries :: Python Modules',
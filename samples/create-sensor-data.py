@@ -39,7 +39,8 @@ def main(ctx, config_file, sensor_type):
                        es_password=es_password,
                        create_templates=False,
                        verify_templates=False,
-                       initial_sync=False)
+                       initial_sync=False,
+                       lazy=True)
 
     print("Looking for 'copied' drives")
     drives = list(client.drives.find_by_fields(state='copied'))
@@ -37,7 +37,8 @@ def main(ctx, config_file, ingest_dir):
                        es_password=es_password,
                        create_templates=False,
                        verify_templates=False,
-                       initial_sync=False)
+                       initial_sync=False,
+                       lazy=True)
 
     print("Looking for 'shipped' sensors")
     sensors = client.sensors.find_by_fields(state='shipped')